@@ -0,0 +1,322 @@
+"""
+Approximate Nearest-Neighbour Index for Description Embeddings
+Pure-NumPy IVF (inverted file) index used to pick the top-N candidate items
+before full match scoring, so a lookup no longer scores every row in the table
+
+- Vectors are unit-normalized, so inner product == cosine similarity
+- A spherical k-means coarse quantizer splits vectors into inverted lists
+- Searches probe the `nprobe` closest lists (higher = better recall, slower)
+- Small indexes (< MIN_TRAIN_SIZE vectors) are searched exhaustively
+"""
+
+import atexit
+import os
+import threading
+import time
+import numpy as np
+
+MIN_TRAIN_SIZE = 1024
+KMEANS_ITERATIONS = 10
+
+# Rebuild the coarse quantizer once the index has grown this much since training
+RETRAIN_GROWTH_FACTOR = 4
+
+# Rewrite an index file once this many vectors changed, or this many seconds after
+# its first unsaved change (unsaved vectors are rebuilt from item_embeddings by sync)
+SAVE_BATCH_SIZE = 500
+SAVE_INTERVAL_SECONDS = 300
+
+# Description hashes (EmbeddingStore.description_hash, hex SHA-1)
+HASH_DTYPE = 'U40'
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class IVFIndex:
+    def __init__(self, nprobe=8):
+        """
+        Initialize an empty index
+
+        Args:
+            nprobe: Number of inverted lists scanned per query (recall/latency knob)
+        """
+        self.nprobe = nprobe
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.hashes = np.zeros(0, dtype=HASH_DTYPE)
+        self.vectors = None
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.trained_size = 0
+        self._lists = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def _assign(self, vectors):
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def train(self, seed=42):
+        """Fit the coarse quantizer on the current vectors (spherical k-means)"""
+        n = len(self.ids)
+        if n < MIN_TRAIN_SIZE:
+            self.centroids = None
+            self.assignments = np.zeros(n, dtype=np.int32)
+            self._lists = None
+            return
+
+        n_lists = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        centroids = self.vectors[rng.choice(n, n_lists, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignments = np.argmax(self.vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, self.vectors)
+            empty = np.linalg.norm(sums, axis=1) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        self.centroids = centroids
+        self.assignments = self._assign(self.vectors)
+        self.trained_size = n
+        self._lists = None
+
+    def add(self, ids, vectors, hashes=None):
+        """
+        Add or replace vectors
+
+        Args:
+            ids: Item IDs
+            vectors: Matching 2D array of embeddings
+            hashes: Optional description hash per ID (used by CandidateIndex.sync to
+                    spot edited descriptions)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) == 0:
+            return
+        vectors = _normalize(vectors)
+        if hashes is None:
+            hashes = [''] * len(ids)
+
+        self.remove(ids)
+        if self.vectors is None:
+            self.vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+
+        self.ids = np.concatenate([self.ids, ids])
+        self.hashes = np.concatenate([self.hashes, np.asarray(hashes, dtype=HASH_DTYPE)])
+        self.vectors = np.concatenate([self.vectors, vectors])
+
+        if self.is_trained:
+            self.assignments = np.concatenate([self.assignments, self._assign(vectors)])
+        else:
+            self.assignments = np.concatenate([self.assignments, np.zeros(len(ids), dtype=np.int32)])
+
+        # Train once the index is big enough, and retrain after heavy growth
+        if (not self.is_trained and len(self.ids) >= MIN_TRAIN_SIZE) or \
+                (self.is_trained and len(self.ids) > RETRAIN_GROWTH_FACTOR * self.trained_size):
+            self.train()
+        self._lists = None
+
+    def remove(self, ids):
+        """Remove vectors by item ID (unknown IDs are ignored)"""
+        if len(self.ids) == 0:
+            return
+        keep = ~np.isin(self.ids, np.asarray(ids, dtype=np.int64))
+        if keep.all():
+            return
+        self.ids = self.ids[keep]
+        self.hashes = self.hashes[keep]
+        self.vectors = self.vectors[keep]
+        self.assignments = self.assignments[keep]
+        self._lists = None
+
+    def _inverted_lists(self):
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind='stable')
+            bounds = np.searchsorted(self.assignments[order], np.arange(len(self.centroids) + 1))
+            self._lists = (order, bounds)
+        return self._lists
+
+    def search(self, query, top_n=100, nprobe=None):
+        """
+        Find the most similar items to a query embedding
+
+        Args:
+            query: 1D embedding
+            top_n: Number of candidates to return
+            nprobe: Override the index's default nprobe
+
+        Returns:
+            List of (item_id, cosine_similarity), best first
+        """
+        if len(self.ids) == 0:
+            return []
+        query = _normalize(query)[0]
+
+        if self.is_trained:
+            nprobe = min(nprobe or self.nprobe, len(self.centroids))
+            probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            order, bounds = self._inverted_lists()
+            positions = np.concatenate([order[bounds[p]:bounds[p + 1]] for p in probes])
+        else:
+            positions = np.arange(len(self.ids))
+
+        if len(positions) == 0:
+            return []
+
+        scores = self.vectors[positions] @ query
+        if len(positions) > top_n:
+            best = np.argpartition(-scores, top_n - 1)[:top_n]
+        else:
+            best = np.arange(len(positions))
+        best = best[np.argsort(-scores[best], kind='stable')]
+
+        return [(int(self.ids[positions[i]]), float(scores[i])) for i in best]
+
+    def save(self, path):
+        """Persist the index to an .npz file (written atomically)"""
+        tmp_path = path + '.tmp.npz'
+        np.savez(
+            tmp_path,
+            ids=self.ids,
+            hashes=self.hashes,
+            vectors=self.vectors if self.vectors is not None else np.zeros((0, 0), dtype=np.float32),
+            centroids=self.centroids if self.is_trained else np.zeros((0, 0), dtype=np.float32),
+            assignments=self.assignments,
+            trained_size=np.array([self.trained_size]),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, nprobe=8):
+        """Load an index saved with save(); returns an empty index if the file is missing"""
+        index = cls(nprobe=nprobe)
+        if not os.path.exists(path):
+            return index
+
+        data = np.load(path)
+        index.ids = data['ids']
+        # Files saved before hashes were stored: every vector is re-checked on the next sync
+        index.hashes = data['hashes'] if 'hashes' in data.files else np.zeros(len(index.ids), dtype=HASH_DTYPE)
+        index.vectors = data['vectors'] if data['vectors'].size else None
+        index.centroids = data['centroids'] if data['centroids'].size else None
+        index.assignments = data['assignments']
+        index.trained_size = int(data['trained_size'][0])
+        return index
+
+
+class CandidateIndex:
+    """
+    Lost-item and found-item IVF indexes persisted next to the database
+
+    Changes are written to disk in batches (SAVE_BATCH_SIZE vectors or
+    SAVE_INTERVAL_SECONDS, and at exit), not on every report: the whole vectors
+    array is rewritten on each save.
+    """
+
+    def __init__(self, db_path, nprobe=8):
+        self.db_path = db_path
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        self.indexes = {
+            item_type: IVFIndex.load(self.index_path(item_type), nprobe=nprobe)
+            for item_type in ('lost', 'found')
+        }
+        self._unsaved = {item_type: 0 for item_type in self.indexes}
+        self._unsaved_since = {item_type: None for item_type in self.indexes}
+        atexit.register(self.flush)
+
+    def index_path(self, item_type):
+        """e.g. traceback_100k.db -> traceback_100k.lost.ann.npz"""
+        base, _ = os.path.splitext(self.db_path)
+        return f"{base}.{item_type}.ann.npz"
+
+    def _changed(self, item_type, count):
+        """Note changed vectors and save the index if enough changes are pending (lock held)"""
+        if not count:
+            return
+        self._unsaved[item_type] += count
+        if self._unsaved_since[item_type] is None:
+            self._unsaved_since[item_type] = time.time()
+        if self._unsaved[item_type] >= SAVE_BATCH_SIZE or \
+                time.time() - self._unsaved_since[item_type] >= SAVE_INTERVAL_SECONDS:
+            self._save(item_type)
+
+    def _save(self, item_type):
+        self.indexes[item_type].save(self.index_path(item_type))
+        self._unsaved[item_type] = 0
+        self._unsaved_since[item_type] = None
+
+    def flush(self):
+        """Write every index with unsaved changes to disk"""
+        with self._lock:
+            for item_type, pending in self._unsaved.items():
+                if pending:
+                    self._save(item_type)
+
+    def add(self, item_type, embeddings, hashes=None):
+        """
+        Incrementally add items to an index
+
+        Args:
+            item_type: 'lost' or 'found'
+            embeddings: Dictionary of item_id -> embedding
+            hashes: Optional dictionary of item_id -> description hash
+        """
+        if not embeddings:
+            return
+        with self._lock:
+            ids = list(embeddings.keys())
+            self.indexes[item_type].add(
+                ids, np.stack([embeddings[i] for i in ids]),
+                [hashes.get(i, '') for i in ids] if hashes else None
+            )
+            self._changed(item_type, len(ids))
+
+    def sync(self, item_type, current_hashes, embed_missing):
+        """
+        Bring an index in line with the item table
+
+        Args:
+            item_type: 'lost' or 'found'
+            current_hashes: Dictionary of item_id -> description hash for every item
+                            that should be searchable (items with a description)
+            embed_missing: Callable(list_of_ids) -> {item_id: embedding}
+        """
+        with self._lock:
+            index = self.indexes[item_type]
+            indexed = dict(zip(index.ids.tolist(), index.hashes.tolist()))
+
+        stale = [item_id for item_id in indexed if item_id not in current_hashes]
+        # New items and items whose description changed since they were indexed
+        missing = [item_id for item_id, desc_hash in current_hashes.items()
+                   if indexed.get(item_id) != desc_hash]
+        embeddings = embed_missing(missing) if missing else {}
+
+        # Edited items that got no new vector must not keep the old one
+        stale.extend(item_id for item_id in missing if item_id in indexed and item_id not in embeddings)
+
+        with self._lock:
+            if stale:
+                index.remove(stale)
+            if embeddings:
+                ids = list(embeddings.keys())
+                index.add(ids, np.stack([embeddings[i] for i in ids]),
+                          [current_hashes.get(i, '') for i in ids])
+            self._changed(item_type, len(stale) + len(embeddings))
+
+    def search(self, item_type, query, top_n=100, nprobe=None):
+        """Top-N candidate IDs of the given type for a query embedding"""
+        with self._lock:
+            return self.indexes[item_type].search(query, top_n=top_n, nprobe=nprobe)
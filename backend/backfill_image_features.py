@@ -0,0 +1,92 @@
+"""
+Backfill Image Features
+Extracts ResNet-50 + LAB color features for every file in the uploads folder
+(in batches, with a decode thread pool) and stores them in the image_features
+table used by ML matching. Files whose features are already stored and current
+are skipped, so the script is safe to re-run.
+
+Usage:
+    python backfill_image_features.py [--batch-size 32] [--workers 8] [--threads 4]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'traceback_100k.db')
+UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
+
+# Files handed to the store per round (each round commits once)
+CHUNK_SIZE = 256
+
+
+def list_images(upload_folder):
+    """(filename, full_path) for every image in the uploads folder, by filename"""
+    images = []
+    for name in sorted(os.listdir(upload_folder)):
+        path = os.path.join(upload_folder, name)
+        if os.path.isfile(path) and name.lower().endswith(IMAGE_EXTENSIONS):
+            images.append((name, path))
+    return images
+
+
+def backfill(db_path=DB_PATH, upload_folder=UPLOAD_FOLDER, batch_size=None, workers=None, threads=None):
+    """
+    Compute and store features for all uploaded images
+
+    Args:
+        db_path: Path to the database
+        upload_folder: Folder with uploaded item images
+        batch_size: Images per ResNet forward pass (default IMAGE_BATCH_SIZE)
+        workers: Decode/transform threads (default IMAGE_DECODE_WORKERS)
+        threads: torch intra-op threads (default: leave torch's setting)
+
+    Returns:
+        Number of images with stored features
+    """
+    import torch
+    from image_similarity import extract_features_batch
+    from image_feature_store import ImageFeatureStore
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    store = ImageFeatureStore(db_path)
+    images = list_images(upload_folder)
+    print(f"🖼️  Found {len(images)} images in {upload_folder}")
+
+    def extract(paths):
+        return extract_features_batch(paths, batch_size=batch_size, workers=workers)
+
+    start = time.time()
+    done = 0
+    for offset in range(0, len(images), CHUNK_SIZE):
+        chunk = images[offset:offset + CHUNK_SIZE]
+        features = store.get_or_compute_many(chunk, extract)
+        done += len(features)
+
+        elapsed = time.time() - start
+        print(f"   {offset + len(chunk)}/{len(images)} processed "
+              f"({done} with features, {elapsed:.1f}s elapsed)")
+
+    print(f"✅ Backfill complete: {done}/{len(images)} images in {time.time() - start:.1f}s")
+    return done
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill image features for uploaded files')
+    parser.add_argument('--db', default=DB_PATH, help='Database path')
+    parser.add_argument('--uploads', default=UPLOAD_FOLDER, help='Uploads folder')
+    parser.add_argument('--batch-size', type=int, default=None, help='Images per forward pass')
+    parser.add_argument('--workers', type=int, default=None, help='Decode threads')
+    parser.add_argument('--threads', type=int, default=None, help='torch intra-op threads')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.uploads):
+        print(f"❌ Uploads folder not found: {args.uploads}")
+        sys.exit(1)
+
+    backfill(args.db, args.uploads, args.batch_size, args.workers, args.threads)
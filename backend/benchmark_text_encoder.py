@@ -0,0 +1,145 @@
+"""
+Benchmark Text Encoder Backends
+Compares the fp32, int8 and ONNX text model backends on real item descriptions:
+
+- encode throughput (descriptions / second)
+- resident memory (RSS) added by loading the model, and the process's peak RSS
+- parity: pairwise cosine similarities vs the fp32 model (must stay within tolerance)
+
+Each backend runs in its own process so memory numbers don't bleed into each other.
+
+Usage:
+    python benchmark_text_encoder.py [sample_size] [backend ...]
+    python benchmark_text_encoder.py 2000 fp32 int8 onnx
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import multiprocessing as mp
+import numpy as np
+from text_encoder import PARITY_TEXTS
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'traceback_100k.db')
+MODEL_PATH = os.path.join(os.path.dirname(__file__), 'traceback_text_similarity_model')
+
+DEFAULT_SAMPLE_SIZE = 1000
+BATCH_SIZE = 64
+
+# Used when there is no database to sample from
+FALLBACK_TEXTS = PARITY_TEXTS
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (peak RSS where /proc is missing)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    import resource
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def load_sample_texts(sample_size):
+    """Up to sample_size non-empty descriptions from the database"""
+    if not os.path.exists(DB_PATH):
+        return (FALLBACK_TEXTS * (sample_size // len(FALLBACK_TEXTS) + 1))[:sample_size]
+
+    conn = sqlite3.connect(DB_PATH)
+    rows = conn.execute("""
+        SELECT description FROM lost_items WHERE description IS NOT NULL AND description != ''
+        UNION ALL
+        SELECT description FROM found_items WHERE description IS NOT NULL AND description != ''
+        LIMIT ?
+    """, (sample_size,)).fetchall()
+    conn.close()
+
+    texts = [r[0] for r in rows]
+    return texts or FALLBACK_TEXTS
+
+
+def run_backend(backend, texts):
+    """Load one backend and encode the sample (runs in a child process)"""
+    from text_encoder import load_text_encoder
+
+    base_rss = rss_mb()
+    start = time.time()
+    # Parity is checked below on the whole sample; don't load an fp32 copy here
+    model, used = load_text_encoder(MODEL_PATH, backend, check_parity=False)
+    load_time = time.time() - start
+    loaded_rss = rss_mb()
+
+    # Warm-up pass so one-time graph/kernel setup isn't timed
+    model.encode(texts[:BATCH_SIZE], batch_size=BATCH_SIZE)
+
+    start = time.time()
+    embeddings = np.asarray(model.encode(texts, batch_size=BATCH_SIZE), dtype=np.float32)
+    encode_time = time.time() - start
+
+    return {
+        'backend': used,
+        'load_time': load_time,
+        'texts_per_sec': len(texts) / encode_time if encode_time > 0 else float('inf'),
+        'model_rss_mb': loaded_rss - base_rss,
+        'peak_rss_mb': peak_rss_mb(),
+        'embeddings': embeddings,
+    }
+
+
+def benchmark(backends, sample_size=DEFAULT_SAMPLE_SIZE):
+    """
+    Benchmark the given backends against fp32
+
+    Returns:
+        True if every backend passed the parity check
+    """
+    from text_encoder import parity_check, PARITY_TOLERANCE
+
+    texts = load_sample_texts(sample_size)
+    print(f"📝 Encoding {len(texts)} descriptions per backend (batch size {BATCH_SIZE})")
+
+    if 'fp32' not in backends:
+        backends = ['fp32'] + list(backends)
+
+    ctx = mp.get_context('spawn')
+    results = {}
+    for backend in backends:
+        with ctx.Pool(1) as pool:
+            results[backend] = pool.apply(run_backend, (backend, texts))
+
+    reference = results['fp32']['embeddings']
+    all_passed = True
+
+    print(f"\n{'Backend':<8} {'Used':<6} {'Load s':>7} {'Texts/s':>9} {'Speedup':>8} "
+          f"{'Model MB':>9} {'Peak MB':>8} {'Max Δcos':>9}  Parity")
+    print("-" * 84)
+    for backend in backends:
+        r = results[backend]
+        parity = parity_check(reference, r['embeddings'])
+        all_passed = all_passed and parity['passed']
+        speedup = r['texts_per_sec'] / results['fp32']['texts_per_sec']
+        print(f"{backend:<8} {r['backend']:<6} {r['load_time']:>7.2f} {r['texts_per_sec']:>9.1f} "
+              f"{speedup:>7.2f}x {r['model_rss_mb']:>9.1f} {r['peak_rss_mb']:>8.1f} "
+              f"{parity['max_abs_diff']:>9.4f}  {'✅' if parity['passed'] else '❌'}")
+
+    print(f"\nParity tolerance: {PARITY_TOLERANCE}")
+    return all_passed
+
+
+if __name__ == '__main__':
+    sample_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SAMPLE_SIZE
+    backends = sys.argv[2:] or ['fp32', 'int8', 'onnx']
+
+    ok = benchmark(backends, sample_size)
+    sys.exit(0 if ok else 1)
@@ -1,14 +1,22 @@
 """
 Combined Scheduler for TrackeBack
-Runs both cleanup and ML matching tasks
+Runs cleanup, ML matching and the nightly taxonomy count reconcile
+
+ML matching is ml_scheduler.py's pipeline (stores matches and queues match emails)
+and only rescans items that changed since the previous run (see item_change_log.py).
+To rescan everything once:
+    python combined_scheduler.py --full
 """
 
 import sqlite3
 import os
+import sys
 import time
 from datetime import datetime
 import schedule
 from ml_matching_service import MLMatchingService
+from ml_scheduler import run_ml_matching
+from taxonomy_counts import TaxonomyCounts
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'traceback_100k.db')
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
@@ -64,80 +72,14 @@ def cleanup_old_claimed_items():
         return 0
 
 
-def run_ml_matching():
-    """
-    Run ML matching for all unclaimed found items against all lost items
-    Stores matches with scores >= 60% for display in dashboard
-    """
+def reconcile_taxonomy_counts():
+    """Rebuild the per-category / per-location item counters from the item tables"""
     try:
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"\n[{timestamp}] 🤖 Starting ML Matching Process...")
-        
-        # Initialize ML service
-        ml_service = MLMatchingService(
-            db_path=DB_PATH,
-            upload_folder=UPLOAD_FOLDER
-        )
-        
-        # Get all unclaimed found items
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        found_items = cursor.execute("""
-            SELECT rowid as id FROM found_items 
-            WHERE status != 'CLAIMED'
-        """).fetchall()
-        
-        lost_items = cursor.execute("""
-            SELECT rowid as id FROM lost_items
-        """).fetchall()
-        
-        conn.close()
-        
-        found_count = len(found_items)
-        lost_count = len(lost_items)
-        
-        print(f"[{timestamp}] 📊 Processing {found_count} found items against {lost_count} lost items...")
-        
-        # Process matches
-        total_matches = 0
-        high_confidence = 0  # >= 80%
-        
-        for found_item in found_items:
-            found_id = found_item[0]
-            try:
-                matches = ml_service.find_matches_for_found_item(
-                    found_item_id=found_id,
-                    min_score=0.6,  # 60% threshold
-                    top_k=10
-                )
-                
-                if matches:
-                    total_matches += len(matches)
-                    high_confidence += len([m for m in matches if m['match_score'] >= 0.8])
-                    
-                    # Log all matches above 60%
-                    for match in matches:
-                        score_pct = match['match_score'] * 100
-                        if match['match_score'] >= 0.8:
-                            print(f"   🎯 High confidence match: Found #{found_id} ↔ Lost #{match['lost_item_id']} ({score_pct:.1f}%)")
-                        else:
-                            print(f"   ✓ Match found: Found #{found_id} ↔ Lost #{match['lost_item_id']} ({score_pct:.1f}%)")
-                
-            except Exception as e:
-                print(f"   ⚠️  Error matching found item #{found_id}: {e}")
-        
-        print(f"[{timestamp}] ✅ ML Matching Complete!")
-        print(f"   📈 Total matches found (≥60%): {total_matches}")
-        print(f"   ⭐ High confidence matches (≥80%): {high_confidence}")
-        print(f"   📊 Average matches per found item: {total_matches/found_count if found_count > 0 else 0:.2f}")
-        
-        return total_matches
-        
+        print(f"\n[{timestamp}] 🧮 Reconciling taxonomy counts...")
+        return TaxonomyCounts(DB_PATH).reconcile()
     except Exception as e:
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ❌ Error in ML matching: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ❌ Error reconciling taxonomy counts: {e}")
         return 0
 
 
@@ -149,18 +91,25 @@ def run_combined_scheduler():
     print("\n📋 Scheduled Tasks:")
     print("   🤖 ML Matching: Every 1 hour")
     print("   🗑️  Cleanup: Every day at 2:00 AM")
+    print("   🧮 Taxonomy count reconcile: Every day at 3:00 AM")
     print("\nPress Ctrl+C to stop the scheduler\n")
     print("=" * 60)
     
+    # Load the models once and reuse them for every run
+    ml_service = MLMatchingService(db_path=DB_PATH, upload_folder=UPLOAD_FOLDER)
+    
     # Schedule ML matching every hour
-    schedule.every().hour.do(run_ml_matching)
+    schedule.every().hour.do(run_ml_matching, ml_service=ml_service)
     
     # Schedule cleanup every day at 2:00 AM
     schedule.every().day.at("02:00").do(cleanup_old_claimed_items)
     
+    # Rebuild category/location counters after the nightly cleanup
+    schedule.every().day.at("03:00").do(reconcile_taxonomy_counts)
+    
     # Run both tasks immediately on start
     print("\n🚀 Running initial tasks...")
-    run_ml_matching()
+    run_ml_matching(ml_service=ml_service)
     cleanup_old_claimed_items()
     
     print("\n⏳ All scheduled tasks active. Waiting for next run...\n")
@@ -177,6 +126,11 @@ if __name__ == '__main__':
         print(f"Expected: {DB_PATH}")
         exit(1)
     
+    # One-off full rescan instead of the scheduler
+    if '--full' in sys.argv:
+        run_ml_matching(full=True)
+        exit(0)
+    
     try:
         run_combined_scheduler()
     except KeyboardInterrupt:
@@ -8,8 +8,12 @@ from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import sqlite3
 import os
+import threading
 from datetime import datetime, timedelta
 import json
+import time
+import base64
+import hashlib
 from email_verification_service import EmailVerificationService
 from user_management import create_user, get_user_by_email, verify_password, update_last_login, verify_user_email, get_user_stats
 from werkzeug.utils import secure_filename
@@ -17,6 +21,16 @@ from werkzeug.security import generate_password_hash
 import uuid
 from profile_manager import create_profile_endpoints
 from ml_matching_service import MLMatchingService
+from item_change_log import ItemChangeLog
+from item_search import ItemSearchIndex, build_match_query, escape_highlights
+from taxonomy_counts import TaxonomyCounts
+from stats_snapshot import StatsSnapshot
+from due_events import DueEventQueue
+from job_queue import JobQueue
+from email_outbox import get_outbox
+import db_pool
+import endpoint_queries as queries
+from db_migrations import run_migrations
 import pytz
 
 # Timezone configuration - All times in ET (Eastern Time)
@@ -41,6 +55,9 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'dev-secret-key-2025-comprehensive'
 CORS(app)
 
+# Request connections go back to the pool when the request ends
+db_pool.init_app(app)
+
 # File upload configuration
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
@@ -78,23 +95,92 @@ def save_uploaded_file(file):
 # Initialize email verification service
 verification_service = EmailVerificationService(DB_PATH)
 
+# Apply pending schema migrations (indexes etc.) before serving requests
+if os.path.exists(DB_PATH):
+    try:
+        run_migrations(DB_PATH)
+    except Exception as e:
+        print(f"⚠️ Could not apply schema migrations: {e}")
+
+# Record item inserts/edits/deletes for incremental ML matching (installs triggers once)
+if os.path.exists(DB_PATH):
+    try:
+        ItemChangeLog(DB_PATH)
+    except Exception as e:
+        print(f"⚠️ Could not initialize item change log (non-critical): {e}")
+
+# Full-text search over items (FTS5 tables kept in sync by triggers; LIKE fallback if unavailable)
+search_index = None
+if os.path.exists(DB_PATH):
+    try:
+        search_index = ItemSearchIndex(DB_PATH)
+    except Exception as e:
+        print(f"⚠️ Could not initialize search index (non-critical): {e}")
+
+def fts_available():
+    """True if the FTS5 search tables can be used"""
+    return search_index is not None and search_index.available
+
+# Per-category / per-location item counts maintained by triggers (see taxonomy_counts.py)
+taxonomy_counter = None
+if os.path.exists(DB_PATH):
+    try:
+        taxonomy_counter = TaxonomyCounts(DB_PATH)
+    except Exception as e:
+        print(f"⚠️ Could not initialize taxonomy counts (non-critical): {e}")
+
+# Due times for public-item and finder-decision notifications (triggers schedule them
+# on item/claim writes; scheduler_runtime.py fires them)
+if os.path.exists(DB_PATH):
+    try:
+        DueEventQueue(DB_PATH)
+    except Exception as e:
+        print(f"⚠️ Could not initialize due event queue (non-critical): {e}")
+
 # Initialize ML matching service (lazy loading)
 ml_service = None
+ml_service_lock = threading.Lock()
 notification_service = None
+job_queue = None
+job_queue_lock = threading.Lock()
+
+# Load the ML models in a background thread at startup instead of on the first ML request
+ML_WARMUP = os.environ.get('ML_WARMUP', '0') == '1'
 
 def get_ml_service():
     """Get or initialize ML matching service"""
     global ml_service
     if ml_service is None:
-        try:
-            print("🤖 Initializing ML Matching Service...")
-            ml_service = MLMatchingService(DB_PATH, upload_folder=UPLOAD_FOLDER)
-            print("✅ ML Matching Service initialized!")
-        except Exception as e:
-            print(f"❌ Error initializing ML service: {e}")
-            return None
+        with ml_service_lock:
+            if ml_service is None:
+                try:
+                    print("🤖 Initializing ML Matching Service...")
+                    ml_service = MLMatchingService(DB_PATH, upload_folder=UPLOAD_FOLDER)
+                    print("✅ ML Matching Service initialized!")
+                except Exception as e:
+                    print(f"❌ Error initializing ML service: {e}")
+                    return None
     return ml_service
 
+def warm_up_ml_service():
+    """Load the text and image models in a background thread (API starts serving immediately)"""
+    def load():
+        service = get_ml_service()
+        if service:
+            service.warm_up_image_model()
+            print(f"🤖 ML models warm: {service.model_load_times()}")
+
+    threading.Thread(target=load, name='ml-warmup', daemon=True).start()
+
+def index_item_embedding(item_type, item_id):
+    """Compute the description embedding for a newly reported item so matcher runs reuse it"""
+    try:
+        service = get_ml_service()
+        if service:
+            service.index_item(item_type, item_id)
+    except Exception as e:
+        print(f"⚠️ Error indexing {item_type} item {item_id} embedding (non-critical): {e}")
+
 def get_notification_service():
     """Get or initialize ML notification service"""
     global notification_service
@@ -111,19 +197,55 @@ def get_notification_service():
             return None
     return notification_service
 
+MATCH_NOTIFY_FOUND_JOB = 'match_notify_found'
+
+def run_match_notify_found_job(payload):
+    """Job handler: index a new found item, then email owners of matching lost items"""
+    found_item_id = payload['found_item_id']
+    index_item_embedding('found', found_item_id)
+
+    notif_service = get_notification_service()
+    if notif_service is None:
+        raise RuntimeError('ML notification service not available')
+
+    print(f"📨 Checking for matching lost items to notify (found item {found_item_id})...")
+    notifications_sent = notif_service.notify_matching_lost_item_owners(found_item_id)
+    return {'found_item_id': found_item_id, 'notifications_sent': notifications_sent}
+
+INDEX_LOST_EMBEDDING_JOB = 'index_lost_embedding'
+
+def run_index_lost_embedding_job(payload):
+    """Job handler: compute the description embedding of a new lost item"""
+    lost_item_id = payload['lost_item_id']
+    service = get_ml_service()
+    if service is None:
+        raise RuntimeError('ML matching service not available')
+
+    service.index_item('lost', lost_item_id)
+    return {'lost_item_id': lost_item_id}
+
+def get_job_queue():
+    """Get or initialize the background job queue (starts its workers on first use)"""
+    global job_queue
+    if job_queue is None:
+        with job_queue_lock:
+            if job_queue is None:
+                queue = JobQueue(DB_PATH)
+                queue.register(MATCH_NOTIFY_FOUND_JOB, run_match_notify_found_job)
+                queue.register(INDEX_LOST_EMBEDDING_JOB, run_index_lost_embedding_job)
+                queue.start()
+                job_queue = queue
+    return job_queue
+
 def get_db_connection(use_row_factory=True):
-    """Get database connection with timeout and WAL mode"""
+    """Get pooled database connection (WAL and other PRAGMAs are set once per connection in db_pool)"""
     if not os.path.exists(DB_PATH):
         return None
     
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    conn.execute('PRAGMA journal_mode=WAL')  # Enable Write-Ahead Logging for better concurrency
-    if use_row_factory:
-        conn.row_factory = sqlite3.Row
-    return conn
+    return db_pool.connect(DB_PATH, row_factory=sqlite3.Row if use_row_factory else None)
 
 def get_db():
-    """Get database connection with row factory, timeout, and WAL mode"""
+    """Get pooled database connection with row factory"""
     return get_db_connection(use_row_factory=True)
 
 def dict_from_row(row):
@@ -132,6 +254,139 @@ def dict_from_row(row):
         return None
     return dict(row)
 
+# /api/stats and /health?deep=1 figures, served from memory (see stats_snapshot.py)
+stats_snapshot = StatsSnapshot(DB_PATH, clock=lambda: get_et_now().replace(tzinfo=None))
+
+@app.after_request
+def mark_stats_dirty(response):
+    """Successful writes make the stats snapshot refresh on its next read"""
+    if request.method in ('POST', 'PUT', 'PATCH', 'DELETE') and response.status_code < 400:
+        stats_snapshot.mark_dirty()
+    return response
+
+# Item ids per ml_matches lookup (stays under SQLite's bound-parameter limit)
+MATCH_LOOKUP_CHUNK_SIZE = 500
+
+# Columns returned for the other side of a match, keyed by the side being looked up
+MATCH_COUNTERPART_SQL = {
+    # lost item -> its best found items
+    'lost': ('lost_item_id', 'found_item_id', 'found_items', """
+                   f.rowid as id, f.title, f.description, f.color, f.size,
+                   f.date_found, f.time_found, f.image_filename,
+                   f.finder_name, f.finder_email, f.finder_phone,
+                   f.current_location, f.is_claimed, f.status,
+                   c.name as category_name,
+                   loc.name as location_name"""),
+    # found item -> its best lost items
+    'found': ('found_item_id', 'lost_item_id', 'lost_items', """
+                   f.rowid as id, f.title, f.description, f.color, f.size,
+                   f.date_lost, f.time_lost, f.image_filename,
+                   f.owner_name, f.user_email, f.owner_phone,
+                   f.last_seen_location, f.owner_notes,
+                   c.name as category_name,
+                   loc.name as location_name"""),
+}
+
+def load_top_matches(conn, item_type, item_ids, per_item=5, min_score=0.7):
+    """
+    Load the best pre-computed ML matches for many items at once
+
+    One windowed query per chunk of ids (ROW_NUMBER per item) instead of one
+    query per item.
+
+    Args:
+        conn: Open database connection (row factory set)
+        item_type: 'lost' to get found-item matches for lost items, 'found' for the reverse
+        item_ids: Item ids on the current page
+        per_item: Matches kept per item, best score first
+        min_score: Minimum match_score
+
+    Returns:
+        Dictionary of item_id -> list of match dictionaries (items without matches are absent)
+    """
+    key_column, match_column, match_table, columns = MATCH_COUNTERPART_SQL[item_type]
+    item_ids = list(dict.fromkeys(item_ids))
+    matches = {}
+
+    for start in range(0, len(item_ids), MATCH_LOOKUP_CHUNK_SIZE):
+        chunk = item_ids[start:start + MATCH_LOOKUP_CHUNK_SIZE]
+        placeholders = ','.join('?' * len(chunk))
+        rows = conn.execute(f"""
+            WITH ranked AS (
+                SELECT m.{key_column} AS item_id, m.{match_column} AS match_id,
+                       m.match_score, m.score_breakdown,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY m.{key_column} ORDER BY m.match_score DESC
+                       ) AS rn
+                FROM ml_matches m
+                JOIN {match_table} f ON m.{match_column} = f.rowid
+                WHERE m.{key_column} IN ({placeholders}) AND m.match_score >= ?
+            )
+            SELECT r.item_id, r.match_score, r.score_breakdown,{columns}
+            FROM ranked r
+            JOIN {match_table} f ON r.match_id = f.rowid
+            LEFT JOIN categories c ON f.category_id = c.id
+            LEFT JOIN locations loc ON f.location_id = loc.id
+            WHERE r.rn <= ?
+            ORDER BY r.item_id, r.rn
+        """, (*chunk, min_score, per_item)).fetchall()
+
+        for row in rows:
+            match = dict(row)
+            matches.setdefault(match.pop('item_id'), []).append(match)
+
+    return matches
+
+# Listing totals are cached this long (seconds); pages themselves are always fresh
+LISTING_COUNT_TTL = int(os.environ.get('LISTING_COUNT_TTL', '30'))
+listing_count_cache = {}
+listing_count_lock = threading.Lock()
+
+def encode_page_cursor(created_at, item_id):
+    """Opaque keyset cursor for the row a page ended on"""
+    raw = json.dumps([created_at, item_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_page_cursor(cursor):
+    """
+    Decode a cursor from encode_page_cursor
+    
+    Returns:
+        (created_at, item_id)
+    
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(item_id, int):
+        raise ValueError('Invalid cursor')
+    return created_at, item_id
+
+def get_listing_count(conn, count_query, params):
+    """
+    COUNT(*) for a listing, cached for LISTING_COUNT_TTL seconds per query + filters
+    
+    Totals may lag by up to the TTL; infinite-scroll pages don't need them at all.
+    """
+    key = (count_query, tuple(params))
+    now = time.time()
+    with listing_count_lock:
+        cached = listing_count_cache.get(key)
+        if cached and now - cached[1] < LISTING_COUNT_TTL:
+            return cached[0]
+    
+    total = conn.execute(count_query, params).fetchone()[0]
+    
+    with listing_count_lock:
+        if len(listing_count_cache) > 1000:
+            listing_count_cache.clear()
+        listing_count_cache[key] = (total, now)
+    return total
+
 @app.route('/')
 def home():
     """API home endpoint"""
@@ -159,7 +414,12 @@ def home():
 
 @app.route('/health')
 def health():
-    """Health check with database statistics"""
+    """
+    Liveness check (one trivial query on a pooled connection)
+    
+    ?deep=1 adds database statistics from the stats snapshot, snapshot freshness,
+    pool metrics and the last scheduler job runs.
+    """
     conn = get_db()
     if not conn:
         return jsonify({
@@ -169,35 +429,44 @@ def health():
         }), 500
     
     try:
-        cursor = conn.cursor()
-        
-        # Get counts
-        cursor.execute('SELECT COUNT(*) as count FROM lost_items')
-        lost_count = cursor.fetchone()['count']
-        
-        cursor.execute('SELECT COUNT(*) as count FROM found_items')
-        found_count = cursor.fetchone()['count']
-        
-        cursor.execute('SELECT COUNT(*) as count FROM categories')
-        categories_count = cursor.fetchone()['count']
-        
-        cursor.execute('SELECT COUNT(*) as count FROM locations')
-        locations_count = cursor.fetchone()['count']
-        
+        conn.execute('SELECT 1').fetchone()
         conn.close()
         
-        return jsonify({
+        result = {
             'status': 'healthy',
             'database': 'connected',
-            'statistics': {
-                'total_items': lost_count + found_count,
-                'lost_items': lost_count,
-                'found_items': found_count,
-                'categories': categories_count,
-                'locations': locations_count
-            },
             'timestamp': get_et_now().isoformat()
-        })
+        }
+        
+        if request.args.get('deep', '').lower() in ('1', 'true', 'yes'):
+            snapshot = stats_snapshot.get()
+            counts = snapshot['counts']
+            result['statistics'] = {
+                'total_items': counts['lost_items'] + counts['found_items'],
+                'lost_items': counts['lost_items'],
+                'found_items': counts['found_items'],
+                'categories': counts['categories'],
+                'locations': counts['locations']
+            }
+            result['stats_snapshot'] = {
+                'generated_at': snapshot['generated_at'],
+                'age_seconds': snapshot['age_seconds'],
+                'stale': snapshot['stale'],
+                **stats_snapshot.get_metrics()
+            }
+            result['db_pool'] = db_pool.get_pool(DB_PATH).get_metrics()
+
+            # Last runs recorded by scheduler_runtime.py (table only exists once it has run)
+            conn = get_db()
+            try:
+                result['scheduler_jobs'] = [dict_from_row(row) for row in conn.execute(
+                    'SELECT * FROM scheduler_job_runs ORDER BY job_name'
+                ).fetchall()]
+            except sqlite3.OperationalError:
+                result['scheduler_jobs'] = []
+            conn.close()
+
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({
@@ -206,61 +475,77 @@ def health():
             'timestamp': get_et_now().isoformat()
         }), 500
 
-@app.route('/api/categories')
-def get_categories():
-    """Get all categories"""
-    conn = get_db()
-    if not conn:
-        return jsonify({'error': 'Database not available'}), 500
+# Seconds /api/categories and /api/locations responses are reused (ENV: TAXONOMY_CACHE_TTL)
+TAXONOMY_CACHE_TTL = int(os.environ.get('TAXONOMY_CACHE_TTL', '60'))
+taxonomy_cache = {}
+taxonomy_cache_lock = threading.Lock()
+
+def taxonomy_query(dimension):
+    """Categories/locations with lost_count and found_count, from taxonomy_counts when available"""
+    if taxonomy_counter is not None:
+        return taxonomy_counter.counts_query(dimension)
+    table = 'categories' if dimension == 'category' else 'locations'
+    column = f'{dimension}_id'
+    return f'''
+        SELECT t.*, 
+               (SELECT COUNT(*) FROM lost_items WHERE {column} = t.id) as lost_count,
+               (SELECT COUNT(*) FROM found_items WHERE {column} = t.id) as found_count
+        FROM {table} t 
+        ORDER BY t.name
+    '''
+
+def taxonomy_response(dimension):
+    """
+    JSON list of categories or locations with item counts
     
-    try:
-        categories = conn.execute('''
-            SELECT c.*, 
-                   (SELECT COUNT(*) FROM lost_items WHERE category_id = c.id) as lost_count,
-                   (SELECT COUNT(*) FROM found_items WHERE category_id = c.id) as found_count
-            FROM categories c 
-            ORDER BY c.name
-        ''').fetchall()
-        
+    The body is built at most once per TAXONOMY_CACHE_TTL seconds per process and
+    sent with an ETag, so clients revalidating an unchanged list get a 304.
+    """
+    now = time.time()
+    with taxonomy_cache_lock:
+        cached = taxonomy_cache.get(dimension)
+    
+    if not cached or now - cached[2] >= TAXONOMY_CACHE_TTL:
+        conn = get_db()
+        if not conn:
+            return jsonify({'error': 'Database not available'}), 500
+        rows = conn.execute(taxonomy_query(dimension)).fetchall()
         conn.close()
         
         result = []
-        for cat in categories:
-            cat_dict = dict_from_row(cat)
-            cat_dict['total_items'] = cat_dict['lost_count'] + cat_dict['found_count']
-            result.append(cat_dict)
-        
-        return jsonify(result)
-        
+        for row in rows:
+            row_dict = dict_from_row(row)
+            row_dict['total_items'] = row_dict['lost_count'] + row_dict['found_count']
+            result.append(row_dict)
+        
+        body = jsonify(result).get_data()
+        etag = hashlib.md5(body).hexdigest()
+        cached = (body, etag, now)
+        with taxonomy_cache_lock:
+            taxonomy_cache[dimension] = cached
+    
+    body, etag, _ = cached
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={TAXONOMY_CACHE_TTL}'
+    return response
+
+@app.route('/api/categories')
+def get_categories():
+    """Get all categories"""
+    try:
+        return taxonomy_response('category')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/locations')
 def get_locations():
     """Get all Kent State locations"""
-    conn = get_db()
-    if not conn:
-        return jsonify({'error': 'Database not available'}), 500
-    
     try:
-        locations = conn.execute('''
-            SELECT l.*, 
-                   (SELECT COUNT(*) FROM lost_items WHERE location_id = l.id) as lost_count,
-                   (SELECT COUNT(*) FROM found_items WHERE location_id = l.id) as found_count
-            FROM locations l 
-            ORDER BY l.name
-        ''').fetchall()
-        
-        conn.close()
-        
-        result = []
-        for loc in locations:
-            loc_dict = dict_from_row(loc)
-            loc_dict['total_items'] = loc_dict['lost_count'] + loc_dict['found_count']
-            result.append(loc_dict)
-        
-        return jsonify(result)
-        
+        return taxonomy_response('location')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -279,9 +564,14 @@ def get_lost_items():
         # Parse query parameters
         user_email = request.args.get('user_email', '').strip()
         page = int(request.args.get('page', 1))
-        limit = min(int(request.args.get('limit', 100)), 500)
+        limit = max(1, min(int(request.args.get('limit', 100)), 500))
         include_matches = request.args.get('include_matches', 'false').lower() == 'true'
         
+        # Keyset pagination: ?cursor= (empty for the first page), then next_cursor from the response
+        use_cursor = 'cursor' in request.args
+        cursor_token = request.args.get('cursor', '').strip()
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
+        
         # PRIVACY: Lost items are ONLY visible to the owner
         if not user_email:
             # No user email = no access to lost items (they are private)
@@ -292,19 +582,34 @@ def get_lost_items():
         
         offset = (page - 1) * limit
         
-        # Get total count - only for this user's lost items
-        total = conn.execute('SELECT COUNT(*) as total FROM lost_items WHERE is_resolved = 0 AND user_email = ?', (user_email,)).fetchone()['total']
+        # Get total count - only for this user's lost items (skipped for cursor pages unless asked for)
+        total = None
+        if not use_cursor or include_total:
+            total = conn.execute('SELECT COUNT(*) as total FROM lost_items WHERE is_resolved = 0 AND user_email = ?', (user_email,)).fetchone()['total']
         
         # Get lost items - only for this user
-        items = conn.execute("""
-            SELECT l.rowid as id, l.*, c.name as category_name, loc.name as location_name
-            FROM lost_items l
-            LEFT JOIN categories c ON l.category_id = c.id
-            LEFT JOIN locations loc ON l.location_id = loc.id
-            WHERE l.is_resolved = 0 AND l.user_email = ?
-            ORDER BY l.created_at DESC
-            LIMIT ? OFFSET ?
-        """, (user_email, limit, offset)).fetchall()
+        if use_cursor:
+            keyset_condition = ''
+            params = [user_email]
+            if cursor_token:
+                try:
+                    after_created_at, after_id = decode_page_cursor(cursor_token)
+                except ValueError as e:
+                    conn.close()
+                    return jsonify({'error': str(e)}), 400
+                keyset_condition = queries.LOST_ITEMS_KEYSET_CONDITION
+                params.extend([after_created_at, after_id])
+            
+            # One extra row tells us whether there is a next page
+            items = conn.execute(
+                queries.LOST_ITEMS_DASHBOARD_PAGE_SQL.format(keyset_condition=keyset_condition),
+                (*params, limit + 1)
+            ).fetchall()
+            has_next = len(items) > limit
+            items = items[:limit]
+            next_cursor = encode_page_cursor(items[-1]['created_at'], items[-1]['id']) if has_next else None
+        else:
+            items = conn.execute(queries.LOST_ITEMS_DASHBOARD_SQL, (user_email, limit, offset)).fetchall()
         
         conn.close()
         
@@ -333,33 +638,28 @@ def get_lost_items():
         if include_matches:
             conn2 = get_db()
             if conn2:
-                for item in items_list:
-                    try:
-                        match_rows = conn2.execute("""
-                            SELECT m.match_score, m.score_breakdown,
-                                   f.rowid as id, f.title, f.description, f.color, f.size,
-                                   f.date_found, f.time_found, f.image_filename,
-                                   f.finder_name, f.finder_email, f.finder_phone,
-                                   f.current_location, f.is_claimed, f.status,
-                                   c.name as category_name,
-                                   loc.name as location_name
-                            FROM ml_matches m
-                            JOIN found_items f ON m.found_item_id = f.rowid
-                            LEFT JOIN categories c ON f.category_id = c.id
-                            LEFT JOIN locations loc ON f.location_id = loc.id
-                            WHERE m.lost_item_id = ? AND m.match_score >= 0.7
-                            ORDER BY m.match_score DESC
-                            LIMIT 5
-                        """, (item['id'],)).fetchall()
-                        
-                        matches = [dict(row) for row in match_rows]
-                        item['ml_matches'] = matches
-                        item['match_count'] = len(matches)
-                    except Exception as e:
-                        print(f"Error reading matches for lost item {item['id']}: {e}")
-                        item['ml_matches'] = []
-                        item['match_count'] = 0
+                try:
+                    matches_by_item = load_top_matches(conn2, 'lost', [item['id'] for item in items_list], per_item=5)
+                except Exception as e:
+                    print(f"Error reading matches for lost items: {e}")
+                    matches_by_item = {}
                 conn2.close()
+                
+                for item in items_list:
+                    matches = matches_by_item.get(item['id'], [])
+                    item['ml_matches'] = matches
+                    item['match_count'] = len(matches)
+        
+        if use_cursor:
+            return jsonify({
+                'items': items_list,
+                'pagination': {
+                    'limit': limit,
+                    'total': total,
+                    'has_next': has_next,
+                    'next_cursor': next_cursor
+                }
+            })
         
         return jsonify({
             'items': items_list,
@@ -390,7 +690,7 @@ def get_found_items():
     try:
         # Parse query parameters
         page = int(request.args.get('page', 1))
-        limit = min(int(request.args.get('limit', 100)), 500)  # Default 100, Max 500 items per page
+        limit = max(1, min(int(request.args.get('limit', 100)), 500))  # Default 100, 1-500 items per page
         category_id = request.args.get('category_id')
         location_id = request.args.get('location_id')
         color = request.args.get('color')
@@ -398,16 +698,16 @@ def get_found_items():
         include_private = request.args.get('include_private', 'false').lower() == 'true'  # For ML matching
         user_email = request.args.get('user_email', '').strip()  # Current user's email for matching
         
+        # Keyset pagination: ?cursor= (empty for the first page), then next_cursor from the response
+        use_cursor = 'cursor' in request.args
+        cursor_token = request.args.get('cursor', '').strip()
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
+        
         # Build query - exclude claimed items and items in claim window
-        where_conditions = ["(f.status IS NULL OR f.status != 'CLAIMED')"]  # Only unclaimed items
+        where_conditions = [queries.UNCLAIMED_FILTER]  # Only unclaimed items
         
         # Exclude items with potential claimers (in claim window)
-        where_conditions.append("""f.rowid NOT IN (
-            SELECT found_item_id 
-            FROM claim_attempts 
-            WHERE success = 1 
-              AND marked_as_potential_at IS NOT NULL
-        )""")
+        where_conditions.append(queries.CLAIM_WINDOW_FILTER)
         
         params = []
         
@@ -417,8 +717,8 @@ def get_found_items():
         # 2. Moderators viewing abuse reports
         # This check is ONLY for public browse, not for dashboard or admin views
         if not include_private:  # Public browse view
-            # Use localtime to match the timezone of created_at timestamps
-            where_conditions.append("datetime(f.created_at) <= datetime('now', 'localtime', '-3 days')")
+            # public_at = created_at + 3 days (local time, indexed), so compare it directly
+            where_conditions.append(queries.PUBLIC_BROWSE_FILTER)
         
         if category_id:
             where_conditions.append('f.category_id = ?')
@@ -433,23 +733,42 @@ def get_found_items():
             params.append(color)
         
         if search:
-            where_conditions.append('(LOWER(f.title) LIKE LOWER(?) OR LOWER(f.description) LIKE LOWER(?))')
-            search_term = f'%{search}%'
-            params.extend([search_term, search_term])
+            match_query = build_match_query(search, columns=['title', 'description']) if fts_available() else None
+            if match_query:
+                where_conditions.append('f.rowid IN (SELECT rowid FROM found_items_fts WHERE found_items_fts MATCH ?)')
+                params.append(match_query)
+            else:
+                where_conditions.append('(LOWER(f.title) LIKE LOWER(?) OR LOWER(f.description) LIKE LOWER(?))')
+                search_term = f'%{search}%'
+                params.extend([search_term, search_term])
         
         where_clause = ' AND '.join(where_conditions)
         offset = (page - 1) * limit
         
-        # Get total count
-        count_query = f'''
-            SELECT COUNT(*) as total
-            FROM found_items f
-            JOIN categories c ON f.category_id = c.id
-            JOIN locations loc ON f.location_id = loc.id
-            WHERE {where_clause}
-        '''
+        # Get total count (cached briefly; skipped for cursor pages unless asked for)
+        count_query = queries.FOUND_ITEMS_BROWSE_COUNT_SQL.format(where_clause=where_clause)
         
-        total = conn.execute(count_query, params).fetchone()['total']
+        total = None
+        if not use_cursor or include_total:
+            total = get_listing_count(conn, count_query, params)
+        
+        if use_cursor:
+            if cursor_token:
+                try:
+                    after_created_at, after_id = decode_page_cursor(cursor_token)
+                except ValueError as e:
+                    conn.close()
+                    return jsonify({'error': str(e)}), 400
+                where_clause += ' AND (f.created_at, f.rowid) < (?, ?)'
+                params.extend([after_created_at, after_id])
+            order_clause = 'ORDER BY f.created_at DESC, f.rowid DESC'
+            limit_clause = 'LIMIT ?'
+            # One extra row tells us whether there is a next page
+            params.append(limit + 1)
+        else:
+            order_clause = 'ORDER BY f.created_at DESC'
+            limit_clause = 'LIMIT ? OFFSET ?'
+            params.extend([limit, offset])
         
         # Get items
         items_query = f'''
@@ -465,15 +784,19 @@ def get_found_items():
             JOIN categories c ON f.category_id = c.id
             JOIN locations loc ON f.location_id = loc.id
             WHERE {where_clause}
-            ORDER BY f.created_at DESC
-            LIMIT ? OFFSET ?
+            {order_clause}
+            {limit_clause}
         '''
         
-        params.extend([limit, offset])
         items = conn.execute(items_query, params).fetchall()
         
         conn.close()
         
+        if use_cursor:
+            has_next = len(items) > limit
+            items = items[:limit]
+            next_cursor = encode_page_cursor(items[-1]['created_at'], items[-1]['id']) if has_next else None
+        
         # Format and filter items
         items_list = []
         for item in items:
@@ -529,44 +852,38 @@ def get_found_items():
         if include_private:  # Only include matches for dashboard/ML view
             conn2 = get_db()
             if conn2:
-                for item in items_list:
-                    try:
-                        match_rows = conn2.execute("""
-                            SELECT m.match_score, m.score_breakdown,
-                                   l.rowid as id, l.title, l.description, l.color, l.size,
-                                   l.date_lost, l.time_lost, l.image_filename,
-                                   l.owner_name, l.user_email, l.owner_phone,
-                                   l.last_seen_location, l.owner_notes,
-                                   c.name as category_name,
-                                   loc.name as location_name
-                            FROM ml_matches m
-                            JOIN lost_items l ON m.lost_item_id = l.rowid
-                            LEFT JOIN categories c ON l.category_id = c.id
-                            LEFT JOIN locations loc ON l.location_id = loc.id
-                            WHERE m.found_item_id = ? AND m.match_score >= 0.7
-                            ORDER BY m.match_score DESC
-                            LIMIT 5
-                        """, (item['id'],)).fetchall()
-                        
-                        matches = [dict(row) for row in match_rows]
-                        item['ml_matches'] = matches
-                        item['match_count'] = len(matches)
-                    except Exception as e:
-                        print(f"Error reading matches for found item {item['id']}: {e}")
-                        item['ml_matches'] = []
-                        item['match_count'] = 0
+                try:
+                    matches_by_item = load_top_matches(conn2, 'found', [item['id'] for item in items_list], per_item=5)
+                except Exception as e:
+                    print(f"Error reading matches for found items: {e}")
+                    matches_by_item = {}
                 conn2.close()
+                
+                for item in items_list:
+                    matches = matches_by_item.get(item['id'], [])
+                    item['ml_matches'] = matches
+                    item['match_count'] = len(matches)
         
-        return jsonify({
-            'items': items_list,
-            'pagination': {
+        if use_cursor:
+            pagination = {
+                'limit': limit,
+                'total': total,
+                'has_next': has_next,
+                'next_cursor': next_cursor
+            }
+        else:
+            pagination = {
                 'page': page,
                 'limit': limit,
                 'total': total,
                 'pages': (total + limit - 1) // limit,
                 'has_next': page * limit < total,
                 'has_prev': page > 1
-            },
+            }
+        
+        return jsonify({
+            'items': items_list,
+            'pagination': pagination,
             'filters': {
                 'category_id': category_id,
                 'location_id': location_id,
@@ -652,7 +969,7 @@ def delete_lost_item(item_id):
         if not user_email:
             return jsonify({'error': 'User email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -1148,7 +1465,12 @@ def create_security_questions_bulk():
 
 @app.route('/api/search')
 def search_items():
-    """Universal search across lost and found items"""
+    """
+    Universal search across lost and found items
+    
+    Uses the FTS5 index (BM25-ranked, prefix matching, highlighted title and
+    snippet) when available, otherwise LIKE matching ordered by newest first.
+    """
     conn = get_db()
     if not conn:
         return jsonify({'error': 'Database not available'}), 500
@@ -1156,53 +1478,87 @@ def search_items():
     try:
         query = request.args.get('q', '').strip()
         item_type = request.args.get('type', 'all')  # 'lost', 'found', 'all'
-        limit = min(int(request.args.get('limit', 100)), 500)  # Default 100, Max 500 items per page
+        limit = max(1, min(int(request.args.get('limit', 100)), 500))  # Default 100, 1-500 items per page
         
         if not query:
             return jsonify({'error': 'Search query required'}), 400
         
         results = {'lost_items': [], 'found_items': [], 'total': 0}
         search_term = f'%{query}%'
+        match_query = build_match_query(query) if fts_available() else None
+        results['search_mode'] = 'fulltext' if match_query else 'like'
         
         if item_type in ['lost', 'all']:
-            lost_items = conn.execute('''
-                SELECT l.*, c.name as category_name, loc.name as location_name
-                FROM lost_items l
-                JOIN categories c ON l.category_id = c.id
-                JOIN locations loc ON l.location_id = loc.id
-                WHERE l.is_resolved = 0 
-                AND (LOWER(l.title) LIKE LOWER(?) OR LOWER(l.description) LIKE LOWER(?) 
-                     OR LOWER(c.name) LIKE LOWER(?) OR LOWER(loc.name) LIKE LOWER(?))
-                ORDER BY l.created_at DESC
-                LIMIT ?
-            ''', (search_term, search_term, search_term, search_term, limit)).fetchall()
+            if match_query:
+                lost_items = conn.execute(f'''
+                    SELECT l.*, c.name as category_name, loc.name as location_name,
+                           {search_index.ranked_columns('lost')}
+                    FROM lost_items_fts
+                    JOIN lost_items l ON l.rowid = lost_items_fts.rowid
+                    JOIN categories c ON l.category_id = c.id
+                    JOIN locations loc ON l.location_id = loc.id
+                    WHERE lost_items_fts MATCH ?
+                    AND l.is_resolved = 0
+                    ORDER BY search_rank
+                    LIMIT ?
+                ''', (match_query, limit)).fetchall()
+            else:
+                lost_items = conn.execute('''
+                    SELECT l.*, c.name as category_name, loc.name as location_name
+                    FROM lost_items l
+                    JOIN categories c ON l.category_id = c.id
+                    JOIN locations loc ON l.location_id = loc.id
+                    WHERE l.is_resolved = 0 
+                    AND (LOWER(l.title) LIKE LOWER(?) OR LOWER(l.description) LIKE LOWER(?) 
+                         OR LOWER(c.name) LIKE LOWER(?) OR LOWER(loc.name) LIKE LOWER(?))
+                    ORDER BY l.created_at DESC
+                    LIMIT ?
+                ''', (search_term, search_term, search_term, search_term, limit)).fetchall()
             
-            results['lost_items'] = [dict_from_row(item) for item in lost_items]
+            results['lost_items'] = [escape_highlights(dict_from_row(item)) for item in lost_items]
         
         if item_type in ['found', 'all']:
-            found_items = conn.execute('''
-                SELECT f.*, c.name as category_name, loc.name as location_name
-                FROM found_items f
-                JOIN categories c ON f.category_id = c.id
-                JOIN locations loc ON f.location_id = loc.id
-                WHERE f.is_claimed = 0
-                AND (LOWER(f.title) LIKE LOWER(?) OR LOWER(f.description) LIKE LOWER(?) 
-                     OR LOWER(c.name) LIKE LOWER(?) OR LOWER(loc.name) LIKE LOWER(?))
-                ORDER BY f.created_at DESC
-                LIMIT ?
-            ''', (search_term, search_term, search_term, search_term, limit)).fetchall()
+            if match_query:
+                found_items = conn.execute(f'''
+                    SELECT f.*, c.name as category_name, loc.name as location_name,
+                           {search_index.ranked_columns('found')}
+                    FROM found_items_fts
+                    JOIN found_items f ON f.rowid = found_items_fts.rowid
+                    JOIN categories c ON f.category_id = c.id
+                    JOIN locations loc ON f.location_id = loc.id
+                    WHERE found_items_fts MATCH ?
+                    AND f.is_claimed = 0
+                    ORDER BY search_rank
+                    LIMIT ?
+                ''', (match_query, limit)).fetchall()
+            else:
+                found_items = conn.execute('''
+                    SELECT f.*, c.name as category_name, loc.name as location_name
+                    FROM found_items f
+                    JOIN categories c ON f.category_id = c.id
+                    JOIN locations loc ON f.location_id = loc.id
+                    WHERE f.is_claimed = 0
+                    AND (LOWER(f.title) LIKE LOWER(?) OR LOWER(f.description) LIKE LOWER(?) 
+                         OR LOWER(c.name) LIKE LOWER(?) OR LOWER(loc.name) LIKE LOWER(?))
+                    ORDER BY f.created_at DESC
+                    LIMIT ?
+                ''', (search_term, search_term, search_term, search_term, limit)).fetchall()
             
             # Apply privacy filtering to found items
             filtered_found = []
             for item in found_items:
-                item_dict = dict_from_row(item)
+                item_dict = escape_highlights(dict_from_row(item))
                 
                 if item_dict.get('is_private'):
                     if item_dict.get('privacy_expires_at'):
+                        # privacy_expires_at is stored as naive ET time
                         expires_at = datetime.fromisoformat(item_dict['privacy_expires_at'].replace('Z', '+00:00'))
-                        if get_et_now() < expires_at.replace(tzinfo=None):
+                        if get_et_now().replace(tzinfo=None) < expires_at.replace(tzinfo=None):
                             item_dict['description'] = 'Details hidden - verify ownership to view'
                             item_dict['finder_name'] = 'Anonymous'
+                            # The snippet is cut from the description, so hide it too
+                            if 'snippet' in item_dict:
+                                item_dict['snippet'] = None
                 
                 filtered_found.append(item_dict)
             
@@ -1218,108 +1574,23 @@ def search_items():
 
 @app.route('/api/stats')
 def get_stats():
-    """Get comprehensive system statistics"""
-    conn = get_db()
-    if not conn:
+    """
+    Get comprehensive system statistics
+    
+    Served from the in-memory stats snapshot; `snapshot` says how old the
+    figures are and whether a refresh is under way.
+    """
+    if not os.path.exists(DB_PATH):
         return jsonify({'error': 'Database not available'}), 500
     
     try:
-        stats = {}
-        
-        # Calculate date 7 days ago in ET
-        from datetime import datetime, timedelta
-        seven_days_ago = (get_et_now() - timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Total found items (including historical ones from successful_returns)
-        active_found = conn.execute('SELECT COUNT(*) as count FROM found_items').fetchone()['count']
-        finalized_found = conn.execute('SELECT COUNT(*) as count FROM successful_returns').fetchone()['count']
-        stats['total_found_items'] = active_found + finalized_found
-        
-        # Items successfully claimed (from successful_returns table)
-        stats['items_claimed'] = conn.execute(
-            'SELECT COUNT(*) as count FROM successful_returns'
-        ).fetchone()['count']
-        
-        # Active found items (not yet claimed/finalized)
-        stats['active_found_items'] = conn.execute(
-            'SELECT COUNT(*) as count FROM found_items WHERE is_claimed = 0'
-        ).fetchone()['count']
-        
-        # Found items posted this week (last 7 days) - from both active and finalized
-        recent_active = conn.execute(
-            "SELECT COUNT(*) as count FROM found_items WHERE created_at >= ?",
-            (seven_days_ago,)
-        ).fetchone()['count']
-        
-        recent_finalized = conn.execute(
-            "SELECT COUNT(*) as count FROM successful_returns WHERE finalized_at >= ?",
-            (seven_days_ago,)
-        ).fetchone()['count']
-        
-        stats['found_this_week'] = recent_active + recent_finalized
-        
-        # Legacy stats for compatibility
-        stats['active_lost_items'] = conn.execute(
-            'SELECT COUNT(*) as count FROM lost_items WHERE is_resolved = 0'
-        ).fetchone()['count']
-        
-        stats['unclaimed_found_items'] = stats['active_found_items']
-        stats['recent_found_items'] = stats['found_this_week']
-        
-        stats['total_categories'] = conn.execute(
-            'SELECT COUNT(*) as count FROM categories'
-        ).fetchone()['count']
-        
-        stats['total_locations'] = conn.execute(
-            'SELECT COUNT(*) as count FROM locations'
-        ).fetchone()['count']
-        
-        # Recent activity (last 7 days)
-        stats['recent_lost_items'] = conn.execute(
-            "SELECT COUNT(*) as count FROM lost_items WHERE created_at >= ?",
-            (seven_days_ago,)
-        ).fetchone()['count']
-        
-        # Privacy statistics
-        stats['private_found_items'] = conn.execute(
-            "SELECT COUNT(*) as count FROM found_items WHERE is_private = 1 AND datetime(privacy_expires_at) > datetime('now')"
-        ).fetchone()['count']
-        
-        # Category breakdown
-        category_stats = conn.execute('''
-            SELECT c.name, 
-                   COUNT(CASE WHEN l.id IS NOT NULL THEN 1 END) as lost_count,
-                   COUNT(CASE WHEN f.id IS NOT NULL THEN 1 END) as found_count
-            FROM categories c
-            LEFT JOIN lost_items l ON c.id = l.category_id AND l.is_resolved = 0
-            LEFT JOIN found_items f ON c.id = f.category_id AND f.is_claimed = 0
-            GROUP BY c.id, c.name
-            ORDER BY (COUNT(CASE WHEN l.id IS NOT NULL THEN 1 END) + COUNT(CASE WHEN f.id IS NOT NULL THEN 1 END)) DESC
-            LIMIT 5
-        ''').fetchall()
-        
-        stats['top_categories'] = [dict_from_row(cat) for cat in category_stats]
-        
-        # Location breakdown
-        location_stats = conn.execute('''
-            SELECT loc.name, loc.building_code,
-                   COUNT(CASE WHEN l.id IS NOT NULL THEN 1 END) as lost_count,
-                   COUNT(CASE WHEN f.id IS NOT NULL THEN 1 END) as found_count
-            FROM locations loc
-            LEFT JOIN lost_items l ON loc.id = l.location_id AND l.is_resolved = 0
-            LEFT JOIN found_items f ON loc.id = f.location_id AND f.is_claimed = 0
-            GROUP BY loc.id, loc.name, loc.building_code
-            ORDER BY (COUNT(CASE WHEN l.id IS NOT NULL THEN 1 END) + COUNT(CASE WHEN f.id IS NOT NULL THEN 1 END)) DESC
-            LIMIT 5
-        ''').fetchall()
-        
-        stats['top_locations'] = [dict_from_row(loc) for loc in location_stats]
-        
-        # Calculate totals
-        stats['total_items'] = stats['active_lost_items'] + stats['unclaimed_found_items']
-        stats['recent_total'] = stats['recent_lost_items'] + stats['recent_found_items']
-        
-        conn.close()
+        snapshot = stats_snapshot.get()
+        stats = dict(snapshot['stats'])
+        stats['snapshot'] = {
+            'generated_at': snapshot['generated_at'],
+            'age_seconds': snapshot['age_seconds'],
+            'stale': snapshot['stale']
+        }
         return jsonify(stats)
         
     except Exception as e:
@@ -1389,7 +1660,7 @@ def login():
                 }), 403
             else:
                 # Suspension expired, remove suspension
-                conn = sqlite3.connect(DB_PATH)
+                conn = db_pool.connect(DB_PATH)
                 cursor = conn.cursor()
                 cursor.execute('UPDATE users SET is_suspended = 0, suspension_until = NULL WHERE email = ?', (email,))
                 conn.commit()
@@ -1641,7 +1912,7 @@ def auth_resend():
     
     # Clear old codes for this email
     import sqlite3
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("DELETE FROM email_verifications WHERE email = ? AND is_verified = FALSE", (email,))
     conn.commit()
@@ -1832,7 +2103,7 @@ def resend_verification():
         return jsonify({'error': 'Email is required'}), 400
     
     # Clear old codes for this email
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("DELETE FROM email_verifications WHERE email = ? AND is_verified = FALSE", (email,))
     conn.commit()
@@ -1957,6 +2228,14 @@ def report_lost_item():
         
         print(f"✅ Lost item created: ID {item_id} - {data.get('title')}")
         
+        # Encode the description on the job workers so the response doesn't wait
+        # on the text model; every later matcher call reuses the embedding
+        try:
+            job_id = get_job_queue().enqueue(INDEX_LOST_EMBEDDING_JOB, {'lost_item_id': item_id})
+            print(f"📨 Queued embedding job {job_id} for lost item {item_id}")
+        except Exception as e:
+            print(f"⚠️ Error queueing lost item embedding (non-critical): {e}")
+        
         return jsonify({
             'message': 'Lost item reported successfully',
             'item_id': item_id,
@@ -2056,6 +2335,7 @@ def report_found_item():
         current_date = get_et_now().strftime('%Y-%m-%d')
         current_time_only = get_et_now().strftime('%H:%M:%S')
         
+        # public_at is set by trigger (created_at + 3 days) for the privacy window filter
         cursor = conn.execute('''
             INSERT INTO found_items (
                 title, description, category_id, location_id, color, size,
@@ -2088,25 +2368,21 @@ def report_found_item():
         
         print(f"✅ Found item created with ID: {item_id}")
         
-        # AUTOMATIC ML NOTIFICATION: Notify matching lost item owners
+        # Embedding, ML matching and owner emails run on the job workers so the
+        # response doesn't wait on the models or SMTP
+        job_id = None
         try:
-            notif_service = get_notification_service()
-            if notif_service:
-                print(f"📨 Checking for matching lost items to notify...")
-                notifications_sent = notif_service.notify_matching_lost_item_owners(item_id)
-                if notifications_sent > 0:
-                    print(f"✅ Sent {notifications_sent} match notifications!")
-                else:
-                    print("ℹ️ No matching lost items found for notification")
+            job_id = get_job_queue().enqueue(MATCH_NOTIFY_FOUND_JOB, {'found_item_id': item_id})
+            print(f"📨 Queued match notification job {job_id} for found item {item_id}")
         except Exception as e:
-            print(f"⚠️ Error sending notifications (non-critical): {e}")
-            # Don't fail the request if notifications fail
+            print(f"⚠️ Error queueing match notifications (non-critical): {e}")
         
         return jsonify({
             'message': 'Found item reported successfully',
             'item_id': item_id,
             'image_uploaded': image_filename is not None,
-            'privacy_expires': privacy_expiry_str
+            'privacy_expires': privacy_expiry_str,
+            'notification_job_id': job_id
         }), 201
         
     except Exception as e:
@@ -2129,8 +2405,7 @@ def uploaded_file(filename):
 def get_reviews():
     """Get all approved reviews"""
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=20)
-        conn.execute('PRAGMA journal_mode=WAL')
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         
         # Get only approved reviews, ordered by most recent first
@@ -2208,8 +2483,7 @@ def create_review():
             print(f"✅ Review image uploaded: {image_filename}")
         
         # Insert review into database
-        conn = sqlite3.connect(DB_PATH, timeout=20)
-        conn.execute('PRAGMA journal_mode=WAL')
+        conn = db_pool.connect(DB_PATH)
         
         cursor = conn.execute('''
             INSERT INTO reviews (user_name, user_email, rating, review_text, item_found, image_filename, is_approved)
@@ -2236,8 +2510,7 @@ def create_review():
 def get_review(review_id):
     """Get a specific review by ID"""
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=20)
-        conn.execute('PRAGMA journal_mode=WAL')
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         
         cursor = conn.execute('''
@@ -2277,7 +2550,7 @@ def is_admin(user_email):
         return False
     
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('SELECT is_moderator FROM users WHERE email = ?', (user_email,))
         user = cursor.fetchone()
@@ -2301,7 +2574,7 @@ def report_abuse():
             if field not in data:
                 return jsonify({'error': f'Missing field: {field}'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -2349,7 +2622,7 @@ def moderation_action():
             if field not in data:
                 return jsonify({'error': f'Missing field: {field}'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Check if user is a moderator
@@ -2421,7 +2694,7 @@ def moderation_action():
         if action_message and target_user_email:
             try:
                 # Import email service
-                from email_verification_service import send_email
+                from email_outbox import queue_email
                 
                 subject = "TraceBack - Moderation Action"
                 body = f"""
@@ -2449,8 +2722,8 @@ Thank you,
 TraceBack Moderation Team
                 """
                 
-                send_email(target_user_email, subject, body)
-                print(f"✅ Email sent to {target_user_email} for action {action_type}")
+                queue_email(target_user_email, subject, body, db_path=DB_PATH)
+                print(f"✅ Email queued for {target_user_email} for action {action_type}")
             except Exception as e:
                 print(f"⚠️ Failed to send email: {e}")
         
@@ -2480,7 +2753,7 @@ def get_claims():
         if not user_email:
             return jsonify({'error': 'User email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -2527,7 +2800,7 @@ def get_notifications():
         if not user_email:
             return jsonify({'error': 'User email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         
         if unread_only:
@@ -2565,7 +2838,7 @@ def get_notifications():
 def mark_notification_read(notification_id):
     """Mark a notification as read"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute(
             "UPDATE notifications SET is_read = 1 WHERE notification_id = ?",
             (notification_id,)
@@ -2588,7 +2861,7 @@ def check_claim_attempt(found_item_id):
         if not user_email:
             return jsonify({'error': 'User email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -2628,7 +2901,7 @@ def get_claim_attempts_for_item(found_item_id):
         if not finder_email:
             return jsonify({'error': 'Finder email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -2725,7 +2998,7 @@ def get_claim_attempts_for_item(found_item_id):
             # Generate conversation ID for this claimer-finder pair
             if attempt_dict['user_id'] and finder_user_id:
                 # Check if conversation already exists
-                temp_conn = sqlite3.connect(DB_PATH)
+                temp_conn = db_pool.connect(DB_PATH)
                 temp_conn.row_factory = sqlite3.Row
                 temp_cursor = temp_conn.cursor()
                 
@@ -2798,7 +3071,7 @@ def get_my_claim_attempts():
         if not user_email:
             return jsonify({'error': 'User email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3058,7 +3331,7 @@ def submit_claim_answers():
         
         # Send email notification to finder
         try:
-            from email_verification_service import send_email
+            from email_outbox import queue_email
             
             finder_name = item_details['finder_name'] or 'Finder'
             finder_email = item_details['finder_email']
@@ -3097,8 +3370,8 @@ Kent State University
 This is an automated notification. Please do not reply to this email.
 """
                 
-                send_email(finder_email, subject, body)
-                print(f"   [EMAIL] Notification sent to finder: {finder_email}")
+                queue_email(finder_email, subject, body, db_path=DB_PATH)
+                print(f"   [EMAIL] Notification queued for finder: {finder_email}")
         
         except Exception as email_error:
             print(f"   [WARNING] Could not send email notification: {email_error}")
@@ -3139,7 +3412,7 @@ def update_claim_attempt():
         if not found_item_id or not user_email:
             return jsonify({'error': 'Found item ID and user email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3167,11 +3440,7 @@ def update_claim_attempt():
         # Just create notification for potential claimer
         if success:
             # Check if this is the FIRST potential claimer
-            cursor.execute('''
-                SELECT COUNT(*) as count
-                FROM claim_attempts
-                WHERE found_item_id = ? AND success = 1
-            ''', (found_item_id,))
+            cursor.execute(queries.POTENTIAL_CLAIMER_COUNT_SQL, (found_item_id,))
             
             is_first_claimer = cursor.fetchone()['count'] == 1
             
@@ -3242,7 +3511,7 @@ def finalize_claim():
         if len(claim_reason.strip()) < 10:
             return jsonify({'error': 'Please provide a detailed reason (at least 10 characters)'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3425,7 +3694,7 @@ def finalize_claim():
         
         # Send email notifications to both finder and claimer
         try:
-            from email_verification_service import send_email
+            from email_outbox import queue_email
             
             # Email to Finder (Owner)
             finder_subject = f"✅ Item Successfully Returned - {item_data['title']}"
@@ -3511,15 +3780,17 @@ This is an automated notification. Please do not reply to this email.
             
             # Send emails
             if owner_email:
-                send_email(owner_email, finder_subject, finder_body)
-                print(f"   [EMAIL] Finalization notification sent to finder: {owner_email}")
+                queue_email(owner_email, finder_subject, finder_body,
+                            dedupe_key=f"claim_finalized:{return_id}:finder", db_path=DB_PATH)
+                print(f"   [EMAIL] Finalization notification queued for finder: {owner_email}")
             
             if user_email:
-                send_email(user_email, claimer_subject, claimer_body)
-                print(f"   [EMAIL] Finalization notification sent to claimer: {user_email}")
+                queue_email(user_email, claimer_subject, claimer_body,
+                            dedupe_key=f"claim_finalized:{return_id}:claimer", db_path=DB_PATH)
+                print(f"   [EMAIL] Finalization notification queued for claimer: {user_email}")
             
             # Send emails to all unsuccessful claimers
-            cursor = sqlite3.connect(DB_PATH).cursor()
+            cursor = db_pool.connect(DB_PATH).cursor()
             cursor.execute('''
                 SELECT DISTINCT ca.user_email, u.full_name
                 FROM claim_attempts ca
@@ -3567,8 +3838,9 @@ This is an automated notification. Please do not reply to this email.
 """
                     
                     try:
-                        send_email(unsuccessful_email, unsuccessful_subject, unsuccessful_body)
-                        print(f"   [EMAIL] Unsuccessful claim notification sent to: {unsuccessful_email}")
+                        queue_email(unsuccessful_email, unsuccessful_subject, unsuccessful_body,
+                                    dedupe_key=f"claim_finalized:{return_id}:{unsuccessful_email}", db_path=DB_PATH)
+                        print(f"   [EMAIL] Unsuccessful claim notification queued for: {unsuccessful_email}")
                     except Exception as e:
                         print(f"   [WARNING] Could not send email to {unsuccessful_email}: {e}")
         
@@ -3598,7 +3870,7 @@ def get_claimed_items():
     After 3 days: No more responses accepted, item stays until owner finalizes claim
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3700,7 +3972,7 @@ def update_claim(claim_id):
         data = request.get_json()
         new_status = data.get('claimed_status', 'PENDING')
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Get the item_id for this claim
@@ -3768,7 +4040,7 @@ def create_abuse_report():
         reported_by_email = data.get('reported_by_email')
         
         # Connect to database
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3905,7 +4177,7 @@ def get_abuse_reports():
         if not admin_email:
             return jsonify({'error': 'Email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3998,7 +4270,7 @@ def update_abuse_report(report_id):
         if not is_admin(admin_email):
             return jsonify({'error': 'Unauthorized. Admin access required.'}), 403
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Update report
@@ -4041,7 +4313,7 @@ def delete_reported_content(report_id):
         if not is_admin(admin_email):
             return jsonify({'error': 'Unauthorized. Admin access required.'}), 403
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4116,7 +4388,7 @@ def get_conversations():
         if not user_id:
             return jsonify({'error': 'User ID required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4124,7 +4396,7 @@ def get_conversations():
         # Convert user_id to int for proper comparison
         user_id_int = int(user_id)
         
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT 
                 c.secure_id as conversation_id,
                 c.item_id,
@@ -4160,12 +4432,7 @@ def get_conversations():
                     WHERE m2.conversation_id = m1.conversation_id
                 )
             ) last_msg ON last_msg.conversation_id = c.secure_id
-            LEFT JOIN (
-                SELECT conversation_id, COUNT(*) as count
-                FROM messages
-                WHERE receiver_id = ? AND is_read = 0
-                GROUP BY conversation_id
-            ) unread ON unread.conversation_id = c.secure_id
+            LEFT JOIN ({queries.UNREAD_COUNTS_SQL}) unread ON unread.conversation_id = c.secure_id
             WHERE (c.user_id_1 = ? OR c.user_id_2 = ?)
               AND c.user_id_1 > 0 AND c.user_id_2 > 0
               AND c.user_id_1 != c.user_id_2
@@ -4196,7 +4463,7 @@ def get_messages():
             return jsonify({'error': 'User ID required'}), 400
         
         # Create database connection first
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4215,26 +4482,7 @@ def get_messages():
             conn.close()
             return jsonify({'error': 'Unauthorized: You are not part of this conversation'}), 403
         
-        cursor.execute('''
-            SELECT 
-                message_id,
-                conversation_id,
-                sender_id,
-                receiver_id,
-                CASE WHEN sender_id = -1 THEN '[Deleted User]' ELSE sender_name END as sender_name,
-                CASE WHEN receiver_id = -1 THEN '[Deleted User]' ELSE receiver_name END as receiver_name,
-                CASE WHEN sender_id = -1 THEN 'deleted@traceback.local' ELSE sender_email END as sender_email,
-                CASE WHEN receiver_id = -1 THEN 'deleted@traceback.local' ELSE receiver_email END as receiver_email,
-                message_text,
-                is_read,
-                created_at,
-                item_id,
-                item_type,
-                item_title
-            FROM messages
-            WHERE conversation_id = ?
-            ORDER BY created_at ASC
-        ''', (conversation_id,))
+        cursor.execute(queries.CONVERSATION_MESSAGES_SQL, (conversation_id,))
         
         messages = [dict(row) for row in cursor.fetchall()]
         conn.close()
@@ -4277,7 +4525,7 @@ def create_conversation():
         conversation_key = f"{user_id_1}_{user_id_2}_{item_id}"
         
         # Check if conversation already exists with retry logic
-        conn_check = sqlite3.connect(DB_PATH, timeout=10.0)
+        conn_check = db_pool.connect(DB_PATH)
         cursor_check = conn_check.cursor()
         cursor_check.execute('''
             SELECT secure_id FROM conversations 
@@ -4302,8 +4550,7 @@ def create_conversation():
             secure_id = secure_bytes.hex()[:32]  # 32 character secure ID
         
         # Store the mapping in database with retry logic
-        conn = sqlite3.connect(DB_PATH, timeout=10.0)
-        conn.execute('PRAGMA journal_mode=WAL')  # Enable Write-Ahead Logging for better concurrency
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Create conversations table if it doesn't exist
@@ -4344,7 +4591,7 @@ def get_conversation_details():
         if not secure_id or not requester_id:
             return jsonify({'error': 'Missing parameters'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4401,7 +4648,7 @@ def send_message():
             conversation_id = f"conv_{user_ids[0]}_{user_ids[1]}{item_ref}"
         
         # Validate sender is part of this conversation using secure ID
-        conn_check = sqlite3.connect(DB_PATH)
+        conn_check = db_pool.connect(DB_PATH)
         cursor_check = conn_check.cursor()
         cursor_check.execute('''
             SELECT user_id_1, user_id_2 FROM conversations WHERE secure_id = ?
@@ -4416,7 +4663,7 @@ def send_message():
         if int(data['sender_id']) not in allowed_user_ids:
             return jsonify({'error': 'Unauthorized: You cannot send messages in this conversation'}), 403
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Use ET local time for message timestamp
@@ -4457,7 +4704,7 @@ def send_message():
 def mark_message_read(message_id):
     """Mark a message as read"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('UPDATE messages SET is_read = 1 WHERE message_id = ?', (message_id,))
@@ -4473,7 +4720,7 @@ def mark_message_read(message_id):
 # Helper function for internal use
 def get_user_by_email(email):
     """Get user details by email (internal helper)"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     
@@ -4523,7 +4770,7 @@ def api_get_user_by_email():
 def api_get_user_by_id(user_id):
     """Get user details by ID (API endpoint)"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4572,7 +4819,7 @@ def create_user_review():
         if data['review_type'] not in ['FINDER', 'CLAIMER', 'APP']:
             return jsonify({'error': 'Invalid review type'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -4610,7 +4857,7 @@ def get_user_reviews(user_id):
     try:
         review_type = request.args.get('type')  # FINDER, CLAIMER, APP, or None for all
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4661,7 +4908,7 @@ def get_user_reviews(user_id):
 def get_user_review_stats(user_id):
     """Get review statistics for a user"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -4736,21 +4983,16 @@ def get_user_reports_with_matches(user_id):
         
         # Get user's found items (show ALL items owner uploaded until deleted from database)
         # Owner needs to see ALL their items to access "View Responses" and make decisions
-        found_items = conn.execute("""
-            SELECT f.rowid as id, f.category_id, f.location_id, f.title, f.description, 
-                   f.color, f.size, f.image_filename, f.date_found, f.time_found,
-                   f.current_location, f.finder_notes, f.is_private, f.privacy_expires_at,
-                   f.is_claimed, f.status, f.created_at, f.privacy_expires,
-                   f.finder_name, f.finder_email, f.finder_phone,
-                   c.name as category_name, c.name as category,
-                   loc.name as location_name, loc.name as location,
-                   loc.building_code, loc.description as location_description
-            FROM found_items f
-            LEFT JOIN categories c ON f.category_id = c.id
-            LEFT JOIN locations loc ON f.location_id = loc.id
-            WHERE f.finder_email = ?
-            ORDER BY f.created_at DESC
-        """, (user_email,)).fetchall()
+        found_items = conn.execute(queries.FOUND_REPORTS_BY_FINDER_SQL, (user_email,)).fetchall()
+        
+        # Get pre-computed matches from ml_matches table (>70% threshold), top 10 per report
+        try:
+            lost_matches = load_top_matches(conn, 'lost', [item['id'] for item in lost_items], per_item=10)
+            found_matches = load_top_matches(conn, 'found', [item['id'] for item in found_items], per_item=10)
+        except Exception as e:
+            print(f"Error reading matches for user {user_id}: {e}")
+            lost_matches = {}
+            found_matches = {}
         
         conn.close()
         
@@ -4774,48 +5016,22 @@ def get_user_reports_with_matches(user_id):
                 except:
                     pass
             
-            # Get pre-computed matches from ml_matches table (>70% threshold)
-            conn2 = get_db()
             matches = []
-            if conn2:
-                try:
-                    match_rows = conn2.execute("""
-                        SELECT m.match_score, m.score_breakdown,
-                               f.rowid as id, f.title, f.description, f.color, f.size,
-                               f.date_found, f.time_found, f.image_filename,
-                               f.finder_name, f.finder_email, f.finder_phone,
-                               f.current_location, f.is_claimed, f.status,
-                               c.name as category_name,
-                               loc.name as location_name
-                        FROM ml_matches m
-                        JOIN found_items f ON m.found_item_id = f.rowid
-                        LEFT JOIN categories c ON f.category_id = c.id
-                        LEFT JOIN locations loc ON f.location_id = loc.id
-                        WHERE m.lost_item_id = ? AND m.match_score >= 0.7
-                        ORDER BY m.match_score DESC
-                        LIMIT 10
-                    """, (item_dict['id'],)).fetchall()
-                    
-                    for row in match_rows:
-                        match_dict = dict(row)
-                        # Format match dates
-                        if match_dict.get('date_found'):
-                            try:
-                                date_obj = datetime.strptime(match_dict['date_found'], '%Y-%m-%d')
-                                match_dict['date_found'] = date_obj.strftime('%m/%d/%Y')
-                            except:
-                                pass
-                        if match_dict.get('time_found'):
-                            try:
-                                time_obj = datetime.strptime(match_dict['time_found'], '%H:%M:%S')
-                                match_dict['time_found'] = time_obj.strftime('%I:%M %p')
-                            except:
-                                pass
-                        matches.append(match_dict)
-                    
-                    conn2.close()
-                except Exception as e:
-                    print(f"Error reading matches for lost item {item_dict['id']}: {e}")
+            for match_dict in lost_matches.get(item_dict['id'], []):
+                # Format match dates
+                if match_dict.get('date_found'):
+                    try:
+                        date_obj = datetime.strptime(match_dict['date_found'], '%Y-%m-%d')
+                        match_dict['date_found'] = date_obj.strftime('%m/%d/%Y')
+                    except:
+                        pass
+                if match_dict.get('time_found'):
+                    try:
+                        time_obj = datetime.strptime(match_dict['time_found'], '%H:%M:%S')
+                        match_dict['time_found'] = time_obj.strftime('%I:%M %p')
+                    except:
+                        pass
+                matches.append(match_dict)
             
             item_dict['matches'] = matches
             item_dict['match_count'] = len(matches)
@@ -4842,48 +5058,22 @@ def get_user_reports_with_matches(user_id):
                 except:
                     pass
             
-            # Get pre-computed matches from ml_matches table (>70% threshold)
-            conn2 = get_db()
             matches = []
-            if conn2:
-                try:
-                    match_rows = conn2.execute("""
-                        SELECT m.match_score, m.score_breakdown,
-                               l.rowid as id, l.title, l.description, l.color, l.size,
-                               l.date_lost, l.time_lost, l.image_filename,
-                               l.owner_name, l.user_email, l.owner_phone,
-                               l.last_seen_location, l.owner_notes,
-                               c.name as category_name,
-                               loc.name as location_name
-                        FROM ml_matches m
-                        JOIN lost_items l ON m.lost_item_id = l.rowid
-                        LEFT JOIN categories c ON l.category_id = c.id
-                        LEFT JOIN locations loc ON l.location_id = loc.id
-                        WHERE m.found_item_id = ? AND m.match_score >= 0.7
-                        ORDER BY m.match_score DESC
-                        LIMIT 10
-                    """, (item_dict['id'],)).fetchall()
-                    
-                    for row in match_rows:
-                        match_dict = dict(row)
-                        # Format match dates
-                        if match_dict.get('date_lost'):
-                            try:
-                                date_obj = datetime.strptime(match_dict['date_lost'], '%Y-%m-%d')
-                                match_dict['date_lost'] = date_obj.strftime('%m/%d/%Y')
-                            except:
-                                pass
-                        if match_dict.get('time_lost'):
-                            try:
-                                time_obj = datetime.strptime(match_dict['time_lost'], '%H:%M:%S')
-                                match_dict['time_lost'] = time_obj.strftime('%I:%M %p')
-                            except:
-                                pass
-                        matches.append(match_dict)
-                    
-                    conn2.close()
-                except Exception as e:
-                    print(f"Error reading matches for found item {item_dict['id']}: {e}")
+            for match_dict in found_matches.get(item_dict['id'], []):
+                # Format match dates
+                if match_dict.get('date_lost'):
+                    try:
+                        date_obj = datetime.strptime(match_dict['date_lost'], '%Y-%m-%d')
+                        match_dict['date_lost'] = date_obj.strftime('%m/%d/%Y')
+                    except:
+                        pass
+                if match_dict.get('time_lost'):
+                    try:
+                        time_obj = datetime.strptime(match_dict['time_lost'], '%H:%M:%S')
+                        match_dict['time_lost'] = time_obj.strftime('%I:%M %p')
+                    except:
+                        pass
+                matches.append(match_dict)
             
             item_dict['matches'] = matches
             item_dict['match_count'] = len(matches)
@@ -4905,6 +5095,10 @@ def get_user_reports_with_matches(user_id):
         return jsonify({'error': str(e)}), 500
 
 
+# Score thresholds reported by matches-summary (the first one is the match threshold)
+MATCH_SUMMARY_THRESHOLDS = (0.7, 0.8, 0.9)
+HIGH_CONFIDENCE_THRESHOLD = 0.8
+
 @app.route('/api/user/<int:user_id>/matches-summary', methods=['GET'])
 def get_user_matches_summary(user_id):
     """
@@ -4923,72 +5117,40 @@ def get_user_matches_summary(user_id):
         
         user_email = user['email']
         
-        # Get user's lost items count
-        lost_count = conn.execute(
-            "SELECT COUNT(*) as count FROM lost_items WHERE user_email = ?", 
-            (user_email,)
-        ).fetchone()['count']
-        
-        # Get user's found items count
-        found_count = conn.execute(
-            "SELECT COUNT(*) as count FROM found_items WHERE finder_email = ?", 
-            (user_email,)
-        ).fetchone()['count']
-        
-        # Get item IDs
-        lost_item_ids = [row['id'] for row in conn.execute(
-            "SELECT rowid as id FROM lost_items WHERE user_email = ?", 
-            (user_email,)
-        ).fetchall()]
-        
-        found_item_ids = [row['id'] for row in conn.execute(
-            "SELECT rowid as id FROM found_items WHERE finder_email = ?", 
-            (user_email,)
-        ).fetchall()]
+        # Report counts
+        counts = conn.execute("""
+            SELECT 
+                (SELECT COUNT(*) FROM lost_items WHERE user_email = ?) as lost_count,
+                (SELECT COUNT(*) FROM found_items WHERE finder_email = ?) as found_count
+        """, (user_email, user_email)).fetchone()
+        lost_count = counts['lost_count']
+        found_count = counts['found_count']
+        
+        # Count matches from pre-computed ml_matches table in one pass,
+        # bucketed by the highest threshold each match reaches
+        bucket_sql = ' '.join(
+            f"WHEN match_score >= {threshold} THEN {threshold}"
+            for threshold in sorted(MATCH_SUMMARY_THRESHOLDS, reverse=True)
+        )
+        bucket_rows = conn.execute(f"""
+            SELECT CASE {bucket_sql} END as bucket, COUNT(*) as count
+            FROM ({queries.USER_MATCH_SCORES_SQL})
+            GROUP BY bucket
+        """, (user_email, MATCH_SUMMARY_THRESHOLDS[0], user_email, MATCH_SUMMARY_THRESHOLDS[0])).fetchall()
         
         conn.close()
         
-        # Count matches from pre-computed ml_matches table
-        total_matches = 0
-        high_confidence_matches = 0  # >=70%
+        bucket_counts = {row['bucket']: row['count'] for row in bucket_rows}
         
-        # Count matches for lost items
-        for item_id in lost_item_ids:
-            try:
-                match_count = conn.execute("""
-                    SELECT COUNT(*) as count 
-                    FROM ml_matches 
-                    WHERE lost_item_id = ? AND match_score >= 0.7
-                """, (item_id,)).fetchone()['count']
-                total_matches += match_count
-                
-                high_conf_count = conn.execute("""
-                    SELECT COUNT(*) as count 
-                    FROM ml_matches 
-                    WHERE lost_item_id = ? AND match_score >= 0.7
-                """, (item_id,)).fetchone()['count']
-                high_confidence_matches += high_conf_count
-            except:
-                pass
+        # Cumulative: a 0.9 match also counts towards >=0.8 and >=0.7
+        matches_by_threshold = {}
+        for threshold in MATCH_SUMMARY_THRESHOLDS:
+            matches_by_threshold[str(threshold)] = sum(
+                count for bucket, count in bucket_counts.items() if bucket >= threshold
+            )
         
-        # Count matches for found items
-        for item_id in found_item_ids:
-            try:
-                match_count = conn.execute("""
-                    SELECT COUNT(*) as count 
-                    FROM ml_matches 
-                    WHERE found_item_id = ? AND match_score >= 0.7
-                """, (item_id,)).fetchone()['count']
-                total_matches += match_count
-                
-                high_conf_count = conn.execute("""
-                    SELECT COUNT(*) as count 
-                    FROM ml_matches 
-                    WHERE found_item_id = ? AND match_score >= 0.7
-                """, (item_id,)).fetchone()['count']
-                high_confidence_matches += high_conf_count
-            except:
-                pass
+        total_matches = matches_by_threshold[str(MATCH_SUMMARY_THRESHOLDS[0])]
+        high_confidence_matches = matches_by_threshold[str(HIGH_CONFIDENCE_THRESHOLD)]
         
         return jsonify({
             'user_id': user_id,
@@ -4997,6 +5159,7 @@ def get_user_matches_summary(user_id):
             'total_reports': lost_count + found_count,
             'total_matches': total_matches,
             'high_confidence_matches': high_confidence_matches,
+            'matches_by_threshold': matches_by_threshold,
             'has_matches': total_matches > 0
         })
         
@@ -5009,6 +5172,40 @@ def get_user_matches_summary(user_id):
 # ML MATCHING ENDPOINTS
 # ==============================================
 
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Status of a background job (queued / running / done / failed) for frontend polling"""
+    try:
+        job = get_job_queue().get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({
+            'job_id': job['job_id'],
+            'job_type': job['job_type'],
+            'status': job['status'],
+            'attempts': job['attempts'],
+            'result': job['result'],
+            'error': job['error'],
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at']
+        }), 200
+        
+    except Exception as e:
+        print(f"❌ Error getting job status: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/ml/status', methods=['GET'])
+def get_ml_status():
+    """ML service readiness and per-model load times (does not trigger loading)"""
+    from ml_matching_service import IMAGE_SIMILARITY_AVAILABLE
+    return jsonify({
+        'loaded': ml_service is not None,
+        'image_similarity_available': IMAGE_SIMILARITY_AVAILABLE,
+        'model_load_times': ml_service.model_load_times() if ml_service else {}
+    }), 200
+
 @app.route('/api/ml/matches/lost/<int:lost_item_id>', methods=['GET'])
 def get_matches_for_lost_item(lost_item_id):
     """
@@ -5174,7 +5371,7 @@ def cleanup_old_claimed_items():
     These items have been successfully claimed and given to the rightful owner.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Get items to be deleted for logging
@@ -5237,7 +5434,7 @@ def api_cleanup_claimed_items():
 def verify_user_exists(user_id):
     """Verify if a user account still exists (for checking deleted accounts)"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -5274,24 +5471,7 @@ def get_users_for_connection():
         cursor = conn.cursor()
         
         # Select only public profile information, exclude sensitive data
-        cursor.execute('''
-            SELECT 
-                id,
-                full_name,
-                first_name,
-                last_name,
-                profile_image,
-                bio,
-                interests,
-                year_of_study,
-                major,
-                building_preference,
-                profile_completed
-            FROM users
-            WHERE is_active = 1 
-            AND profile_completed = 1
-            ORDER BY full_name ASC
-        ''')
+        cursor.execute(queries.USER_DIRECTORY_SQL)
         
         users = []
         for row in cursor.fetchall():
@@ -5398,7 +5578,7 @@ def create_contact_request():
         # Send email notification (if email system is configured)
         if target_email:
             try:
-                from email_verification_service import send_email
+                from email_outbox import queue_email
                 
                 subject = f"🤝 New Connection Request from {requester_name} - TraceBack"
                 body = f"""Hello {target_user_name},
@@ -5433,8 +5613,8 @@ Kent State University
 This is an automated notification. Please do not reply to this email.
                 """
                 
-                send_email(target_email, subject, body)
-                print(f"✅ Connection request email sent to {target_email}")
+                queue_email(target_email, subject, body, db_path=DB_PATH)
+                print(f"✅ Connection request email queued for {target_email}")
             except Exception as e:
                 print(f"⚠️ Could not send email notification: {e}")
         
@@ -5663,7 +5843,7 @@ def accept_connection(connection_id):
         # Send email notification to requester
         if requester and requester['email']:
             try:
-                from email_verification_service import send_email
+                from email_outbox import queue_email
                 
                 subject = f"✅ {accepter['full_name'] if accepter else 'Someone'} Accepted Your Connection Request - TraceBack"
                 body = f"""Hello {requester['full_name']},
@@ -5696,7 +5876,7 @@ Kent State University
 This is an automated notification. Please do not reply to this email.
                 """
                 
-                send_email(requester['email'], subject, body)
+                queue_email(requester['email'], subject, body, db_path=DB_PATH)
             except Exception as e:
                 print(f"⚠️ Could not send email notification: {e}")
         
@@ -5852,7 +6032,7 @@ def get_successful_returns():
         if not email:
             return jsonify({'error': 'Email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -5860,28 +6040,7 @@ def get_successful_returns():
         
         # Get successful returns (where user was the owner/finder)
         if user_type in ['owner', 'both']:
-            cursor.execute('''
-                SELECT 
-                    sr.return_id,
-                    sr.item_title,
-                    sr.item_description,
-                    sr.item_category,
-                    sr.item_location,
-                    sr.date_found,
-                    sr.claimer_email,
-                    sr.claimer_name,
-                    sr.claim_reason,
-                    sr.finalized_date,
-                    sr.finalized_at,
-                    sr.days_to_finalize,
-                    sr.verification_code,
-                    u.phone_number as claimer_phone,
-                    'owner' as role
-                FROM successful_returns sr
-                LEFT JOIN users u ON u.email = sr.claimer_email
-                WHERE sr.owner_email = ?
-                ORDER BY sr.finalized_date DESC
-            ''', (email,))
+            cursor.execute(queries.SUCCESS_HISTORY_OWNER_SQL, (email,))
             
             returns = cursor.fetchall()
             for ret in returns:
@@ -5899,28 +6058,7 @@ def get_successful_returns():
         
         # Get successful claims (where user was the claimer)
         if user_type in ['claimer', 'both']:
-            cursor.execute('''
-                SELECT 
-                    sr.return_id,
-                    sr.item_title,
-                    sr.item_description,
-                    sr.item_category,
-                    sr.item_location,
-                    sr.date_found,
-                    sr.owner_email,
-                    sr.owner_name,
-                    sr.claim_reason,
-                    sr.finalized_date,
-                    sr.finalized_at,
-                    sr.days_to_finalize,
-                    sr.verification_code,
-                    u.phone_number as owner_phone,
-                    'claimer' as role
-                FROM successful_returns sr
-                LEFT JOIN users u ON u.email = sr.owner_email
-                WHERE sr.claimer_email = ?
-                ORDER BY sr.finalized_date DESC
-            ''', (email,))
+            cursor.execute(queries.SUCCESS_HISTORY_CLAIMER_SQL, (email,))
             
             claims = cursor.fetchall()
             for claim in claims:
@@ -5962,7 +6100,7 @@ def get_successful_returns_stats():
         if not email:
             return jsonify({'error': 'Email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -6034,7 +6172,7 @@ def get_public_profile(user_id):
     This is read-only and cannot be edited
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -6136,7 +6274,7 @@ def check_moderator_access():
         if not email:
             return jsonify({'error': 'Email required', 'is_moderator': False}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -6162,7 +6300,7 @@ def get_all_successful_returns_moderation():
         if not email:
             return jsonify({'error': 'Email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -6216,7 +6354,7 @@ def submit_bug_report():
             if not data.get(field):
                 return jsonify({'error': f'{field} is required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -6263,7 +6401,7 @@ def get_bug_reports():
         if not email:
             return jsonify({'error': 'Email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -6322,7 +6460,7 @@ def update_bug_report(report_id):
         if not moderator_email:
             return jsonify({'error': 'Moderator email required'}), 400
         
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Check if user is a moderator
@@ -6394,6 +6532,14 @@ if __name__ == '__main__':
     print("🧹 Running initial cleanup of old claimed items...")
     cleanup_old_claimed_items()
     
+    # Start the job workers and email sender now so work queued before a restart is picked up
+    get_job_queue()
+    get_outbox(DB_PATH)
+    
+    if ML_WARMUP:
+        print("🤖 Warming up ML models in the background...")
+        warm_up_ml_service()
+    
     print("🌐 Server running on http://localhost:5000")
     print("🏠 API Info: http://localhost:5000/")
     print("💚 Health Check: http://localhost:5000/health")
@@ -0,0 +1,216 @@
+"""
+TraceBack Schema Migrations
+Versioned, run-once schema changes for the SQLite database. Applied versions are
+recorded in schema_migrations, so run_migrations() is cheap to call on every startup.
+
+Add a migration by appending (version, name, function) to MIGRATIONS; the
+function receives a cursor inside the migration's transaction.
+
+Run manually:
+    python db_migrations.py [db_path]
+"""
+
+import os
+import sys
+import sqlite3
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traceback_100k.db')
+
+# (index name, table, columns / expression, partial WHERE clause or None)
+HOT_PATH_INDEXES = [
+    # Dashboard lost items: WHERE is_resolved = 0 AND user_email = ? ORDER BY created_at DESC
+    ('idx_lost_items_user_open', 'lost_items', 'user_email, is_resolved, created_at', None),
+    # User's found reports: WHERE finder_email = ? ORDER BY created_at DESC
+    ('idx_found_items_finder', 'found_items', 'finder_email, created_at', None),
+    # Newest-first listings and privacy window checks
+    ('idx_found_items_created', 'found_items', 'created_at', None),
+    # Cleanup of claimed items: WHERE status = 'CLAIMED' AND claimed_date ...
+    ('idx_found_items_status', 'found_items', 'status, claimed_date', None),
+    # Claim window: NOT EXISTS (... WHERE found_item_id = f.rowid AND success = 1 AND marked_as_potential_at IS NOT NULL)
+    ('idx_claim_attempts_potential', 'claim_attempts', 'found_item_id, success, marked_as_potential_at', None),
+    # Conversation thread and "last message" lookups: WHERE conversation_id = ? ORDER BY created_at
+    ('idx_messages_conversation_created', 'messages', 'conversation_id, created_at', None),
+    # Unread counts: WHERE receiver_id = ? AND is_read = 0 GROUP BY conversation_id
+    ('idx_messages_unread', 'messages', 'receiver_id, conversation_id', 'is_read = 0'),
+    # Success history: WHERE owner_email / claimer_email = ? ORDER BY finalized_date DESC
+    ('idx_successful_returns_owner_date', 'successful_returns', 'owner_email, finalized_date', None),
+    ('idx_successful_returns_claimer_date', 'successful_returns', 'claimer_email, finalized_date', None),
+    # Public user directory: WHERE is_active = 1 AND profile_completed = 1 ORDER BY full_name
+    ('idx_users_directory', 'users', 'is_active, profile_completed, full_name', None),
+]
+
+
+def table_columns(cursor, table):
+    """Column names of a table (empty if the table doesn't exist)"""
+    return {row[1] for row in cursor.execute(f'PRAGMA table_info({table})').fetchall()}
+
+
+def create_indexes(cursor, indexes):
+    """
+    Create indexes, skipping any whose table or columns don't exist in this database
+
+    Returns:
+        Number of indexes created (or already present)
+    """
+    created = 0
+    for name, table, columns, where in indexes:
+        existing = table_columns(cursor, table)
+        needed = {column.strip() for column in columns.split(',')}
+        if where:
+            needed.add(where.split()[0])
+        missing = needed - existing
+        if missing:
+            print(f"   ⚠️ Skipping {name}: {table} is missing {', '.join(sorted(missing))}")
+            continue
+
+        sql = f'CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})'
+        if where:
+            sql += f' WHERE {where}'
+        cursor.execute(sql)
+        created += 1
+    return created
+
+
+def migrate_hot_path_indexes(cursor):
+    """Indexes for the columns the hottest endpoints filter and sort on"""
+    created = create_indexes(cursor, HOT_PATH_INDEXES)
+    print(f"   ✅ {created}/{len(HOT_PATH_INDEXES)} hot-path indexes in place")
+
+
+# Found items stay private for this long after being reported
+PRIVACY_PERIOD = '+3 days'
+
+
+def migrate_found_items_public_at(cursor):
+    """
+    found_items.public_at: when the item leaves the 3-day privacy window
+
+    Stored as a normalized local 'YYYY-MM-DD HH:MM:SS' string (the same clock as
+    created_at), so privacy checks compare the indexed column directly instead of
+    running datetime() on every row. Triggers fill it for inserts that don't set it
+    and keep it in step when created_at changes.
+    """
+    columns = table_columns(cursor, 'found_items')
+    if not columns:
+        print("   ⚠️ Skipping public_at: found_items table not found")
+        return
+
+    if 'public_at' not in columns:
+        cursor.execute('ALTER TABLE found_items ADD COLUMN public_at TIMESTAMP')
+
+    cursor.execute(f'''
+        UPDATE found_items SET public_at = datetime(created_at, '{PRIVACY_PERIOD}')
+        WHERE public_at IS NULL
+    ''')
+    print(f"   ✅ Backfilled public_at for {cursor.rowcount} found items")
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_found_items_public_at_insert
+        AFTER INSERT ON found_items
+        WHEN NEW.public_at IS NULL
+        BEGIN
+            UPDATE found_items SET public_at = datetime(NEW.created_at, '{PRIVACY_PERIOD}')
+            WHERE rowid = NEW.rowid;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_found_items_public_at_update
+        AFTER UPDATE OF created_at ON found_items
+        BEGIN
+            UPDATE found_items SET public_at = datetime(NEW.created_at, '{PRIVACY_PERIOD}')
+            WHERE rowid = NEW.rowid;
+        END
+    ''')
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_found_items_public_at ON found_items(public_at)')
+
+
+def migrate_drop_combined_scheduler_consumer(cursor):
+    """
+    Forget combined_scheduler's item_changes high-water mark
+
+    combined_scheduler.py now runs ml_scheduler's matching (consumer 'ml_scheduler'),
+    so its own mark would never move again and ItemChangeLog.trim(), which keeps
+    every change some consumer hasn't processed, would never trim item_changes.
+    """
+    if not table_columns(cursor, 'ml_matching_state'):
+        return
+    cursor.execute("DELETE FROM ml_matching_state WHERE consumer = 'combined_scheduler'")
+    print(f"   ✅ Removed {cursor.rowcount} stale ml_matching_state consumer(s)")
+
+
+MIGRATIONS = [
+    (1, 'hot_path_indexes', migrate_hot_path_indexes),
+    (2, 'found_items_public_at', migrate_found_items_public_at),
+    (3, 'drop_combined_scheduler_consumer', migrate_drop_combined_scheduler_consumer),
+]
+
+
+def init_schema_migrations_table(conn):
+    """Create schema_migrations table if it doesn't exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def get_applied_versions(conn):
+    return {row[0] for row in conn.execute('SELECT version FROM schema_migrations').fetchall()}
+
+
+def run_migrations(db_path=DB_PATH):
+    """
+    Apply pending migrations in version order, then refresh planner statistics
+
+    Each migration runs in its own transaction together with its
+    schema_migrations row, so a failed migration is retried on the next run.
+
+    Args:
+        db_path: Path to the database
+
+    Returns:
+        List of applied migration versions
+    """
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        init_schema_migrations_table(conn)
+        applied = get_applied_versions(conn)
+        pending = [m for m in MIGRATIONS if m[0] not in applied]
+        if not pending:
+            return []
+
+        done = []
+        for version, name, migrate in sorted(pending):
+            print(f"🛠️  Applying migration {version}: {name}")
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                if version in get_applied_versions(conn):
+                    # Another process applied it while we waited for the lock
+                    cursor.execute('COMMIT')
+                    continue
+                migrate(cursor)
+                cursor.execute('INSERT INTO schema_migrations (version, name) VALUES (?, ?)', (version, name))
+                cursor.execute('COMMIT')
+                done.append(version)
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+
+        if done:
+            # New indexes are only picked up reliably once the planner has statistics for them
+            conn.execute('ANALYZE')
+            print(f"📊 Applied {len(done)} migration(s) and refreshed statistics (ANALYZE)")
+        return done
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    applied = run_migrations(db_path)
+    if not applied:
+        print("✅ Schema is up to date")
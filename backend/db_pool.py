@@ -0,0 +1,270 @@
+"""
+TraceBack SQLite Connection Pool
+Reuses SQLite connections instead of opening a new one for every query, and
+applies the tuned PRAGMAs once per connection instead of on every connect.
+
+- inside a Flask request, every connect() returns the same connection, bound to
+  the request thread; it goes back to the pool when the request ends (teardown)
+- outside a request (schedulers, background threads), connect() checks out a
+  connection that goes back to the pool on close()
+- close() on a request connection is a no-op, so existing open/close code works unchanged
+- a connection is only ever used by one thread at a time
+- get_metrics() reports connections created / reused and pool occupancy
+
+Usage:
+    import db_pool
+    conn = db_pool.connect(DB_PATH, row_factory=sqlite3.Row)
+    ...
+    conn.close()
+"""
+
+import os
+import sqlite3
+import threading
+from collections import deque
+from flask import g, has_request_context
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traceback_100k.db')
+
+# Idle connections kept per database (ENV: DB_POOL_SIZE)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '8'))
+
+# Milliseconds a statement waits on a locked database before failing
+BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', '10000'))
+
+# Page cache per connection in KiB, and memory-mapped I/O size in bytes
+CACHE_SIZE_KB = int(os.environ.get('DB_CACHE_SIZE_KB', '20000'))
+MMAP_SIZE = int(os.environ.get('DB_MMAP_SIZE', str(256 * 1024 * 1024)))
+
+# Applied once when a connection is opened
+PRAGMAS = (
+    ('journal_mode', 'WAL'),            # readers don't block the writer
+    ('synchronous', 'NORMAL'),          # safe with WAL, far fewer fsyncs than FULL
+    ('cache_size', f'-{CACHE_SIZE_KB}'),
+    ('mmap_size', str(MMAP_SIZE)),
+    ('temp_store', 'MEMORY'),           # sorts / temp b-trees stay in memory
+    ('busy_timeout', str(BUSY_TIMEOUT_MS)),
+)
+
+
+class PooledConnection:
+    """
+    sqlite3.Connection stand-in handed out by the pool
+
+    Each handle has its own row_factory, so handles that share one request
+    connection don't change each other's row type. Everything else is forwarded
+    to the underlying connection.
+    """
+
+    def __init__(self, pool, conn, row_factory=None, request_scoped=False):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_request_scoped', request_scoped)
+        object.__setattr__(self, '_closed', False)
+        object.__setattr__(self, 'row_factory', row_factory)
+
+    def _raw(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed database.')
+        return self._conn
+
+    def cursor(self):
+        cursor = self._raw().cursor()
+        cursor.row_factory = self.row_factory
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def close(self):
+        """Return the connection to the pool (request connections are returned at teardown)"""
+        if self._closed:
+            return
+        object.__setattr__(self, '_closed', True)
+        if not self._request_scoped:
+            self._pool.checkin(self._conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Same as sqlite3.Connection: commit on success, roll back on error
+        if exc_type is None:
+            self._raw().commit()
+        else:
+            self._raw().rollback()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._raw(), name)
+
+    def __setattr__(self, name, value):
+        if name == 'row_factory':
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._raw(), name, value)
+
+
+class ConnectionPool:
+    def __init__(self, db_path, size=DB_POOL_SIZE):
+        """
+        Initialize the pool (connections are opened on demand)
+
+        Args:
+            db_path: Path to the database
+            size: Maximum idle connections kept open
+        """
+        self.db_path = db_path
+        self.size = max(1, size)
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._stats = {
+            'created': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'reused': 0,
+            'request_checkouts': 0,
+            'in_use': 0,
+        }
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_MS / 1000.0, check_same_thread=False)
+        for name, value in PRAGMAS:
+            conn.execute(f'PRAGMA {name}={value}')
+        with self._lock:
+            self._stats['created'] += 1
+        return conn
+
+    def checkout(self):
+        """Take an idle connection, or open a new one"""
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            if self._idle:
+                self._stats['reused'] += 1
+                return self._idle.pop()
+
+        try:
+            return self._open()
+        except Exception:
+            with self._lock:
+                self._stats['in_use'] -= 1
+            raise
+
+    def checkin(self, conn):
+        """Return a connection; uncommitted work is rolled back like on close()"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.isolation_level = ''
+            reusable = True
+        except sqlite3.Error:
+            reusable = False
+
+        with self._lock:
+            self._stats['in_use'] -= 1
+            if reusable and len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+            self._stats['closed'] += 1
+
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def connect(self, row_factory=None):
+        """
+        Get a connection handle
+
+        Args:
+            row_factory: Row factory for this handle (e.g. sqlite3.Row), default tuples
+
+        Returns:
+            PooledConnection
+        """
+        if has_request_context():
+            connections = g.setdefault('_db_pool_connections', {})
+            conn = connections.get(self)
+            if conn is None:
+                conn = self.checkout()
+                connections[self] = conn
+                with self._lock:
+                    self._stats['request_checkouts'] += 1
+            return PooledConnection(self, conn, row_factory, request_scoped=True)
+
+        return PooledConnection(self, self.checkout(), row_factory)
+
+    def close_idle(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._stats['closed'] += len(idle)
+        for conn in idle:
+            conn.close()
+
+    def get_metrics(self):
+        """Pool counters plus current idle / in-use connections"""
+        with self._lock:
+            metrics = dict(self._stats)
+            metrics['idle'] = len(self._idle)
+        metrics['size'] = self.size
+        metrics['db_path'] = self.db_path
+        return metrics
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=DB_PATH):
+    """Get the process-wide pool for a database"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(key)
+            _pools[key] = pool
+    return pool
+
+
+def connect(db_path=DB_PATH, row_factory=None):
+    """
+    Get a pooled connection (drop-in replacement for sqlite3.connect)
+
+    Args:
+        db_path: Path to the database
+        row_factory: Row factory for the returned handle
+
+    Returns:
+        PooledConnection
+    """
+    return get_pool(db_path).connect(row_factory)
+
+
+def release_request_connections(exception=None):
+    """Return connections bound to the current request to their pools"""
+    connections = g.pop('_db_pool_connections', None)
+    if not connections:
+        return
+    for pool, conn in connections.items():
+        pool.checkin(conn)
+
+
+def init_app(app):
+    """Release request connections when each request ends"""
+    app.teardown_appcontext(release_request_connections)
+
+
+def get_metrics():
+    """Metrics for every pool in this process"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.get_metrics() for pool in pools]
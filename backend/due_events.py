@@ -0,0 +1,357 @@
+"""
+Due Event Queue
+Persisted due-time queue for time-based notifications, so they fire when they
+become due instead of being found by hourly polling windows.
+
+- item_public: a found item leaves its 3-day privacy window (due at public_at)
+- finder_decision: the 3-day competition window after an item's first potential
+  claimer ends (due at MIN(marked_as_potential_at) + 3 days)
+
+SQLite triggers on found_items and claim_attempts schedule, move and drop events,
+so every writer is covered. Each event fires once: fired_at and the outcome are
+recorded, and pending events are found through a partial index on due_at.
+
+Usage:
+    queue = DueEventQueue(DB_PATH)
+    queue.run_forever({'item_public': handler, ...})
+"""
+
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime
+
+EVENT_ITEM_PUBLIC = 'item_public'
+EVENT_FINDER_DECISION = 'finder_decision'
+
+# Competition window after the first potential claimer
+DECISION_WINDOW = '+3 days'
+
+# Events handed to the handlers per batch
+DISPATCH_BATCH_SIZE = 500
+
+# Longest sleep between checks; events scheduled by other processes (the API)
+# are picked up within this many seconds
+MAX_WAIT_SECONDS = 60
+
+# Handler outcomes
+OUTCOME_SENT = 'sent'
+OUTCOME_SKIPPED = 'skipped'
+
+NOW_SQL = "datetime('now', 'localtime')"
+
+
+def is_timestamp(value):
+    """True for a 'YYYY-MM-DD HH:MM:SS' (ISO format) time string"""
+    if not isinstance(value, str):
+        return False
+    try:
+        datetime.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+class DueEventQueue:
+    def __init__(self, db_path):
+        """
+        Initialize the queue (creates table and triggers, schedules existing items on first run)
+
+        Args:
+            db_path: Path to the database
+        """
+        self.db_path = db_path
+        self.init_due_events_table()
+
+    def get_db_connection(self):
+        """Get database connection"""
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        return conn
+
+    def init_due_events_table(self):
+        """Create due_events table and the triggers that schedule events"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        created = not cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'due_events'"
+        ).fetchone()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS due_events (
+                event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_type TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                due_at TIMESTAMP NOT NULL,
+                fired_at TIMESTAMP,
+                outcome TEXT,
+                UNIQUE (event_type, item_id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_due_events_pending
+            ON due_events(due_at) WHERE fired_at IS NULL
+        ''')
+
+        tables = {row[0] for row in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        ).fetchall()}
+
+        # found_items.public_at comes from the schema migrations (db_migrations.py)
+        has_public_at = 'found_items' in tables and 'public_at' in {
+            row[1] for row in cursor.execute('PRAGMA table_info(found_items)').fetchall()}
+
+        if has_public_at:
+            self._create_public_triggers(cursor)
+        if 'claim_attempts' in tables:
+            self._create_decision_triggers(cursor)
+
+        if created:
+            self._schedule_existing(cursor, tables, has_public_at)
+
+        conn.commit()
+        conn.close()
+
+    def _create_public_triggers(self, cursor):
+        # public_at is filled by the schema migration's trigger when an insert leaves it
+        # NULL, which moves the event via the update trigger below
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_found_items_due_public_insert
+            AFTER INSERT ON found_items
+            WHEN NEW.public_at IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO due_events (event_type, item_id, due_at)
+                VALUES ('{EVENT_ITEM_PUBLIC}', NEW.rowid, NEW.public_at);
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_found_items_due_public_update
+            AFTER UPDATE OF public_at ON found_items
+            WHEN NEW.public_at IS NOT NULL
+            BEGIN
+                INSERT INTO due_events (event_type, item_id, due_at)
+                VALUES ('{EVENT_ITEM_PUBLIC}', NEW.rowid, NEW.public_at)
+                ON CONFLICT (event_type, item_id) DO UPDATE SET due_at = excluded.due_at
+                WHERE fired_at IS NULL;
+            END
+        ''')
+        # Fired events go too: found_items rowids can be reused, and a leftover fired
+        # event would swallow the new item's events (INSERT OR IGNORE / upsert WHERE)
+        old_delete = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_found_items_due_delete'"
+        ).fetchone()
+        if old_delete and 'fired_at IS NULL' in old_delete[0]:
+            cursor.execute('DROP TRIGGER trg_found_items_due_delete')
+            cursor.execute('''
+                DELETE FROM due_events
+                WHERE NOT EXISTS (SELECT 1 FROM found_items f WHERE f.rowid = due_events.item_id)
+            ''')
+            if cursor.rowcount:
+                print(f"🧹 Removed {cursor.rowcount} due events of deleted found items")
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_found_items_due_delete
+            AFTER DELETE ON found_items
+            BEGIN
+                DELETE FROM due_events WHERE item_id = OLD.rowid;
+            END
+        ''')
+
+    def _create_decision_triggers(self, cursor):
+        # Earliest potential claimer wins; an event that was skipped because nobody was
+        # left claiming is re-armed when a new potential claimer appears
+        schedule_sql = f'''
+                INSERT INTO due_events (event_type, item_id, due_at)
+                VALUES ('{EVENT_FINDER_DECISION}', NEW.found_item_id,
+                        datetime(NEW.marked_as_potential_at, '{DECISION_WINDOW}'))
+                ON CONFLICT (event_type, item_id) DO UPDATE SET
+                    due_at = CASE WHEN fired_at IS NULL THEN MIN(due_at, excluded.due_at)
+                                  ELSE excluded.due_at END,
+                    fired_at = NULL,
+                    outcome = NULL
+                WHERE fired_at IS NULL OR outcome = '{OUTCOME_SKIPPED}';'''
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_claim_attempts_due_decision_insert
+            AFTER INSERT ON claim_attempts
+            WHEN NEW.success = 1 AND NEW.marked_as_potential_at IS NOT NULL
+            BEGIN{schedule_sql}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_claim_attempts_due_decision_update
+            AFTER UPDATE OF success, marked_as_potential_at ON claim_attempts
+            WHEN NEW.success = 1 AND NEW.marked_as_potential_at IS NOT NULL
+            BEGIN{schedule_sql}
+            END
+        ''')
+
+    def _schedule_existing(self, cursor, tables, has_public_at):
+        """
+        First run on an existing database
+
+        Items that are already public were announced by the old hourly scheduler, so
+        only future public_at times are scheduled. Decision deadlines are scheduled
+        for every item with potential claimers whose finder hasn't been notified yet
+        (past deadlines fire right away, as the old scheduler did on startup).
+        """
+        if has_public_at:
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO due_events (event_type, item_id, due_at)
+                SELECT '{EVENT_ITEM_PUBLIC}', rowid, public_at
+                FROM found_items
+                WHERE public_at > {NOW_SQL}
+            ''')
+            print(f"⏰ Scheduled {cursor.rowcount} upcoming public-item notifications")
+
+        if 'claim_attempts' in tables:
+            already_notified = ''
+            if 'email_notifications' in tables:
+                already_notified = '''
+                    AND found_item_id NOT IN (
+                        SELECT found_item_id FROM email_notifications
+                        WHERE notification_type = 'decision_time'
+                    )'''
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO due_events (event_type, item_id, due_at)
+                SELECT '{EVENT_FINDER_DECISION}', found_item_id,
+                       datetime(MIN(marked_as_potential_at), '{DECISION_WINDOW}')
+                FROM claim_attempts
+                WHERE success = 1 AND marked_as_potential_at IS NOT NULL{already_notified}
+                GROUP BY found_item_id
+            ''')
+            print(f"⏰ Scheduled {cursor.rowcount} finder decision notifications")
+
+    def seconds_until_next(self, event_types=None, max_wait=MAX_WAIT_SECONDS):
+        """
+        Seconds until the next pending event is due (0 if one is due now), capped at max_wait
+        """
+        conn = self.get_db_connection()
+        type_filter, params = self._type_filter(event_types)
+        row = conn.execute(f'''
+            SELECT (julianday(MIN(due_at)) - julianday({NOW_SQL})) * 86400
+            FROM due_events
+            WHERE fired_at IS NULL{type_filter}
+        ''', params).fetchone()
+        conn.close()
+
+        if row[0] is None:
+            return max_wait
+        return min(max(row[0], 0), max_wait)
+
+    def _type_filter(self, event_types):
+        if not event_types:
+            return '', ()
+        event_types = list(event_types)
+        return f" AND event_type IN ({','.join('?' * len(event_types))})", tuple(event_types)
+
+    def get_due(self, event_types=None, limit=DISPATCH_BATCH_SIZE):
+        """
+        Pending events that are due, oldest first
+
+        Returns:
+            List of (event_id, event_type, item_id, due_at)
+        """
+        conn = self.get_db_connection()
+        type_filter, params = self._type_filter(event_types)
+        rows = conn.execute(f'''
+            SELECT event_id, event_type, item_id, due_at
+            FROM due_events
+            WHERE fired_at IS NULL AND due_at <= {NOW_SQL}{type_filter}
+            ORDER BY due_at
+            LIMIT ?
+        ''', params + (limit,)).fetchall()
+        conn.close()
+        return rows
+
+    def complete(self, results):
+        """
+        Record handler outcomes
+
+        Args:
+            results: List of (event_id, outcome); outcome is OUTCOME_SENT, OUTCOME_SKIPPED,
+                     or a 'YYYY-MM-DD HH:MM:SS' time to fire the event again at
+
+        An outcome that is neither (e.g. None) can't be rescheduled; the event is
+        recorded as skipped instead of failing the whole batch.
+        """
+        fired = []
+        moved = []
+        for event_id, outcome in results:
+            if outcome in (OUTCOME_SENT, OUTCOME_SKIPPED):
+                fired.append((outcome, event_id))
+            elif is_timestamp(outcome):
+                moved.append((outcome, event_id))
+            else:
+                print(f"⚠️ Due event {event_id} got invalid outcome {outcome!r}, skipping it")
+                fired.append((OUTCOME_SKIPPED, event_id))
+
+        conn = self.get_db_connection()
+        conn.executemany(f'''
+            UPDATE due_events SET fired_at = {NOW_SQL}, outcome = ?
+            WHERE event_id = ? AND fired_at IS NULL
+        ''', fired)
+        conn.executemany('''
+            UPDATE due_events SET due_at = ?
+            WHERE event_id = ? AND fired_at IS NULL
+        ''', moved)
+        conn.commit()
+        conn.close()
+
+    def dispatch_due(self, handlers, limit=DISPATCH_BATCH_SIZE):
+        """
+        Fire every event that is due
+
+        Args:
+            handlers: {event_type: function(item_ids) -> {item_id: outcome}}; items the
+                      handler leaves out stay pending and are retried on the next check
+
+        Returns:
+            Number of events handled
+        """
+        handled = 0
+        while True:
+            due = self.get_due(handlers.keys(), limit)
+            if not due:
+                return handled
+
+            events_by_type = defaultdict(list)
+            for event_id, event_type, item_id, _ in due:
+                events_by_type[event_type].append((event_id, item_id))
+
+            results = []
+            for event_type, events in events_by_type.items():
+                outcomes = handlers[event_type]([item_id for _, item_id in events])
+                results.extend((event_id, outcomes[item_id])
+                               for event_id, item_id in events if item_id in outcomes)
+            self.complete(results)
+            handled += len(results)
+
+            if len(due) < limit or not results:
+                return handled
+
+    def run_forever(self, handlers, max_wait=MAX_WAIT_SECONDS, dispatch=None):
+        """
+        Fire events as they become due until interrupted
+
+        Args:
+            handlers: See dispatch_due()
+            max_wait: Longest sleep between checks
+            dispatch: Optional function run instead of dispatch_due(handlers), returning
+                      the number of events handled (e.g. to run it as a scheduler job)
+        """
+        while True:
+            try:
+                wait = self.seconds_until_next(handlers.keys(), max_wait)
+                if wait <= 0:
+                    handled = dispatch() if dispatch else self.dispatch_due(handlers)
+                    # Check again right away; back off if nothing could be handled or
+                    # the dispatch failed (None)
+                    if handled is None:
+                        wait = max_wait
+                    else:
+                        wait = 0 if handled else 1
+            except Exception as e:
+                print(f"❌ Error dispatching due events: {e}")
+                wait = max_wait
+            if wait:
+                time.sleep(wait)
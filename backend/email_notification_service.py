@@ -3,23 +3,22 @@ TraceBack Email Notification Service
 Sends email notifications to users when found items become public
 """
 
-import smtplib
 import sqlite3
 from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import threading
+from mail_transport import get_transport, load_smtp_config
+from email_outbox import get_outbox
+
+# Users per outbox / email_notifications batch in digest mode (one commit each)
+DIGEST_BATCH_SIZE = 500
 
 class EmailNotificationService:
     def __init__(self, db_path="traceback_100k.db"):
         self.db_path = db_path
         
         # Try to load email config
-        try:
-            from email_config import EMAIL_CONFIG
-            self.smtp_config = EMAIL_CONFIG
-            self.enabled = True
-        except ImportError:
+        self.smtp_config = load_smtp_config()
+        self.enabled = self.smtp_config is not None
+        if not self.enabled:
             print("⚠️  email_config.py not found! Email notifications disabled.")
             print("📋 To enable, copy email_config_template.py to email_config.py and update it")
             self.enabled = False
@@ -30,27 +29,41 @@ class EmailNotificationService:
             print(f"📧 [DISABLED] Would send email to {to_email}: {subject}")
             return False
         
-        try:
-            msg = MIMEMultipart('alternative')
-            msg['From'] = f"{self.smtp_config['from_name']} <{self.smtp_config['email']}>"
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Connect and send
-            with smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port']) as server:
-                server.starttls()
-                server.login(self.smtp_config['email'], self.smtp_config['password'])
-                server.send_message(msg)
-            
+        if get_transport(self.smtp_config).send(to_email, subject, html_content):
             print(f"✅ Sent email to {to_email}: {subject}")
             return True
-            
-        except Exception as e:
-            print(f"❌ Failed to send email to {to_email}: {e}")
-            return False
+        return False
+    
+    def queue_notifications(self, found_item_id, notification_type, recipients, subject, html_content):
+        """
+        Queue one email per recipient in the outbox and record them in email_notifications
+        
+        Both writes happen in one transaction. The outbox dedupe key
+        (type:item:email) makes queueing an already-notified user a no-op.
+        
+        Returns:
+            Number of emails newly queued
+        """
+        if not recipients:
+            return 0
+        
+        outbox = get_outbox(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=20)
+        try:
+            queued = outbox.enqueue_many([
+                (email, subject, html_content, 'html', f"{notification_type}:{found_item_id}:{email}")
+                for email in recipients
+            ], conn)
+            conn.executemany("""
+                INSERT OR IGNORE INTO email_notifications 
+                (found_item_id, user_email, notification_type) 
+                VALUES (?, ?, ?)
+            """, [(found_item_id, email, notification_type) for email in recipients])
+            conn.commit()
+        finally:
+            conn.close()
+        
+        return queued
     
     def get_email_template(self, item_title, category, location, date_found, item_id):
         """Generate HTML email template for new public found item"""
@@ -191,6 +204,124 @@ class EmailNotificationService:
     </div>
 </body>
 </html>
+"""
+    
+    def get_public_digest_email_template(self, items):
+        """
+        Generate HTML digest email listing several found items that became public
+        
+        Args:
+            items: List of dictionaries with title, category, location, date_found
+        """
+        item_blocks = "".join(f"""
+        <div class="item-details">
+            <h3 style="margin-top: 0; color: #667eea;">📦 {item['title']}</h3>
+            <div class="detail-row">
+                <span class="detail-label">Category:</span>
+                <span class="detail-value">{item['category']}</span>
+            </div>
+            <div class="detail-row">
+                <span class="detail-label">Location:</span>
+                <span class="detail-value">{item['location']}</span>
+            </div>
+            <div class="detail-row">
+                <span class="detail-label">Date Found:</span>
+                <span class="detail-value">{item['date_found']}</span>
+            </div>
+        </div>
+""" for item in items)
+        
+        return f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {{
+            font-family: Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+        }}
+        .header {{
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 30px;
+            text-align: center;
+            border-radius: 10px 10px 0 0;
+        }}
+        .content {{
+            background: #f9fafb;
+            padding: 30px;
+            border: 1px solid #e5e7eb;
+            border-radius: 0 0 10px 10px;
+        }}
+        .item-details {{
+            background: white;
+            padding: 20px;
+            border-radius: 8px;
+            margin: 20px 0;
+            border-left: 4px solid #667eea;
+        }}
+        .detail-row {{
+            display: flex;
+            margin: 10px 0;
+            padding: 8px 0;
+            border-bottom: 1px solid #e5e7eb;
+        }}
+        .detail-label {{
+            font-weight: bold;
+            color: #667eea;
+            min-width: 100px;
+        }}
+        .detail-value {{
+            color: #374151;
+        }}
+        .footer {{
+            text-align: center;
+            padding: 20px;
+            color: #6b7280;
+            font-size: 14px;
+        }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>🔔 {len(items)} New Found Items Available</h1>
+        <p>These found items have just become publicly visible</p>
+    </div>
+    
+    <div class="content">
+        <p>Hello,</p>
+        
+        <p>The following <strong>found items</strong> have completed their 72-hour privacy period and are now publicly available on TraceBack. Check if any of them might be something you lost!</p>
+        {item_blocks}
+        <p style="margin-top: 30px; color: #6b7280; font-size: 14px;">
+            <strong>How to Claim:</strong>
+        </p>
+        <ol style="color: #6b7280; font-size: 14px;">
+            <li>Visit the TraceBack Found Items page</li>
+            <li>Click "Claim This Item" if you believe it's yours</li>
+            <li>Answer the security questions (one attempt only)</li>
+            <li>Wait for the finder to review your answers</li>
+        </ol>
+        
+        <p style="margin-top: 20px; color: #6b7280; font-size: 14px;">
+            <strong>Remember:</strong> You only get <strong>ONE attempt</strong> to claim an item. Make sure you're certain before submitting your answers!
+        </p>
+    </div>
+    
+    <div class="footer">
+        <p><strong>TraceBack</strong> - Kent State University Lost & Found</p>
+        <p>Helping reunite you with your belongings</p>
+        <p style="font-size: 12px; margin-top: 20px;">
+            You received this email because you have an active account on TraceBack.<br>
+            To stop receiving these notifications, update your preferences in your dashboard.
+        </p>
+    </div>
+</body>
+</html>
 """
     
     def notify_users_of_public_item(self, found_item_id):
@@ -227,6 +358,7 @@ class EmailNotificationService:
                 return
             
             # Get all active users except the finder who haven't been notified yet about public status
+            # (email_notifications is written together with the outbox rows; the outbox dedupe key is the backstop)
             cursor.execute("""
                 SELECT u.email, u.full_name, u.first_name
                 FROM users u
@@ -266,47 +398,155 @@ class EmailNotificationService:
                 item_id=item['id']
             )
             
-            # Send emails in background thread to not block the main process
-            def send_batch():
-                success_count = 0
-                fail_count = 0
-                
-                # Track successful notifications in database
-                batch_conn = sqlite3.connect(self.db_path)
-                batch_cursor = batch_conn.cursor()
-                
-                for user in users:
-                    if self.send_email(user['email'], subject, html_content):
-                        success_count += 1
-                        # Record that this user was notified
-                        try:
-                            batch_cursor.execute("""
-                                INSERT OR IGNORE INTO email_notifications 
-                                (found_item_id, user_email, notification_type) 
-                                VALUES (?, ?, 'public')
-                            """, (found_item_id, user['email']))
-                            batch_conn.commit()
-                        except Exception as e:
-                            print(f"⚠️  Failed to record notification for {user['email']}: {e}")
+            # Queue in the outbox; the sender worker delivers them in batches
+            queued = self.queue_notifications(
+                found_item_id, 'public', [user['email'] for user in users], subject, html_content
+            )
+            
+            print(f"📧 Queued {queued} public item notifications for item {found_item_id}")
+            
+        except Exception as e:
+            print(f"❌ Error in notify_users_of_public_item: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    def notify_users_of_public_items_digest(self, found_item_ids):
+        """
+        Send ONE email per user listing every item that became public in this window,
+        instead of one email per user per item
+        
+        Each user gets the items they didn't find themselves and haven't been notified
+        about. A user with a single new item gets the regular single-item email.
+        Outbox rows and email_notifications rows are written with one executemany
+        each per batch of DIGEST_BATCH_SIZE users.
+        
+        Args:
+            found_item_ids: IDs of the found items that became public
+        
+        Returns:
+            Number of emails queued
+        """
+        if not self.enabled:
+            print(f"📧 Email notifications disabled - skipping digest for {len(found_item_ids)} items")
+            return 0
+        
+        found_item_ids = list(found_item_ids)
+        if not found_item_ids:
+            return 0
+        
+        try:
+            outbox = get_outbox(self.db_path)
+            conn = sqlite3.connect(self.db_path, timeout=20)
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            placeholders = ','.join('?' * len(found_item_ids))
+            
+            # Get found item details
+            cursor.execute(f"""
+                SELECT 
+                    f.id, f.title, f.date_found,
+                    c.name as category_name,
+                    l.name as location_name
+                FROM found_items f
+                LEFT JOIN categories c ON f.category_id = c.id
+                LEFT JOIN locations l ON f.location_id = l.id
+                WHERE f.id IN ({placeholders})
+            """, found_item_ids)
+            
+            items = {}
+            for row in cursor.fetchall():
+                try:
+                    formatted_date = datetime.strptime(row['date_found'], '%Y-%m-%d').strftime('%B %d, %Y')
+                except:
+                    formatted_date = row['date_found']
+                items[row['id']] = {
+                    'id': row['id'],
+                    'title': row['title'],
+                    'category': row['category_name'] or 'N/A',
+                    'location': row['location_name'] or 'N/A',
+                    'date_found': formatted_date
+                }
+            
+            # (user, item) pairs still to notify: active users, not the finder, not yet notified
+            cursor.execute(f"""
+                SELECT u.email, f.id as found_item_id
+                FROM users u
+                JOIN found_items f 
+                    ON f.id IN ({placeholders})
+                    AND u.email != COALESCE(f.finder_email, '')
+                LEFT JOIN email_notifications en 
+                    ON u.email = en.user_email 
+                    AND en.found_item_id = f.id
+                    AND en.notification_type = 'public'
+                WHERE u.is_active = 1 
+                AND u.is_verified = 1
+                AND en.notification_id IS NULL
+                ORDER BY u.email, f.id
+            """, found_item_ids)
+            
+            pending = {}
+            for row in cursor.fetchall():
+                pending.setdefault(row['email'], []).append(row['found_item_id'])
+            
+            if not pending:
+                print(f"📧 No users to notify for {len(found_item_ids)} newly public items")
+                conn.close()
+                return 0
+            
+            # Emails are identical for users with the same item set; render each set once
+            rendered = {}
+            
+            def render(item_ids):
+                key = tuple(item_ids)
+                if key not in rendered:
+                    if len(item_ids) == 1:
+                        item = items[item_ids[0]]
+                        rendered[key] = (
+                            f"🔔 New Found Item: {item['title']}",
+                            self.get_email_template(item['title'], item['category'], item['location'],
+                                                    item['date_found'], item['id'])
+                        )
                     else:
-                        fail_count += 1
-                
-                batch_conn.close()
+                        rendered[key] = (
+                            f"🔔 {len(item_ids)} New Found Items on TraceBack",
+                            self.get_public_digest_email_template([items[i] for i in item_ids])
+                        )
+                return rendered[key]
+            
+            users = list(pending.items())
+            queued = 0
+            for start in range(0, len(users), DIGEST_BATCH_SIZE):
+                batch = users[start:start + DIGEST_BATCH_SIZE]
+                messages = []
+                notification_rows = []
+                for email, item_ids in batch:
+                    item_ids = [i for i in item_ids if i in items]
+                    if not item_ids:
+                        continue
+                    subject, html_content = render(item_ids)
+                    dedupe_key = f"public_digest:{email}:{'-'.join(str(i) for i in item_ids)}"
+                    messages.append((email, subject, html_content, 'html', dedupe_key))
+                    notification_rows.extend((i, email, 'public') for i in item_ids)
                 
-                print(f"📧 Email notification batch complete for item {found_item_id}:")
-                print(f"   ✅ Sent: {success_count}")
-                print(f"   ❌ Failed: {fail_count}")
+                queued += outbox.enqueue_many(messages, conn)
+                cursor.executemany("""
+                    INSERT OR IGNORE INTO email_notifications 
+                    (found_item_id, user_email, notification_type) 
+                    VALUES (?, ?, ?)
+                """, notification_rows)
+                conn.commit()
             
-            # Start background thread
-            thread = threading.Thread(target=send_batch, daemon=True)
-            thread.start()
+            conn.close()
             
-            print(f"📧 Started email notification process for item {found_item_id} to {len(users)} users")
+            print(f"📧 Queued {queued} digest emails covering {len(items)} newly public items "
+                  f"(instead of {sum(len(ids) for ids in pending.values())} per-item emails)")
+            return queued
             
         except Exception as e:
-            print(f"❌ Error in notify_users_of_public_item: {e}")
+            print(f"❌ Error in notify_users_of_public_items_digest: {e}")
             import traceback
             traceback.print_exc()
+            return 0
     
     def get_claimed_item_email_template(self, item_title, category, location, date_found, claimer_count):
         """Generate HTML email template for item moved to claimed section"""
@@ -479,6 +719,7 @@ class EmailNotificationService:
             
             # Get all active users except the finder who haven't been notified yet about claimed status
             # Use different notification type to differentiate from public item notifications
+            # (email_notifications is written together with the outbox rows; the outbox dedupe key is the backstop)
             cursor.execute("""
                 SELECT u.email, u.full_name, u.first_name
                 FROM users u
@@ -518,42 +759,12 @@ class EmailNotificationService:
                 claimer_count=item['claimer_count']
             )
             
-            # Send emails in background thread
-            def send_batch():
-                success_count = 0
-                fail_count = 0
-                
-                # Track successful notifications in database
-                batch_conn = sqlite3.connect(self.db_path)
-                batch_cursor = batch_conn.cursor()
-                
-                for user in users:
-                    if self.send_email(user['email'], subject, html_content):
-                        success_count += 1
-                        # Record that this user was notified about claimed status
-                        try:
-                            batch_cursor.execute("""
-                                INSERT OR IGNORE INTO email_notifications 
-                                (found_item_id, user_email, notification_type) 
-                                VALUES (?, ?, 'claimed')
-                            """, (found_item_id, user['email']))
-                            batch_conn.commit()
-                        except Exception as e:
-                            print(f"⚠️  Failed to record claimed notification for {user['email']}: {e}")
-                    else:
-                        fail_count += 1
-                
-                batch_conn.close()
-                
-                print(f"📧 Claimed item email notification batch complete for item {found_item_id}:")
-                print(f"   ✅ Sent: {success_count}")
-                print(f"   ❌ Failed: {fail_count}")
-            
-            # Start background thread
-            thread = threading.Thread(target=send_batch, daemon=True)
-            thread.start()
+            # Queue in the outbox; the sender worker delivers them in batches
+            queued = self.queue_notifications(
+                found_item_id, 'claimed', [user['email'] for user in users], subject, html_content
+            )
             
-            print(f"📧 Started claimed item notification process for item {found_item_id} to {len(users)} users")
+            print(f"📧 Queued {queued} claimed item notifications for item {found_item_id}")
             
         except Exception as e:
             print(f"❌ Error in notify_users_of_claimed_item: {e}")
@@ -731,22 +942,8 @@ class EmailNotificationService:
                 conn.close()
                 return
             
-            # Check if finder has already been notified about decision time
-            cursor.execute("""
-                SELECT notification_id 
-                FROM email_notifications 
-                WHERE found_item_id = ? 
-                AND user_email = ? 
-                AND notification_type = 'decision_time'
-            """, (found_item_id, item['finder_email']))
-            
-            already_notified = cursor.fetchone()
             conn.close()
             
-            if already_notified:
-                print(f"📧 Finder already notified about decision time for item {found_item_id}")
-                return
-            
             # Prepare email content
             subject = f"⏰ Decision Time: {item['title']} - Action Required"
             
@@ -765,22 +962,11 @@ class EmailNotificationService:
                 claimer_count=item['claimer_count']
             )
             
-            # Send email
-            if self.send_email(item['finder_email'], subject, html_content):
-                # Record notification
-                try:
-                    conn = sqlite3.connect(self.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO email_notifications 
-                        (found_item_id, user_email, notification_type) 
-                        VALUES (?, ?, 'decision_time')
-                    """, (found_item_id, item['finder_email']))
-                    conn.commit()
-                    conn.close()
-                    print(f"📧 Sent finder decision notification for item {found_item_id} to {item['finder_email']}")
-                except Exception as e:
-                    print(f"⚠️  Failed to record finder notification: {e}")
+            # Queue in the outbox (dedupe key: one decision email per item)
+            if self.queue_notifications(found_item_id, 'decision_time', [item['finder_email']], subject, html_content):
+                print(f"📧 Queued finder decision notification for item {found_item_id} to {item['finder_email']}")
+            else:
+                print(f"📧 Finder already notified about decision time for item {found_item_id}")
             
         except Exception as e:
             print(f"❌ Error in notify_finder_decision_time: {e}")
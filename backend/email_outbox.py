@@ -0,0 +1,405 @@
+"""
+TraceBack Email Outbox
+Durable outbound email queue. Producers insert rows into email_outbox (optionally
+inside their own transaction) and a sender worker delivers them in batches over
+one pooled SMTP connection (mail_transport.py), recording success or scheduling
+a retry with exponential backoff.
+
+- dedupe_key is UNIQUE: queueing the same notification twice is a no-op, so it
+  replaces per-feature "already emailed?" checks
+- a crash mid-batch leaves rows 'sending'; they are re-queued after STALE_AFTER_SECONDS
+- get_outbox(db_path) returns the process-wide outbox and starts its worker thread
+
+Run a standalone sender (e.g. next to the schedulers):
+    python email_outbox.py
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traceback_100k.db')
+
+# Messages claimed and sent per round (one SMTP connection per round)
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '50'))
+
+# Seconds the worker sleeps when nothing is due
+OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', '2.0'))
+
+# Attempts before a message is marked 'failed'; delay doubles after each failure
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+
+# 'sending' rows older than this belong to a crashed worker and are re-queued
+STALE_AFTER_SECONDS = 10 * 60
+
+# Bodies of sent messages older than this are cleared by compact() (keys are kept for dedupe)
+RETENTION_DAYS = 30
+
+
+class EmailOutbox:
+    def __init__(self, db_path, batch_size=OUTBOX_BATCH_SIZE, poll_interval=OUTBOX_POLL_INTERVAL):
+        """
+        Initialize the outbox (creates the email_outbox table if needed)
+
+        Args:
+            db_path: Path to the database
+            batch_size: Messages sent per round
+            poll_interval: Seconds between polls when the outbox is empty
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._transport_warning = None
+        self.init_email_outbox_table()
+
+    def get_db_connection(self):
+        """Get database connection (autocommit; transactions are explicit)"""
+        conn = sqlite3.connect(self.db_path, timeout=20.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_email_outbox_table(self):
+        """Create email_outbox table if it doesn't exist"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS email_outbox (
+                outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                dedupe_key TEXT UNIQUE,
+                to_email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body TEXT,
+                body_format TEXT NOT NULL DEFAULT 'text',
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                claimed_at TIMESTAMP,
+                sent_at TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_email_outbox_status_next
+            ON email_outbox(status, next_attempt_at)
+        ''')
+
+        conn.close()
+
+    def enqueue(self, to_email, subject, body, body_format='text', dedupe_key=None, conn=None):
+        """
+        Queue one email
+
+        Args:
+            to_email: Recipient address
+            subject: Subject line
+            body: Plain text (wrapped in the standard TraceBack template) or HTML
+            body_format: 'text' or 'html'
+            dedupe_key: Unique key for this notification; queueing an existing key is a no-op
+            conn: Optional open connection, so the row commits with the caller's transaction
+
+        Returns:
+            True if queued, False if the dedupe_key was already queued
+        """
+        return self.enqueue_many([(to_email, subject, body, body_format, dedupe_key)], conn) == 1
+
+    def enqueue_many(self, messages, conn=None):
+        """
+        Queue many emails with one statement
+
+        Args:
+            messages: List of (to_email, subject, body, body_format, dedupe_key) tuples
+            conn: Optional open connection (caller commits)
+
+        Returns:
+            Number of messages queued (dedupe hits excluded)
+        """
+        if not messages:
+            return 0
+
+        own_conn = conn is None
+        if own_conn:
+            conn = self.get_db_connection()
+
+        try:
+            before = conn.total_changes
+            conn.executemany('''
+                INSERT OR IGNORE INTO email_outbox (to_email, subject, body, body_format, dedupe_key)
+                VALUES (?, ?, ?, ?, ?)
+            ''', messages)
+            queued = conn.total_changes - before
+        finally:
+            if own_conn:
+                conn.close()
+
+        self._wakeup.set()
+        return queued
+
+    def is_queued(self, dedupe_key, conn=None):
+        """True if a message with this dedupe_key was ever queued"""
+        own_conn = conn is None
+        if own_conn:
+            conn = self.get_db_connection()
+        row = conn.execute('SELECT 1 FROM email_outbox WHERE dedupe_key = ?', (dedupe_key,)).fetchone()
+        if own_conn:
+            conn.close()
+        return row is not None
+
+    def claim_batch(self, limit=None):
+        """
+        Atomically move up to `limit` due messages to 'sending'
+
+        Returns:
+            List of row dictionaries (empty if nothing is due or the DB is busy)
+        """
+        limit = limit or self.batch_size
+        conn = self.get_db_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+
+            conn.execute(f'''
+                UPDATE email_outbox SET status = 'pending'
+                WHERE status = 'sending'
+                AND claimed_at < datetime('now', '-{STALE_AFTER_SECONDS} seconds')
+            ''')
+
+            rows = conn.execute('''
+                SELECT outbox_id, to_email, subject, body, body_format, attempts
+                FROM email_outbox
+                WHERE status = 'pending' AND next_attempt_at <= CURRENT_TIMESTAMP
+                ORDER BY outbox_id
+                LIMIT ?
+            ''', (limit,)).fetchall()
+
+            conn.executemany('''
+                UPDATE email_outbox SET status = 'sending', claimed_at = CURRENT_TIMESTAMP
+                WHERE outbox_id = ?
+            ''', [(row['outbox_id'],) for row in rows])
+            conn.execute('COMMIT')
+
+            return [dict(row) for row in rows]
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            print(f"⚠️ Could not claim outbox messages ({e})")
+            return []
+        finally:
+            conn.close()
+
+    def record_results(self, rows, results, errors=None):
+        """Mark sent messages, and schedule retries (or give up) for failed ones"""
+        errors = errors or [None] * len(rows)
+        sent = []
+        retry = []
+        failed = []
+        for row, ok, error in zip(rows, results, errors):
+            attempts = row['attempts'] + 1
+            error = error or 'send failed'
+            if ok:
+                sent.append((attempts, row['outbox_id']))
+            elif attempts < MAX_ATTEMPTS:
+                delay = RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+                retry.append((attempts, error, f'+{delay} seconds', row['outbox_id']))
+            else:
+                failed.append((attempts, error, row['outbox_id']))
+
+        conn = self.get_db_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        conn.executemany('''
+            UPDATE email_outbox SET status = 'sent', attempts = ?, sent_at = CURRENT_TIMESTAMP,
+                   last_error = NULL
+            WHERE outbox_id = ?
+        ''', sent)
+        conn.executemany('''
+            UPDATE email_outbox SET status = 'pending', attempts = ?, last_error = ?,
+                   next_attempt_at = datetime('now', ?)
+            WHERE outbox_id = ?
+        ''', retry)
+        conn.executemany('''
+            UPDATE email_outbox SET status = 'failed', attempts = ?, last_error = ?
+            WHERE outbox_id = ?
+        ''', failed)
+        conn.execute('COMMIT')
+        conn.close()
+
+        return len(sent), len(retry), len(failed)
+
+    def build_messages(self, transport, rows):
+        """Turn outbox rows into MIME messages"""
+        from email_verification_service import render_generic_email
+
+        messages = []
+        for row in rows:
+            html = row['body'] if row['body_format'] == 'html' else render_generic_email(row['body'])
+            messages.append(transport.build_message(row['to_email'], row['subject'], html))
+        return messages
+
+    def get_transport(self):
+        """
+        Shared transport for EMAIL_CONFIG
+
+        Returns:
+            MailTransport, or None while email is disabled (no email_config.py, the same
+            check as EmailNotificationService.enabled) or misconfigured
+        """
+        from mail_transport import get_transport, load_smtp_config
+
+        smtp_config = load_smtp_config()
+        if smtp_config is None:
+            self._warn_transport("email_config.py not found - outbox messages stay pending")
+            return None
+        try:
+            transport = get_transport(smtp_config)
+        except Exception as e:
+            self._warn_transport(f"email_config.py is misconfigured ({e}) - outbox messages stay pending")
+            return None
+        self._transport_warning = None
+        return transport
+
+    def _warn_transport(self, warning):
+        # Printed once per problem, not on every poll
+        if warning != self._transport_warning:
+            print(f"⚠️ {warning}")
+            self._transport_warning = warning
+
+    def send_pending(self, transport=None):
+        """
+        Claim and send one batch of due messages
+
+        Nothing is claimed while there is no transport, so messages wait as 'pending'
+        instead of cycling through 'sending'.
+
+        Args:
+            transport: MailTransport to send with (default: shared transport for EMAIL_CONFIG)
+
+        Returns:
+            Number of messages claimed (0 when the outbox is empty or email is disabled)
+        """
+        if transport is None:
+            transport = self.get_transport()
+            if transport is None:
+                return 0
+
+        rows = self.claim_batch()
+        if not rows:
+            return 0
+
+        errors = []
+        try:
+            results = transport.send_many(self.build_messages(transport, rows), errors)
+        except Exception as e:
+            # Count it against the claimed rows so they back off and eventually fail
+            results = [False] * len(rows)
+            errors = [str(e)] * len(rows)
+        sent, retry, failed = self.record_results(rows, results, errors)
+
+        print(f"📤 Outbox: sent {sent}, retrying {retry}, failed {failed}")
+        return len(rows)
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.send_pending()
+            except Exception as e:
+                print(f"❌ Outbox worker error: {e}")
+                claimed = 0
+
+            if claimed:
+                continue
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def start_worker(self):
+        """Start the background sender thread (safe to call more than once)"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._worker_loop, name='email-outbox', daemon=True)
+            self._thread.start()
+        print("📤 Email outbox worker started")
+
+    def stop_worker(self, timeout=5):
+        """Signal the sender thread to exit and wait for it"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def get_stats(self):
+        """Message counts per status"""
+        conn = self.get_db_connection()
+        rows = conn.execute('SELECT status, COUNT(*) FROM email_outbox GROUP BY status').fetchall()
+        conn.close()
+        return {status: count for status, count in rows}
+
+    def compact(self):
+        """Drop bodies of old sent messages (rows and dedupe keys are kept)"""
+        conn = self.get_db_connection()
+        cursor = conn.execute(f'''
+            UPDATE email_outbox SET body = NULL
+            WHERE status = 'sent' AND body IS NOT NULL
+            AND sent_at < datetime('now', '-{RETENTION_DAYS} days')
+        ''')
+        conn.close()
+        return cursor.rowcount
+
+
+_outboxes = {}
+_outboxes_lock = threading.Lock()
+
+
+def get_outbox(db_path=DB_PATH, start_worker=True):
+    """
+    Get the process-wide outbox for a database
+
+    Args:
+        db_path: Path to the database
+        start_worker: Start the sender thread in this process (default True)
+
+    Returns:
+        EmailOutbox
+    """
+    key = os.path.abspath(db_path)
+    with _outboxes_lock:
+        outbox = _outboxes.get(key)
+        if outbox is None:
+            outbox = EmailOutbox(db_path)
+            _outboxes[key] = outbox
+
+    if start_worker:
+        outbox.start_worker()
+    return outbox
+
+
+def queue_email(to_email, subject, body, dedupe_key=None, db_path=DB_PATH, conn=None):
+    """
+    Queue a plain-text notification email (drop-in replacement for send_email)
+
+    Returns:
+        True if queued, False if dedupe_key was already queued
+    """
+    return get_outbox(db_path).enqueue(to_email, subject, body, 'text', dedupe_key, conn)
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    outbox = EmailOutbox(db_path)
+    print(f"📤 Email outbox sender running on {db_path} (Ctrl+C to stop)")
+    print(f"   Pending: {outbox.get_stats()}")
+    try:
+        while True:
+            if not outbox.send_pending():
+                time.sleep(outbox.poll_interval)
+    except KeyboardInterrupt:
+        print("\n👋 Outbox sender stopped")
@@ -3,17 +3,16 @@ TrackeBack Email Verification System
 Sends verification codes to @kent.edu email addresses
 """
 
-import smtplib
 import random
 import string
 import sqlite3
 from datetime import datetime, timedelta
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
 import json
 import threading
 from flask import request, jsonify
+from mail_transport import get_transport
+import db_pool
 
 class EmailVerificationService:
     def __init__(self, db_path="traceback_100k.db"):
@@ -48,7 +47,7 @@ class EmailVerificationService:
     
     def init_verification_table(self):
         """Create verification codes table if it doesn't exist"""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -140,30 +139,13 @@ class EmailVerificationService:
     def _send_email_async(self, email, verification_code, item_title, item_type):
         """Send email in background thread"""
         try:
-            # Create email
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f"TraceBack Verification Code: {verification_code}"
-            msg['From'] = f"{self.smtp_config['from_name']} <{self.smtp_config['email']}>"
-            msg['To'] = email
-            
-            # Create HTML content
             html_content = self.create_email_template(verification_code, item_title, item_type)
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Send email with timeout
-            server = smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'], timeout=10)
-            server.starttls()
-            server.login(self.smtp_config['email'], self.smtp_config['password'])
+            subject = f"TraceBack Verification Code: {verification_code}"
             
-            text = msg.as_string()
-            server.sendmail(self.smtp_config['email'], email, text)
-            server.quit()
+            # Pooled SMTP connection (no handshake per code)
+            if get_transport(self.smtp_config).send(email, subject, html_content):
+                print(f"✅ Verification email sent successfully to {email}")
             
-            print(f"✅ Verification email sent successfully to {email}")
-            
-        except smtplib.SMTPException as e:
-            print(f"❌ SMTP error sending email to {email}: {str(e)}")
         except Exception as e:
             print(f"❌ Error sending email to {email}: {str(e)}")
     
@@ -178,7 +160,7 @@ class EmailVerificationService:
         verification_code = self.generate_verification_code()
         
         # Store in database
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         cursor = conn.cursor()
         
         # Clean up old codes for this email
@@ -209,7 +191,7 @@ class EmailVerificationService:
     
     def verify_code(self, email, code):
         """Verify the email code"""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         cursor = conn.cursor()
         
         # Get the verification record
@@ -258,7 +240,7 @@ class EmailVerificationService:
     
     def is_email_verified(self, email):
         """Check if email is already verified"""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -275,51 +257,11 @@ class EmailVerificationService:
     def send_generic_email(self, to_email, subject, body):
         """Send a generic email (for moderation notifications, etc.)"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.smtp_config['from_name']} <{self.smtp_config['email']}>"
-            msg['To'] = to_email
-            
-            # Create HTML version
-            html_body = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                    .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 10px 10px 0 0; }}
-                    .content {{ background: white; padding: 30px; border-left: 3px solid #667eea; border-right: 3px solid #667eea; }}
-                    .footer {{ background: #f7fafc; padding: 20px; text-align: center; border-radius: 0 0 10px 10px; border-top: 1px solid #e2e8f0; }}
-                    pre {{ white-space: pre-wrap; background: #f7fafc; padding: 15px; border-radius: 5px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h2 style="margin:0;">TraceBack Notification</h2>
-                    </div>
-                    <div class="content">
-                        <pre>{body}</pre>
-                    </div>
-                    <div class="footer">
-                        <p style="margin:0; color: #718096;">This is an automated email from TrackeBack</p>
-                        <p style="margin:5px 0 0 0; color: #718096;">Kent State University</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
-            
-            html_part = MIMEText(html_body, 'html')
-            msg.attach(html_part)
+            html_body = render_generic_email(body)
             
-            # Send email
-            server = smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'], timeout=10)
-            server.starttls()
-            server.login(self.smtp_config['email'], self.smtp_config['password'])
-            server.sendmail(self.smtp_config['email'], to_email, msg.as_string())
-            server.quit()
+            # Send over a pooled SMTP connection
+            if not get_transport(self.smtp_config).send(to_email, subject, html_body):
+                return False
             
             print(f"✅ Email sent successfully to {to_email}")
             return True
@@ -328,11 +270,50 @@ class EmailVerificationService:
             print(f"❌ Error sending email to {to_email}: {str(e)}")
             return False
 
+def render_generic_email(body):
+    """Wrap a plain-text notification body in the standard TraceBack HTML email"""
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 10px 10px 0 0; }}
+            .content {{ background: white; padding: 30px; border-left: 3px solid #667eea; border-right: 3px solid #667eea; }}
+            .footer {{ background: #f7fafc; padding: 20px; text-align: center; border-radius: 0 0 10px 10px; border-top: 1px solid #e2e8f0; }}
+            pre {{ white-space: pre-wrap; background: #f7fafc; padding: 15px; border-radius: 5px; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h2 style="margin:0;">TraceBack Notification</h2>
+            </div>
+            <div class="content">
+                <pre>{body}</pre>
+            </div>
+            <div class="footer">
+                <p style="margin:0; color: #718096;">This is an automated email from TrackeBack</p>
+                <p style="margin:5px 0 0 0; color: #718096;">Kent State University</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
 # Convenience function for importing
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
 def send_email(to_email, subject, body):
-    """Standalone function for sending emails"""
-    service = EmailVerificationService()
-    return service.send_generic_email(to_email, subject, body)
+    """Standalone function for sending emails (one shared service and SMTP pool per process)"""
+    global _shared_service
+    if _shared_service is None:
+        with _shared_service_lock:
+            if _shared_service is None:
+                _shared_service = EmailVerificationService()
+    return _shared_service.send_generic_email(to_email, subject, body)
 
 # Flask routes to add to your comprehensive_app.py
 def add_verification_routes(app, verification_service):
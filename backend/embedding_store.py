@@ -0,0 +1,172 @@
+"""
+Persistent Text Embedding Store
+Caches sentence-transformer description embeddings per item so each description
+is encoded once instead of once per (lost, found) pair
+"""
+
+import hashlib
+import sqlite3
+import numpy as np
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_CHUNK_SIZE = 500
+
+
+class EmbeddingStore:
+    def __init__(self, db_path, model_name='traceback_text_similarity_model'):
+        """
+        Initialize the embedding store
+
+        Args:
+            db_path: Path to the database
+            model_name: Name of the model that produced the vectors (part of the key,
+                        so switching models never serves stale embeddings)
+        """
+        self.db_path = db_path
+        self.model_name = model_name
+        self.init_embeddings_table()
+
+    def get_db_connection(self):
+        """Get database connection"""
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        return conn
+
+    def init_embeddings_table(self):
+        """Create item_embeddings table if it doesn't exist"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS item_embeddings (
+                item_type TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                model_name TEXT NOT NULL,
+                description_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (item_type, item_id, model_name)
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def description_hash(description):
+        """Stable hash of a description, used to detect edited items"""
+        return hashlib.sha1((description or '').encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def to_blob(vector):
+        """Serialize a vector as a float32 blob"""
+        return np.asarray(vector, dtype=np.float32).tobytes()
+
+    @staticmethod
+    def from_blob(blob, dim):
+        """Deserialize a float32 blob into a vector"""
+        return np.frombuffer(blob, dtype=np.float32, count=dim)
+
+    def get_many(self, item_type, items):
+        """
+        Look up stored embeddings for a list of items
+
+        Args:
+            item_type: 'lost' or 'found'
+            items: List of (item_id, description) tuples
+
+        Returns:
+            Dictionary of item_id -> embedding for items whose stored hash still
+            matches the current description
+        """
+        wanted = {item_id: self.description_hash(desc) for item_id, desc in items}
+        if not wanted:
+            return {}
+
+        found = {}
+        conn = self.get_db_connection()
+        ids = list(wanted.keys())
+
+        for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+            chunk = ids[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(f'''
+                SELECT item_id, description_hash, dim, embedding
+                FROM item_embeddings
+                WHERE item_type = ? AND model_name = ? AND item_id IN ({placeholders})
+            ''', (item_type, self.model_name, *chunk)).fetchall()
+
+            for item_id, desc_hash, dim, blob in rows:
+                if wanted.get(item_id) == desc_hash:
+                    found[item_id] = self.from_blob(blob, dim)
+
+        conn.close()
+        return found
+
+    def put_many(self, item_type, entries):
+        """
+        Store embeddings, replacing any previous vector for the same item
+
+        Args:
+            item_type: 'lost' or 'found'
+            entries: List of (item_id, description, embedding) tuples
+        """
+        if not entries:
+            return
+
+        rows = [
+            (item_type, item_id, self.model_name, self.description_hash(desc),
+             int(np.asarray(vec).shape[-1]), self.to_blob(vec))
+            for item_id, desc, vec in entries
+        ]
+
+        conn = self.get_db_connection()
+        try:
+            conn.executemany('''
+                INSERT OR REPLACE INTO item_embeddings
+                (item_type, item_id, model_name, description_hash, dim, embedding, computed_at)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', rows)
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            # Caching is best-effort: a busy database must not fail the match itself
+            print(f"⚠️ Could not store {len(rows)} embeddings (will recompute next time): {e}")
+        finally:
+            conn.close()
+
+    def get_or_compute(self, item_type, items, encode_fn):
+        """
+        Return embeddings for all items, encoding only the ones not yet stored
+
+        Args:
+            item_type: 'lost' or 'found'
+            items: List of (item_id, description) tuples
+            encode_fn: Callable taking a list of strings and returning a 2D array
+
+        Returns:
+            Dictionary of item_id -> embedding (items without a description are skipped)
+        """
+        items = [(item_id, desc) for item_id, desc in items if desc]
+        embeddings = self.get_many(item_type, items)
+
+        missing = [(item_id, desc) for item_id, desc in items if item_id not in embeddings]
+        if missing:
+            vectors = encode_fn([desc for _, desc in missing])
+            new_entries = []
+            for (item_id, desc), vec in zip(missing, vectors):
+                vec = np.asarray(vec, dtype=np.float32)
+                embeddings[item_id] = vec
+                new_entries.append((item_id, desc, vec))
+            self.put_many(item_type, new_entries)
+
+        return embeddings
+
+    def delete(self, item_type, item_id):
+        """Remove stored embeddings for an item (all models)"""
+        conn = self.get_db_connection()
+        conn.execute(
+            'DELETE FROM item_embeddings WHERE item_type = ? AND item_id = ?',
+            (item_type, item_id)
+        )
+        conn.commit()
+        conn.close()
@@ -0,0 +1,193 @@
+"""
+Endpoint Queries
+SQL for the hottest API endpoints, kept in one place so test_query_plans.py checks
+the exact statements the endpoints run (and not a copy that can drift).
+
+Every statement here must be answered by index seeks; see HOT_PATH_INDEXES in
+db_migrations.py for the indexes they rely on.
+"""
+
+# Dashboard: the user's open lost items, newest first (page/offset pagination)
+LOST_ITEMS_DASHBOARD_SQL = '''
+    SELECT l.rowid as id, l.*, c.name as category_name, loc.name as location_name
+    FROM lost_items l
+    LEFT JOIN categories c ON l.category_id = c.id
+    LEFT JOIN locations loc ON l.location_id = loc.id
+    WHERE l.is_resolved = 0 AND l.user_email = ?
+    ORDER BY l.created_at DESC
+    LIMIT ? OFFSET ?
+'''
+
+# Dashboard with keyset pagination; {keyset_condition} is '' for the first page,
+# LOST_ITEMS_KEYSET_CONDITION after that. One extra row tells whether there is a next page
+LOST_ITEMS_DASHBOARD_PAGE_SQL = '''
+    SELECT l.rowid as id, l.*, c.name as category_name, loc.name as location_name
+    FROM lost_items l
+    LEFT JOIN categories c ON l.category_id = c.id
+    LEFT JOIN locations loc ON l.location_id = loc.id
+    WHERE l.is_resolved = 0 AND l.user_email = ?
+    {keyset_condition}
+    ORDER BY l.created_at DESC, l.rowid DESC
+    LIMIT ?
+'''
+LOST_ITEMS_KEYSET_CONDITION = 'AND (l.created_at, l.rowid) < (?, ?)'
+
+# Browse: leave out items that are in their claim window (have a potential claimer)
+CLAIM_WINDOW_FILTER = '''NOT EXISTS (
+            SELECT 1
+            FROM claim_attempts ca
+            WHERE ca.found_item_id = f.rowid
+              AND ca.success = 1
+              AND ca.marked_as_potential_at IS NOT NULL
+        )'''
+
+# Browse: found items that haven't been claimed
+UNCLAIMED_FILTER = "(f.status IS NULL OR f.status != 'CLAIMED')"
+
+# Public browse: only items past their 3-day privacy window (public_at is indexed)
+PUBLIC_BROWSE_FILTER = "f.public_at <= datetime('now', 'localtime')"
+
+# Browse total; {where_clause} joins the filters above (plus the request's) with AND
+FOUND_ITEMS_BROWSE_COUNT_SQL = '''
+    SELECT COUNT(*) as total
+    FROM found_items f
+    JOIN categories c ON f.category_id = c.id
+    JOIN locations loc ON f.location_id = loc.id
+    WHERE {where_clause}
+'''
+
+# Claim review: potential claimers an item already has
+POTENTIAL_CLAIMER_COUNT_SQL = '''
+    SELECT COUNT(*) as count
+    FROM claim_attempts
+    WHERE found_item_id = ? AND success = 1
+'''
+
+# User dashboard: the user's found reports, newest first
+FOUND_REPORTS_BY_FINDER_SQL = '''
+    SELECT f.rowid as id, f.category_id, f.location_id, f.title, f.description,
+           f.color, f.size, f.image_filename, f.date_found, f.time_found,
+           f.current_location, f.finder_notes, f.is_private, f.privacy_expires_at,
+           f.is_claimed, f.status, f.created_at, f.privacy_expires,
+           f.finder_name, f.finder_email, f.finder_phone,
+           c.name as category_name, c.name as category,
+           loc.name as location_name, loc.name as location,
+           loc.building_code, loc.description as location_description
+    FROM found_items f
+    LEFT JOIN categories c ON f.category_id = c.id
+    LEFT JOIN locations loc ON f.location_id = loc.id
+    WHERE f.finder_email = ?
+    ORDER BY f.created_at DESC
+'''
+
+# Matches summary: scores of matches on the user's lost and found reports
+# (params: email, min score, email, min score)
+USER_MATCH_SCORES_SQL = '''
+    SELECT m.match_score
+    FROM ml_matches m
+    JOIN lost_items l ON m.lost_item_id = l.rowid
+    WHERE l.user_email = ? AND m.match_score >= ?
+    UNION ALL
+    SELECT m.match_score
+    FROM ml_matches m
+    JOIN found_items f ON m.found_item_id = f.rowid
+    WHERE f.finder_email = ? AND m.match_score >= ?
+'''
+
+# Conversation list: unread messages per conversation for the receiver
+UNREAD_COUNTS_SQL = '''
+    SELECT conversation_id, COUNT(*) as count
+    FROM messages
+    WHERE receiver_id = ? AND is_read = 0
+    GROUP BY conversation_id
+'''
+
+# Conversation thread, oldest first (deleted users are anonymized)
+CONVERSATION_MESSAGES_SQL = '''
+    SELECT
+        message_id,
+        conversation_id,
+        sender_id,
+        receiver_id,
+        CASE WHEN sender_id = -1 THEN '[Deleted User]' ELSE sender_name END as sender_name,
+        CASE WHEN receiver_id = -1 THEN '[Deleted User]' ELSE receiver_name END as receiver_name,
+        CASE WHEN sender_id = -1 THEN 'deleted@traceback.local' ELSE sender_email END as sender_email,
+        CASE WHEN receiver_id = -1 THEN 'deleted@traceback.local' ELSE receiver_email END as receiver_email,
+        message_text,
+        is_read,
+        created_at,
+        item_id,
+        item_type,
+        item_title
+    FROM messages
+    WHERE conversation_id = ?
+    ORDER BY created_at ASC
+'''
+
+# Success history: returns where the user was the owner (finder), newest first
+SUCCESS_HISTORY_OWNER_SQL = '''
+    SELECT
+        sr.return_id,
+        sr.item_title,
+        sr.item_description,
+        sr.item_category,
+        sr.item_location,
+        sr.date_found,
+        sr.claimer_email,
+        sr.claimer_name,
+        sr.claim_reason,
+        sr.finalized_date,
+        sr.finalized_at,
+        sr.days_to_finalize,
+        sr.verification_code,
+        u.phone_number as claimer_phone,
+        'owner' as role
+    FROM successful_returns sr
+    LEFT JOIN users u ON u.email = sr.claimer_email
+    WHERE sr.owner_email = ?
+    ORDER BY sr.finalized_date DESC
+'''
+
+# Success history: returns where the user was the claimer, newest first
+SUCCESS_HISTORY_CLAIMER_SQL = '''
+    SELECT
+        sr.return_id,
+        sr.item_title,
+        sr.item_description,
+        sr.item_category,
+        sr.item_location,
+        sr.date_found,
+        sr.owner_email,
+        sr.owner_name,
+        sr.claim_reason,
+        sr.finalized_date,
+        sr.finalized_at,
+        sr.days_to_finalize,
+        sr.verification_code,
+        u.phone_number as owner_phone,
+        'claimer' as role
+    FROM successful_returns sr
+    LEFT JOIN users u ON u.email = sr.owner_email
+    WHERE sr.claimer_email = ?
+    ORDER BY sr.finalized_date DESC
+'''
+
+# Public user directory (public profile fields only)
+USER_DIRECTORY_SQL = '''
+    SELECT
+        id,
+        full_name,
+        first_name,
+        last_name,
+        profile_image,
+        bio,
+        interests,
+        year_of_study,
+        major,
+        building_preference,
+        profile_completed
+    FROM users
+    WHERE is_active = 1
+    AND profile_completed = 1
+    ORDER BY full_name ASC
+'''
@@ -0,0 +1,282 @@
+"""
+Persistent Image Feature Store
+Caches the per-image features used by image similarity (2048-d ResNet-50 vector,
+mean LAB color, 96-bin LAB histogram) so each uploaded file goes through the
+network once instead of once per (lost, found) pair
+
+Features are keyed by filename plus a hash of the file contents, so a file that
+is replaced under the same name is re-extracted automatically
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Feature sets kept in memory (~8.6 KB each) so repeat lookups skip SQLite
+MAX_CACHED_FEATURES = 4096
+
+FEATURE_NAMES = ('resnet', 'mean_lab', 'hist_lab')
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_CHUNK_SIZE = 500
+
+
+class ImageFeatureStore:
+    def __init__(self, db_path, max_cached=MAX_CACHED_FEATURES):
+        """
+        Initialize the image feature store
+
+        Args:
+            db_path: Path to the database
+            max_cached: Number of feature sets kept in memory
+        """
+        self.db_path = db_path
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+        self._hashes = {}
+        self._lock = threading.Lock()
+        self.init_image_features_table()
+
+    def get_db_connection(self):
+        """Get database connection"""
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        return conn
+
+    def init_image_features_table(self):
+        """Create image_features table if it doesn't exist"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS image_features (
+                filename TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                resnet BLOB NOT NULL,
+                mean_lab BLOB NOT NULL,
+                hist_lab BLOB NOT NULL,
+                computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def content_hash(self, path):
+        """
+        SHA-1 of a file's contents
+
+        The hash is memoized on (path, mtime, size) so unchanged files are only
+        read once per process
+        """
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+
+        digest = self._hashes.get(key)
+        if digest is None:
+            sha1 = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    sha1.update(block)
+            digest = sha1.hexdigest()
+            self._hashes[key] = digest
+        return digest
+
+    def _remember(self, key, features):
+        with self._lock:
+            self._cache[key] = features
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def get(self, filename, content_hash):
+        """
+        Look up stored features
+
+        Args:
+            filename: Image filename as stored on the item
+            content_hash: Current hash of the file contents
+
+        Returns:
+            Dictionary of feature arrays, or None if missing or stale
+        """
+        key = (filename, content_hash)
+        with self._lock:
+            features = self._cache.get(key)
+            if features is not None:
+                self._cache.move_to_end(key)
+                return features
+
+        conn = self.get_db_connection()
+        row = conn.execute('''
+            SELECT resnet, mean_lab, hist_lab FROM image_features
+            WHERE filename = ? AND content_hash = ?
+        ''', (filename, content_hash)).fetchone()
+        conn.close()
+
+        if not row:
+            return None
+
+        features = {
+            name: np.frombuffer(blob, dtype=np.float32)
+            for name, blob in zip(FEATURE_NAMES, row)
+        }
+        self._remember(key, features)
+        return features
+
+    def get_many(self, entries):
+        """
+        Look up stored features for many files
+
+        Args:
+            entries: List of (filename, content_hash) tuples
+
+        Returns:
+            Dictionary of filename -> features for entries that are stored and current
+        """
+        wanted = dict(entries)
+        found = {}
+
+        with self._lock:
+            for filename, digest in wanted.items():
+                features = self._cache.get((filename, digest))
+                if features is not None:
+                    found[filename] = features
+
+        remaining = [filename for filename in wanted if filename not in found]
+        if not remaining:
+            return found
+
+        conn = self.get_db_connection()
+        for start in range(0, len(remaining), LOOKUP_CHUNK_SIZE):
+            chunk = remaining[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(f'''
+                SELECT filename, content_hash, resnet, mean_lab, hist_lab
+                FROM image_features WHERE filename IN ({placeholders})
+            ''', chunk).fetchall()
+
+            for filename, digest, *blobs in rows:
+                if wanted.get(filename) == digest:
+                    features = {
+                        name: np.frombuffer(blob, dtype=np.float32)
+                        for name, blob in zip(FEATURE_NAMES, blobs)
+                    }
+                    found[filename] = features
+                    self._remember((filename, digest), features)
+        conn.close()
+
+        return found
+
+    def _write(self, rows):
+        """INSERT OR REPLACE feature rows (best-effort: features stay cached in memory if the DB is busy)"""
+        conn = self.get_db_connection()
+        try:
+            conn.executemany('''
+                INSERT OR REPLACE INTO image_features
+                (filename, content_hash, resnet, mean_lab, hist_lab, computed_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', rows)
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Could not store features for {len(rows)} images (will recompute next time): {e}")
+        finally:
+            conn.close()
+
+    def put(self, filename, content_hash, features):
+        """Store features, replacing any previous entry for the same filename"""
+        features = {
+            name: np.asarray(features[name], dtype=np.float32).ravel()
+            for name in FEATURE_NAMES
+        }
+
+        self._write([(filename, content_hash, *(features[name].tobytes() for name in FEATURE_NAMES))])
+
+        self._remember((filename, content_hash), features)
+        return features
+
+    def get_or_compute(self, filename, path, extract_fn):
+        """
+        Return features for an image, extracting them only if not yet stored
+
+        Args:
+            filename: Image filename as stored on the item
+            path: Full path to the image file
+            extract_fn: Callable(path) -> dictionary of feature arrays
+
+        Returns:
+            Dictionary of feature arrays
+        """
+        digest = self.content_hash(path)
+        features = self.get(filename, digest)
+        if features is None:
+            features = self.put(filename, digest, extract_fn(path))
+        return features
+
+    def put_many(self, entries):
+        """
+        Store features for many files in one transaction
+
+        Args:
+            entries: List of (filename, content_hash, features) tuples
+
+        Returns:
+            Dictionary of filename -> stored (float32) features
+        """
+        if not entries:
+            return {}
+
+        stored = {}
+        rows = []
+        for filename, digest, features in entries:
+            features = {
+                name: np.asarray(features[name], dtype=np.float32).ravel()
+                for name in FEATURE_NAMES
+            }
+            rows.append((filename, digest, *(features[name].tobytes() for name in FEATURE_NAMES)))
+            stored[filename] = features
+            self._remember((filename, digest), features)
+
+        self._write(rows)
+
+        return stored
+
+    def get_or_compute_many(self, items, extract_batch_fn):
+        """
+        Return features for many images, extracting the missing ones in batches
+
+        Args:
+            items: List of (filename, full_path) tuples for files that exist
+            extract_batch_fn: Callable(list_of_paths) -> list of feature dicts
+                              (None for files that could not be read)
+
+        Returns:
+            Dictionary of filename -> features (unreadable files are skipped)
+        """
+        paths = dict(items)
+        digests = {filename: self.content_hash(path) for filename, path in paths.items()}
+        features = self.get_many(list(digests.items()))
+
+        missing = [filename for filename in paths if filename not in features]
+        if missing:
+            extracted = extract_batch_fn([paths[filename] for filename in missing])
+            new_entries = []
+            for filename, f in zip(missing, extracted):
+                if f is not None:
+                    new_entries.append((filename, digests[filename], f))
+            features.update(self.put_many(new_entries))
+
+        return features
+
+    def delete(self, filename):
+        """Remove stored features for a file"""
+        conn = self.get_db_connection()
+        conn.execute('DELETE FROM image_features WHERE filename = ?', (filename,))
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == filename]:
+                del self._cache[key]
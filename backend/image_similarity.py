@@ -1,5 +1,10 @@
 # image_similarity.py
 
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 from numpy.linalg import norm
@@ -10,6 +15,17 @@ import torchvision.models as models
 import torchvision.transforms as T
 
 
+# -----------------------------------------
+# Batch inference settings
+# -----------------------------------------
+IMAGE_BATCH_SIZE = int(os.environ.get("IMAGE_BATCH_SIZE", "16"))       # images per forward pass
+IMAGE_DECODE_WORKERS = int(os.environ.get("IMAGE_DECODE_WORKERS", "4"))  # decode/transform threads
+TORCH_NUM_THREADS = int(os.environ.get("TORCH_NUM_THREADS", "0"))       # intra-op threads (0 = torch default)
+
+if TORCH_NUM_THREADS > 0:
+    torch.set_num_threads(TORCH_NUM_THREADS)
+
+
 # -----------------------------------------
 # Utility: cosine similarity
 # -----------------------------------------
@@ -92,9 +108,41 @@ class ResNetEmbed(nn.Module):
         return x.view(x.size(0), -1)
 
 
-# initialize model on load
+# model is built on first use (not at import) so importing this module stays cheap
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-res_model = ResNetEmbed().to(device).eval()
+_res_model = None
+_res_model_lock = threading.Lock()
+
+# seconds each model took to load, e.g. {"resnet50": 2.41}
+LOAD_TIMES = {}
+
+
+def get_model():
+    """ResNet-50 feature extractor, loaded once (thread-safe)"""
+    global _res_model
+    if _res_model is None:
+        with _res_model_lock:
+            if _res_model is None:
+                start = time.time()
+                model = ResNetEmbed().to(device).eval()
+                LOAD_TIMES["resnet50"] = round(time.time() - start, 3)
+                print(f"✅ ResNet-50 image model loaded in {LOAD_TIMES['resnet50']:.2f}s")
+                _res_model = model
+    return _res_model
+
+
+def warm_up(background=True):
+    """
+    Load the ResNet-50 model ahead of the first comparison.
+    With background=True it loads in a daemon thread and returns immediately.
+    """
+    if not background:
+        get_model()
+        return None
+
+    thread = threading.Thread(target=get_model, name="image-model-warmup", daemon=True)
+    thread.start()
+    return thread
 
 transform = T.Compose([
     T.Resize(256),
@@ -112,12 +160,122 @@ def deep_similarity(path1, path2):
     x2 = transform(img2).unsqueeze(0).to(device)
 
     with torch.no_grad():
-        v1 = res_model(x1).cpu().numpy().flatten()
-        v2 = res_model(x2).cpu().numpy().flatten()
+        v1 = get_model()(x1).cpu().numpy().flatten()
+        v2 = get_model()(x2).cpu().numpy().flatten()
 
     return cosine_sim(v1, v2)
 
 
+# -----------------------------------------
+# Per-image features (cacheable)
+# -----------------------------------------
+def extract_features(path):
+    """
+    Compute everything image_similarity needs from ONE image:
+        resnet   = 2048-d ResNet-50 vector
+        mean_lab = foreground mean LAB color (3)
+        hist_lab = foreground LAB histogram (3 x 32 bins)
+    """
+    img = Image.open(path).convert("RGB")
+    x = transform(img).unsqueeze(0).to(device)
+
+    with torch.no_grad():
+        resnet = get_model()(x).cpu().numpy().flatten()
+
+    img_bgr = cv2.imread(path)
+    mask = get_mask(img_bgr)
+
+    return {
+        "resnet": resnet.astype(np.float32),
+        "mean_lab": np.asarray(mean_lab(img_bgr, mask), dtype=np.float32),
+        "hist_lab": np.asarray(hist_lab(img_bgr, mask), dtype=np.float32),
+    }
+
+
+def similarity_from_features(f1, f2, deep_w=0.7, color_w=0.3):
+    """
+    Same score as image_similarity, from precomputed features
+    (a few dot products, no image decoding or inference)
+    """
+    deep_sim = cosine_sim(f1["resnet"], f2["resnet"])
+
+    mean_sim = cosine_sim(f1["mean_lab"], f2["mean_lab"])
+    hist_sim = cosine_sim(f1["hist_lab"], f2["hist_lab"])
+    col_sim = 0.4 * mean_sim + 0.6 * hist_sim
+
+    return float(deep_w * deep_sim + color_w * col_sim)
+
+
+# -----------------------------------------
+# Batched pipeline (backfills, bulk matching)
+# -----------------------------------------
+def _decode(path):
+    """
+    Decode ONE image for the batch pipeline (runs in a worker thread):
+    ResNet input tensor + foreground LAB color features
+    Returns None if the file can't be read.
+    """
+    try:
+        tensor = transform(Image.open(path).convert("RGB"))
+
+        img_bgr = cv2.imread(path)
+        mask = get_mask(img_bgr)
+        color = {
+            "mean_lab": np.asarray(mean_lab(img_bgr, mask), dtype=np.float32),
+            "hist_lab": np.asarray(hist_lab(img_bgr, mask), dtype=np.float32),
+        }
+        return tensor, color
+    except Exception as e:
+        print(f"Error decoding image {path}: {e}")
+        return None
+
+
+def extract_features_batch(paths, batch_size=None, workers=None):
+    """
+    extract_features for many images:
+        - decode + transform + LAB color in a thread pool
+        - ResNet-50 forward pass on stacked batches under torch.no_grad()
+
+    Returns a list aligned with paths (None for unreadable files).
+    """
+    batch_size = batch_size or IMAGE_BATCH_SIZE
+    workers = workers or IMAGE_DECODE_WORKERS
+    results = [None] * len(paths)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(paths), batch_size):
+            chunk = paths[start:start + batch_size]
+            decoded = list(pool.map(_decode, chunk))
+
+            ok = [i for i, d in enumerate(decoded) if d is not None]
+            if not ok:
+                continue
+
+            x = torch.stack([decoded[i][0] for i in ok]).to(device)
+            with torch.no_grad():
+                vectors = get_model()(x).cpu().numpy().astype(np.float32)
+
+            for row, i in enumerate(ok):
+                results[start + i] = {"resnet": vectors[row], **decoded[i][1]}
+
+    return results
+
+
+def embed_images(paths, batch_size=None, workers=None):
+    """
+    Batched ResNet-50 embeddings.
+    Returns an (N, 2048) float32 array aligned with paths
+    (all-zero rows for unreadable files, which score 0 similarity).
+    """
+    features = extract_features_batch(paths, batch_size=batch_size, workers=workers)
+
+    out = np.zeros((len(paths), 2048), dtype=np.float32)
+    for i, f in enumerate(features):
+        if f is not None:
+            out[i] = f["resnet"]
+    return out
+
+
 # -----------------------------------------
 # FINAL COMBINED SCORE (FIXED WEIGHTS)
 # -----------------------------------------
@@ -129,17 +287,5 @@ def image_similarity(path1, path2):
         color = 0.3
     """
 
-    deep_w = 0.7
-    color_w = 0.3
-
-    # Deep features similarity
-    deep_sim = deep_similarity(path1, path2)
-
-    # Color similarity (foreground LAB)
-    img1 = cv2.imread(path1)
-    img2 = cv2.imread(path2)
-    col_sim = color_similarity(img1, img2)
-
-    # Combined score
-    final_score = deep_w * deep_sim + color_w * col_sim
-    return float(final_score)
+    # Deep features + foreground LAB color, one pass per image
+    return similarity_from_features(extract_features(path1), extract_features(path2))
@@ -0,0 +1,146 @@
+"""
+Item Change Log
+Records every insert, match-relevant update and delete of lost/found items in an
+item_changes table (via SQLite triggers, so the report, claim and delete endpoints,
+the cleanup schedulers and one-off scripts are all covered), and keeps a per-consumer
+high-water mark so incremental ML matching only rescores items that changed.
+"""
+
+import sqlite3
+
+# Columns whose changes affect match scores (or whether an item is matched at all)
+LOST_MATCH_COLUMNS = ('description', 'category_id', 'location_id', 'color', 'date_lost', 'image_filename')
+FOUND_MATCH_COLUMNS = ('description', 'category_id', 'location_id', 'color', 'date_found', 'image_filename',
+                       'status', 'is_claimed')
+
+# Processed changes older than this are removed by trim()
+RETENTION_DAYS = 7
+
+
+class ItemChangeLog:
+    def __init__(self, db_path):
+        """
+        Initialize the change log (creates tables and triggers if needed)
+
+        Args:
+            db_path: Path to the database
+        """
+        self.db_path = db_path
+        self.init_change_log_tables()
+
+    def get_db_connection(self):
+        """Get database connection"""
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        return conn
+
+    def init_change_log_tables(self):
+        """Create item_changes / ml_matching_state tables and the item triggers"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS item_changes (
+                change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                item_type TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                change_type TEXT NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ml_matching_state (
+                consumer TEXT PRIMARY KEY,
+                last_change_id INTEGER NOT NULL DEFAULT 0,
+                last_full_run_at TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        for item_type, table, columns in (('lost', 'lost_items', LOST_MATCH_COLUMNS),
+                                          ('found', 'found_items', FOUND_MATCH_COLUMNS)):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_change_insert
+                AFTER INSERT ON {table}
+                BEGIN
+                    INSERT INTO item_changes (item_type, item_id, change_type)
+                    VALUES ('{item_type}', NEW.rowid, 'created');
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_change_update
+                AFTER UPDATE OF {', '.join(columns)} ON {table}
+                BEGIN
+                    INSERT INTO item_changes (item_type, item_id, change_type)
+                    VALUES ('{item_type}', NEW.rowid, 'updated');
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_change_delete
+                AFTER DELETE ON {table}
+                BEGIN
+                    INSERT INTO item_changes (item_type, item_id, change_type)
+                    VALUES ('{item_type}', OLD.rowid, 'deleted');
+                END
+            ''')
+
+        conn.commit()
+        conn.close()
+
+    def current_change_id(self, conn):
+        """Latest change_id in the log (0 if empty)"""
+        row = conn.execute('SELECT MAX(change_id) FROM item_changes').fetchone()
+        return row[0] or 0
+
+    def get_high_water_mark(self, conn, consumer):
+        """
+        Last change_id a consumer has processed
+
+        Returns:
+            change_id, or None if the consumer has never completed a full run
+        """
+        row = conn.execute(
+            'SELECT last_change_id FROM ml_matching_state WHERE consumer = ?', (consumer,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_high_water_mark(self, conn, consumer, change_id, full_run=False):
+        """Record that a consumer has processed all changes up to change_id (caller commits)"""
+        conn.execute('''
+            INSERT INTO ml_matching_state (consumer, last_change_id, last_full_run_at, updated_at)
+            VALUES (?, ?, CASE WHEN ? THEN CURRENT_TIMESTAMP END, CURRENT_TIMESTAMP)
+            ON CONFLICT(consumer) DO UPDATE SET
+                last_change_id = excluded.last_change_id,
+                last_full_run_at = COALESCE(excluded.last_full_run_at, ml_matching_state.last_full_run_at),
+                updated_at = CURRENT_TIMESTAMP
+        ''', (consumer, change_id, 1 if full_run else 0))
+
+    def get_pending_changes(self, conn, since_change_id, up_to_change_id):
+        """
+        Net changes per item in (since_change_id, up_to_change_id]
+
+        Returns:
+            Dictionary {'lost': {item_id: change_type}, 'found': {...}} where
+            change_type is 'deleted' if the item no longer exists, otherwise
+            'created' or 'updated' (the latest change wins)
+        """
+        changes = {'lost': {}, 'found': {}}
+        rows = conn.execute('''
+            SELECT item_type, item_id, change_type FROM item_changes
+            WHERE change_id > ? AND change_id <= ?
+            ORDER BY change_id
+        ''', (since_change_id, up_to_change_id)).fetchall()
+
+        for item_type, item_id, change_type in rows:
+            if item_type in changes:
+                changes[item_type][item_id] = change_type
+
+        return changes
+
+    def trim(self, conn):
+        """Delete changes every consumer has processed and that are past retention (caller commits)"""
+        conn.execute(f'''
+            DELETE FROM item_changes
+            WHERE change_id <= (SELECT COALESCE(MIN(last_change_id), 0) FROM ml_matching_state)
+            AND changed_at < datetime('now', '-{RETENTION_DAYS} days')
+        ''')
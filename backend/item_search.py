@@ -0,0 +1,202 @@
+"""
+Item Full-Text Search
+FTS5 indexes over lost and found items (title, description, category and location
+names), kept in sync by SQLite triggers so every writer is covered, with BM25
+ranking, prefix matching for search-as-you-type and highlighted snippets.
+
+Highlights are HTML: FTS marks matches with private sentinel characters, and
+escape_highlight() escapes the item text before turning them into <mark> tags.
+
+If this SQLite build has no FTS5, `available` is False and callers fall back to
+their LIKE queries.
+"""
+
+import re
+import html
+import sqlite3
+
+# Item table -> FTS table
+FTS_TABLES = {
+    'lost': ('lost_items', 'lost_items_fts'),
+    'found': ('found_items', 'found_items_fts'),
+}
+
+# BM25 column weights: title, description, category, location
+BM25_WEIGHTS = (10.0, 2.0, 4.0, 4.0)
+
+# Words (letters/digits) taken from the user's query; everything else is dropped
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Query terms used at most (keeps pathological queries cheap)
+MAX_QUERY_TERMS = 8
+
+SNIPPET_TOKENS = 12
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Unicode private-use characters FTS puts around matches (never HTML-special)
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+
+# Columns of ranked_columns() that hold highlighted text
+HIGHLIGHT_COLUMNS = ('title_highlight', 'snippet')
+
+
+def build_match_query(text, columns=None):
+    """
+    Turn free text into an FTS5 MATCH expression
+
+    Every word must match and every word is a prefix ("blu wal" finds
+    "blue wallet"). Words are quoted, so FTS syntax in user input is inert.
+
+    Args:
+        text: User search text
+        columns: Optional list of FTS columns to restrict the match to
+
+    Returns:
+        MATCH expression, or None if the text has no searchable words
+    """
+    terms = TOKEN_PATTERN.findall(text or '')[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+
+    expression = ' '.join(f'"{term}"*' for term in terms)
+    if columns:
+        expression = f"{{{' '.join(columns)}}} : ({expression})"
+    return expression
+
+
+def escape_highlight(value):
+    """
+    Turn FTS highlight output into safe HTML
+
+    The item text is HTML-escaped, then the match sentinels become <mark> tags,
+    so markup in a title or description is shown as text, never run.
+
+    Args:
+        value: highlight()/snippet() output (or None)
+
+    Returns:
+        Escaped HTML with matches wrapped in <mark>, or None
+    """
+    if value is None:
+        return None
+    escaped = html.escape(value)
+    return escaped.replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_END, HIGHLIGHT_END)
+
+
+def escape_highlights(item):
+    """Apply escape_highlight() to the highlight columns of a result dictionary in place"""
+    for column in HIGHLIGHT_COLUMNS:
+        if column in item:
+            item[column] = escape_highlight(item[column])
+    return item
+
+
+class ItemSearchIndex:
+    def __init__(self, db_path):
+        """
+        Initialize the search index (creates FTS tables and triggers, backfills if empty)
+
+        Args:
+            db_path: Path to the database
+        """
+        self.db_path = db_path
+        self.available = False
+        try:
+            self.init_search_tables()
+            self.available = True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Full-text search unavailable, using LIKE search ({e})")
+
+    def get_db_connection(self):
+        """Get database connection"""
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        return conn
+
+    def init_search_tables(self):
+        """Create the FTS tables and the triggers that keep them in sync"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        for item_type, (table, fts_table) in FTS_TABLES.items():
+            cursor.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                    title, description, category, location,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+            ''')
+
+            row_values = f'''
+                    NEW.rowid, NEW.title, NEW.description,
+                    (SELECT name FROM categories WHERE id = NEW.category_id),
+                    (SELECT name FROM locations WHERE id = NEW.location_id)'''
+
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert
+                AFTER INSERT ON {table}
+                BEGIN
+                    INSERT INTO {fts_table} (rowid, title, description, category, location)
+                    VALUES ({row_values});
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update
+                AFTER UPDATE OF title, description, category_id, location_id ON {table}
+                BEGIN
+                    DELETE FROM {fts_table} WHERE rowid = OLD.rowid;
+                    INSERT INTO {fts_table} (rowid, title, description, category, location)
+                    VALUES ({row_values});
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete
+                AFTER DELETE ON {table}
+                BEGIN
+                    DELETE FROM {fts_table} WHERE rowid = OLD.rowid;
+                END
+            ''')
+
+            # First run on an existing database: index what's already there
+            indexed = cursor.execute(f'SELECT COUNT(*) FROM {fts_table}').fetchone()[0]
+            if not indexed:
+                self._fill(cursor, table, fts_table)
+
+        conn.commit()
+        conn.close()
+
+    def _fill(self, cursor, table, fts_table):
+        cursor.execute(f'''
+            INSERT INTO {fts_table} (rowid, title, description, category, location)
+            SELECT i.rowid, i.title, i.description, c.name, loc.name
+            FROM {table} i
+            LEFT JOIN categories c ON i.category_id = c.id
+            LEFT JOIN locations loc ON i.location_id = loc.id
+        ''')
+        if cursor.rowcount:
+            print(f"🔎 Indexed {cursor.rowcount} {table} for full-text search")
+
+    def rebuild(self):
+        """Re-index everything (e.g. after categories or locations are renamed)"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        for table, fts_table in FTS_TABLES.values():
+            cursor.execute(f'DELETE FROM {fts_table}')
+            self._fill(cursor, table, fts_table)
+        conn.commit()
+        conn.close()
+
+    def ranked_columns(self, item_type):
+        """
+        SELECT expressions for rank and highlighting of an FTS search
+
+        Returns:
+            SQL fragment adding search_rank, title_highlight and snippet columns
+            (raw FTS output; pass result rows through escape_highlights())
+        """
+        fts_table = FTS_TABLES[item_type][1]
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        return f'''bm25({fts_table}, {weights}) as search_rank,
+                   highlight({fts_table}, 0, '{MATCH_START}', '{MATCH_END}') as title_highlight,
+                   snippet({fts_table}, 1, '{MATCH_START}', '{MATCH_END}', '…', {SNIPPET_TOKENS}) as snippet'''
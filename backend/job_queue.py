@@ -0,0 +1,304 @@
+"""
+Durable Background Job Queue
+SQLite-backed jobs table plus a small worker thread pool, used to take slow work
+(ML matching, SMTP notifications) off the HTTP request path.
+
+- enqueue() inserts a 'queued' row and returns its id immediately
+- workers claim jobs atomically (BEGIN IMMEDIATE), so several processes can share
+  the same table without running a job twice
+- failed jobs are retried with exponential backoff up to max_attempts
+- jobs left 'running' by a crashed process are re-queued after STALE_AFTER_SECONDS
+- get_job() returns status/result for the job status endpoint
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import traceback
+
+# Worker threads per process (ENV: JOB_WORKERS)
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+
+# Seconds an idle worker waits before polling the table again
+POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', '1.0'))
+
+# Attempts before a job is marked 'failed'; retry delay doubles each time
+MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 30
+
+# A 'running' job whose worker has been silent this long is assumed dead
+STALE_AFTER_SECONDS = 30 * 60
+
+# Finished jobs older than this are removed by purge_finished()
+RETENTION_DAYS = 7
+
+
+class JobQueue:
+    def __init__(self, db_path, workers=JOB_WORKERS, poll_interval=POLL_INTERVAL):
+        """
+        Initialize the job queue (creates the jobs table if needed)
+
+        Args:
+            db_path: Path to the database
+            workers: Number of worker threads started by start()
+            poll_interval: Seconds between polls when the queue is empty
+        """
+        self.db_path = db_path
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.handlers = {}
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self.init_jobs_table()
+
+    def get_db_connection(self):
+        """Get database connection (autocommit; transactions are explicit)"""
+        conn = sqlite3.connect(self.db_path, timeout=20.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_jobs_table(self):
+        """Create jobs table if it doesn't exist"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_type TEXT NOT NULL,
+                payload TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                result TEXT,
+                error TEXT,
+                run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                worker TEXT
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after
+            ON jobs(status, run_after)
+        ''')
+
+        conn.close()
+
+    def register(self, job_type, handler):
+        """
+        Register the function that runs jobs of a type
+
+        Args:
+            job_type: Job type name, e.g. 'match_notify_found'
+            handler: Callable(payload_dict) -> JSON-serializable result
+        """
+        self.handlers[job_type] = handler
+
+    def enqueue(self, job_type, payload=None, max_attempts=MAX_ATTEMPTS):
+        """
+        Add a job to the queue
+
+        Args:
+            job_type: Registered job type
+            payload: JSON-serializable dictionary passed to the handler
+            max_attempts: Attempts before the job is marked failed
+
+        Returns:
+            job_id of the new job
+        """
+        conn = self.get_db_connection()
+        cursor = conn.execute('''
+            INSERT INTO jobs (job_type, payload, max_attempts)
+            VALUES (?, ?, ?)
+        ''', (job_type, json.dumps(payload or {}), max_attempts))
+        job_id = cursor.lastrowid
+        conn.close()
+
+        self._wakeup.set()
+        return job_id
+
+    def get_job(self, job_id):
+        """
+        Get a job's status
+
+        Returns:
+            Dictionary with status, attempts, result, error and timestamps, or None
+        """
+        conn = self.get_db_connection()
+        row = conn.execute('''
+            SELECT job_id, job_type, payload, status, attempts, max_attempts, result, error,
+                   run_after, created_at, started_at, finished_at
+            FROM jobs WHERE job_id = ?
+        ''', (job_id,)).fetchone()
+        conn.close()
+
+        if not row:
+            return None
+
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if job['payload'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def claim_next(self, worker_name):
+        """
+        Atomically move the oldest due job to 'running'
+
+        Returns:
+            (job_id, job_type, payload_dict) or None if nothing is due
+        """
+        conn = self.get_db_connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+
+            # Re-queue jobs whose worker died mid-run
+            conn.execute(f'''
+                UPDATE jobs SET status = 'queued', run_after = CURRENT_TIMESTAMP
+                WHERE status = 'running'
+                AND started_at < datetime('now', '-{STALE_AFTER_SECONDS} seconds')
+            ''')
+
+            row = conn.execute('''
+                SELECT job_id, job_type, payload FROM jobs
+                WHERE status = 'queued' AND run_after <= CURRENT_TIMESTAMP
+                ORDER BY job_id
+                LIMIT 1
+            ''').fetchone()
+
+            if not row:
+                conn.execute('COMMIT')
+                return None
+
+            conn.execute('''
+                UPDATE jobs SET status = 'running', attempts = attempts + 1,
+                       started_at = CURRENT_TIMESTAMP, worker = ?
+                WHERE job_id = ?
+            ''', (worker_name, row['job_id']))
+            conn.execute('COMMIT')
+
+            payload = json.loads(row['payload']) if row['payload'] else {}
+            return row['job_id'], row['job_type'], payload
+        except sqlite3.OperationalError as e:
+            # Database busy: try again on the next poll
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            print(f"⚠️ Could not claim job ({e})")
+            return None
+        finally:
+            conn.close()
+
+    def _finish(self, job_id, result):
+        conn = self.get_db_connection()
+        conn.execute('''
+            UPDATE jobs SET status = 'done', result = ?, error = NULL,
+                   finished_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+        ''', (json.dumps(result), job_id))
+        conn.close()
+
+    def _fail(self, job_id, error):
+        """Schedule a retry with backoff, or mark the job failed after max_attempts"""
+        conn = self.get_db_connection()
+        row = conn.execute('SELECT attempts, max_attempts FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+
+        if row and row['attempts'] < row['max_attempts']:
+            delay = RETRY_BASE_SECONDS * (2 ** (row['attempts'] - 1))
+            conn.execute(f'''
+                UPDATE jobs SET status = 'queued', error = ?,
+                       run_after = datetime('now', '+{int(delay)} seconds')
+                WHERE job_id = ?
+            ''', (error, job_id))
+            print(f"🔁 Job {job_id} will retry in {delay}s")
+        else:
+            conn.execute('''
+                UPDATE jobs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            ''', (error, job_id))
+            print(f"❌ Job {job_id} failed permanently")
+        conn.close()
+
+    def run_job(self, job_id, job_type, payload):
+        """Run one claimed job and record its outcome"""
+        handler = self.handlers.get(job_type)
+        if handler is None:
+            self._fail(job_id, f"No handler registered for job type '{job_type}'")
+            return
+
+        start = time.time()
+        try:
+            result = handler(payload)
+            self._finish(job_id, result)
+            print(f"✅ Job {job_id} ({job_type}) done in {time.time() - start:.2f}s")
+        except Exception as e:
+            print(f"❌ Job {job_id} ({job_type}) error: {e}")
+            traceback.print_exc()
+            self._fail(job_id, str(e))
+
+    def run_pending(self, worker_name='inline'):
+        """
+        Run due jobs in the calling thread until the queue is empty
+
+        Returns:
+            Number of jobs run
+        """
+        count = 0
+        while True:
+            claimed = self.claim_next(worker_name)
+            if not claimed:
+                return count
+            self.run_job(*claimed)
+            count += 1
+
+    def _worker_loop(self, worker_name):
+        while not self._stop.is_set():
+            try:
+                claimed = self.claim_next(worker_name)
+            except Exception as e:
+                print(f"❌ Job worker {worker_name} error: {e}")
+                claimed = None
+
+            if claimed:
+                self.run_job(*claimed)
+                continue
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def start(self):
+        """Start the worker threads (safe to call more than once)"""
+        with self._start_lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for i in range(self.workers):
+                name = f"job-worker-{os.getpid()}-{i}"
+                thread = threading.Thread(target=self._worker_loop, args=(name,), name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        print(f"⚙️  Started {self.workers} background job workers")
+
+    def stop(self, timeout=5):
+        """Signal the worker threads to exit and wait for them"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def purge_finished(self):
+        """Delete done/failed jobs past retention"""
+        conn = self.get_db_connection()
+        cursor = conn.execute(f'''
+            DELETE FROM jobs
+            WHERE status IN ('done', 'failed')
+            AND finished_at < datetime('now', '-{RETENTION_DAYS} days')
+        ''')
+        conn.close()
+        return cursor.rowcount
@@ -0,0 +1,279 @@
+"""
+TraceBack Mail Transport
+Keeps a small pool of authenticated SMTP connections so notifiers don't pay a
+TCP + STARTTLS + login handshake for every message.
+
+- connections are reused across messages and recycled after MAIL_MAX_MESSAGES_PER_CONNECTION
+  sends or MAIL_IDLE_TIMEOUT seconds of inactivity
+- a dropped connection is reopened and the message retried once
+- sends are rate limited (MAIL_RATE_PER_MINUTE) across all threads of the process
+- send_many() delivers a whole batch over one connection
+
+Use get_transport(smtp_config) to get the shared transport for an SMTP account.
+"""
+
+import os
+import time
+import smtplib
+import threading
+from collections import deque
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+# Open connections per SMTP account (ENV: MAIL_POOL_SIZE)
+MAIL_POOL_SIZE = int(os.environ.get('MAIL_POOL_SIZE', '2'))
+
+# Messages per minute across the process, 0 = unlimited (ENV: MAIL_RATE_PER_MINUTE)
+MAIL_RATE_PER_MINUTE = int(os.environ.get('MAIL_RATE_PER_MINUTE', '120'))
+
+# Reopen a connection after this many messages (servers cap messages per session)
+MAIL_MAX_MESSAGES_PER_CONNECTION = int(os.environ.get('MAIL_MAX_MESSAGES_PER_CONNECTION', '90'))
+
+# Idle connections older than this are closed instead of reused (servers drop them anyway)
+MAIL_IDLE_TIMEOUT = int(os.environ.get('MAIL_IDLE_TIMEOUT', '60'))
+
+SMTP_TIMEOUT = 10
+
+
+def is_connection_error(error):
+    """
+    True if an error means the connection is unusable (reconnect and retry)
+
+    SMTPException subclasses OSError, so protocol errors such as a refused
+    recipient are excluded explicitly.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, smtplib.SMTPHeloError)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class _PooledConnection:
+    def __init__(self, server):
+        self.server = server
+        self.sent = 0
+        self.last_used = time.time()
+
+
+class MailTransport:
+    def __init__(self, smtp_config, pool_size=MAIL_POOL_SIZE, rate_per_minute=MAIL_RATE_PER_MINUTE):
+        """
+        Initialize the transport (connections are opened on first send)
+
+        Args:
+            smtp_config: Dictionary with smtp_server, smtp_port, email, password, from_name
+            pool_size: Maximum open connections
+            rate_per_minute: Maximum messages per minute (0 = unlimited)
+        """
+        self.smtp_config = smtp_config
+        self.pool_size = max(1, pool_size)
+        self.min_interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+
+        self._idle = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+        self._rate_lock = threading.Lock()
+        self._next_send_at = 0.0
+
+    @property
+    def sender(self):
+        """Formatted From header"""
+        return f"{self.smtp_config['from_name']} <{self.smtp_config['email']}>"
+
+    def build_message(self, to_email, subject, html_content):
+        """Build an HTML email from the configured sender"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.sender
+        msg['To'] = to_email
+        msg.attach(MIMEText(html_content, 'html'))
+        return msg
+
+    def _connect(self):
+        server = smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'], timeout=SMTP_TIMEOUT)
+        try:
+            server.starttls()
+            server.login(self.smtp_config['email'], self.smtp_config['password'])
+        except Exception:
+            self._close_server(server)
+            raise
+        return _PooledConnection(server)
+
+    def _close_server(self, server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _acquire(self):
+        """Take an idle connection, open a new one if below pool_size, or wait"""
+        with self._cond:
+            while True:
+                while self._idle:
+                    conn = self._idle.pop()
+                    if time.time() - conn.last_used <= MAIL_IDLE_TIMEOUT:
+                        return conn
+                    self._open -= 1
+                    self._close_server(conn.server)
+
+                if self._open < self.pool_size:
+                    self._open += 1
+                    break
+
+                self._cond.wait()
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn, broken=False):
+        """Return a connection to the pool (or close it if broken / used up)"""
+        if broken or conn.sent >= MAIL_MAX_MESSAGES_PER_CONNECTION:
+            self._close_server(conn.server)
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            return
+
+        conn.last_used = time.time()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def _throttle(self):
+        """Block until the next send slot under the rate limit"""
+        if not self.min_interval:
+            return
+        with self._rate_lock:
+            now = time.time()
+            wait = self._next_send_at - now
+            self._next_send_at = max(now, self._next_send_at) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def _send_on(self, conn, msg):
+        self._throttle()
+        conn.server.sendmail(self.smtp_config['email'], msg['To'], msg.as_string())
+        conn.sent += 1
+
+    def send_many(self, messages, errors=None):
+        """
+        Send a batch of messages over one pooled connection
+
+        A dropped connection is reopened and the failed message retried once;
+        other per-message errors (e.g. a rejected recipient) only fail that message.
+
+        Args:
+            messages: List of email.message.Message objects (To header set)
+            errors: Optional list, filled with an error string (or None) per message
+
+        Returns:
+            List of booleans, one per message (True if sent)
+        """
+        results = []
+        conn = None
+
+        for index, msg in enumerate(messages):
+            sent = False
+            error = None
+            for attempt in (1, 2):
+                try:
+                    if conn is not None and conn.sent >= MAIL_MAX_MESSAGES_PER_CONNECTION:
+                        self._release(conn)
+                        conn = None
+                    if conn is None:
+                        conn = self._acquire()
+                    self._send_on(conn, msg)
+                    sent = True
+                    break
+                except Exception as e:
+                    if conn is not None and is_connection_error(e):
+                        self._release(conn, broken=True)
+                        conn = None
+                    if attempt == 1 and is_connection_error(e):
+                        print(f"⚠️ SMTP connection lost ({e}), reconnecting...")
+                        continue
+                    print(f"❌ Failed to send email to {msg['To']}: {e}")
+                    error = str(e) or e.__class__.__name__
+                    break
+
+            results.append(sent)
+            if errors is not None:
+                errors.append(error)
+            if not sent and conn is None:
+                # Can't connect / log in: don't spend a timeout on every remaining message
+                remaining = len(messages) - index - 1
+                results.extend([False] * remaining)
+                if errors is not None:
+                    errors.extend([error] * remaining)
+                break
+
+        if conn is not None:
+            self._release(conn)
+
+        return results
+
+    def send_message(self, msg):
+        """Send one message; returns True if sent"""
+        return self.send_many([msg])[0]
+
+    def send(self, to_email, subject, html_content):
+        """Build and send one HTML email; returns True if sent"""
+        return self.send_message(self.build_message(to_email, subject, html_content))
+
+    def close(self):
+        """Close all idle connections"""
+        with self._cond:
+            while self._idle:
+                conn = self._idle.pop()
+                self._open -= 1
+                self._close_server(conn.server)
+            self._cond.notify_all()
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def load_smtp_config():
+    """
+    SMTP settings from email_config.py
+
+    Returns:
+        EMAIL_CONFIG, or None if email_config.py isn't set up (email disabled)
+    """
+    try:
+        from email_config import EMAIL_CONFIG
+    except ImportError:
+        return None
+    return EMAIL_CONFIG
+
+
+def get_transport(smtp_config=None):
+    """
+    Get the shared transport for an SMTP account
+
+    Args:
+        smtp_config: SMTP settings (default EMAIL_CONFIG from email_config.py)
+
+    Returns:
+        MailTransport shared by every caller using the same account
+    """
+    if smtp_config is None:
+        smtp_config = load_smtp_config()
+        if smtp_config is None:
+            raise ImportError('email_config.py not found')
+
+    key = (smtp_config['smtp_server'], smtp_config['smtp_port'], smtp_config['email'])
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = MailTransport(smtp_config)
+            _transports[key] = transport
+    return transport
@@ -4,23 +4,77 @@ Combines text similarity, image similarity, and various features for intelligent
 """
 
 import os
+import importlib
+import importlib.util
+import threading
+import time
 import numpy as np
 from datetime import datetime
-from sentence_transformers import SentenceTransformer
 import sqlite3
 from pathlib import Path
+from embedding_store import EmbeddingStore
+from image_feature_store import ImageFeatureStore
+from match_engine import VectorizedMatchEngine, normalize_code, epoch_day
+from ann_index import CandidateIndex
+from text_encoder import load_text_encoder
 
-# Try to import image similarity (optional)
-try:
-    from image_similarity import image_similarity
-    IMAGE_SIMILARITY_AVAILABLE = True
-except ImportError:
-    IMAGE_SIMILARITY_AVAILABLE = False
+# ANN candidate pre-selection: number of nearest descriptions to fully score
+# per lookup (0 = exact full scan) and inverted lists probed per query
+ANN_CANDIDATES = int(os.environ.get('ML_ANN_CANDIDATES', '0'))
+ANN_NPROBE = int(os.environ.get('ML_ANN_NPROBE', '8'))
+
+# SQLite limits the number of bound parameters per statement
+ID_CHUNK_SIZE = 500
+
+# Upper-bound pruning skips a pair only when its best achievable score is below
+# min_score by more than this margin (covers the 4-decimal rounding of match_score
+# and float error in the similarity functions), so pruning never changes results
+PRUNE_TOLERANCE = 1e-4
+
+# Image similarity is optional and heavy (torch, torchvision, OpenCV, ResNet-50 weights),
+# so only check here that its dependencies exist; the module is imported on first use
+IMAGE_SIMILARITY_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None for name in ('cv2', 'torch', 'torchvision', 'PIL')
+)
+if not IMAGE_SIMILARITY_AVAILABLE:
     print("WARNING: Image similarity not available (missing dependencies). Image matching will be disabled.")
 
+# Load the image model in a background thread as soon as the service starts
+WARMUP_IMAGE_MODEL = os.environ.get('ML_WARMUP_IMAGE_MODEL', '0') == '1'
+
+# Seconds spent loading each model in this process (see MLMatchingService.model_load_times)
+MODEL_LOAD_TIMES = {}
+
+_image_module = None
+_image_module_lock = threading.Lock()
+
+
+def load_image_similarity():
+    """
+    Import image_similarity on first use
+    
+    Returns:
+        The image_similarity module, or None if image matching is unavailable
+    """
+    global _image_module, IMAGE_SIMILARITY_AVAILABLE
+    if _image_module is None and IMAGE_SIMILARITY_AVAILABLE:
+        with _image_module_lock:
+            if _image_module is None and IMAGE_SIMILARITY_AVAILABLE:
+                start = time.time()
+                try:
+                    module = importlib.import_module('image_similarity')
+                except ImportError as e:
+                    IMAGE_SIMILARITY_AVAILABLE = False
+                    print(f"WARNING: Image similarity not available ({e}). Image matching will be disabled.")
+                    return None
+                MODEL_LOAD_TIMES['vision_stack_import'] = round(time.time() - start, 3)
+                _image_module = module
+    return _image_module
+
 
 class MLMatchingService:
-    def __init__(self, db_path, model_path=None, upload_folder=None):
+    def __init__(self, db_path, model_path=None, upload_folder=None, ann_candidates=None, ann_nprobe=None,
+                 text_backend=None):
         """
         Initialize the ML matching service
         
@@ -28,6 +82,11 @@ class MLMatchingService:
             db_path: Path to the database
             model_path: Path to the text similarity model
             upload_folder: Path to the uploads folder for images
+            ann_candidates: Fully score only the N nearest descriptions per lookup
+                            (default ML_ANN_CANDIDATES env var; 0 = exact full scan)
+            ann_nprobe: Inverted lists probed per ANN query (higher = better recall, slower)
+            text_backend: Text model backend - 'fp32', 'int8' or 'onnx'
+                          (default ML_TEXT_BACKEND env var, fp32 if unset)
         """
         self.db_path = db_path
         
@@ -36,8 +95,38 @@ class MLMatchingService:
             model_path = os.path.join(os.path.dirname(__file__), 'traceback_text_similarity_model')
         
         print(f"Loading text similarity model from {model_path}...")
-        self.text_model = SentenceTransformer(model_path)
-        print("Text similarity model loaded successfully!")
+        start = time.time()
+        self.text_model, self.text_backend = load_text_encoder(model_path, text_backend)
+        MODEL_LOAD_TIMES['text_model'] = round(time.time() - start, 3)
+        print(f"Text similarity model loaded successfully! "
+              f"({self.text_backend}, {MODEL_LOAD_TIMES['text_model']:.2f}s)")
+        
+        # Persistent per-item description embeddings (encode once, reuse everywhere).
+        # Non-fp32 backends get their own cache key so their vectors never mix with fp32 ones
+        model_name = os.path.basename(os.path.normpath(model_path))
+        if self.text_backend != 'fp32':
+            model_name = f"{model_name}-{self.text_backend}"
+        self.embedding_store = EmbeddingStore(db_path, model_name=model_name)
+        
+        # Persistent per-file image features (ResNet vector + LAB color)
+        self.image_feature_store = ImageFeatureStore(db_path)
+        
+        # Optional approximate nearest-neighbour candidate index
+        self.ann_candidates = ANN_CANDIDATES if ann_candidates is None else ann_candidates
+        self.candidate_index = None
+        # Latest item_changes id each index was synced at (skip the sync until it moves)
+        self._ann_synced_change_id = {}
+        if self.ann_candidates:
+            self.candidate_index = CandidateIndex(
+                db_path, nprobe=ANN_NPROBE if ann_nprobe is None else ann_nprobe
+            )
+        
+        # Optionally load the image model now instead of on the first comparison
+        if WARMUP_IMAGE_MODEL and IMAGE_SIMILARITY_AVAILABLE:
+            threading.Thread(target=self.warm_up_image_model, name='image-model-warmup', daemon=True).start()
+        
+        # Pairs considered / skipped by upper-bound pruning in the last lookup
+        self.last_prune_stats = {'pairs': 0, 'pruned': 0}
         
         # Set upload folder
         if upload_folder is None:
@@ -45,19 +134,160 @@ class MLMatchingService:
         else:
             self.upload_folder = upload_folder
     
+    def warm_up_image_model(self):
+        """Import the vision stack and load the ResNet-50 model (blocking)"""
+        try:
+            vision = load_image_similarity()
+            if vision is not None:
+                vision.warm_up(background=False)
+        except Exception as e:
+            print(f"⚠️ Image model warm-up failed (will retry on first use): {e}")
+    
+    def model_load_times(self):
+        """
+        Report how long each model took to load
+        
+        Returns:
+            Dictionary of model name -> seconds (models not loaded yet are absent)
+        """
+        times = dict(MODEL_LOAD_TIMES)
+        if _image_module is not None:
+            times.update(_image_module.LOAD_TIMES)
+        return times
+    
     def get_db_connection(self):
         """Get database connection"""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
     
-    def text_similarity(self, desc1, desc2):
+    def encode_texts(self, texts):
+        """
+        Encode a batch of descriptions with the text model
+        
+        Args:
+            texts: List of strings
+            
+        Returns:
+            2D float32 array, one embedding per text
+        """
+        return np.asarray(self.text_model.encode(list(texts)), dtype=np.float32)
+    
+    def get_item_embeddings(self, item_type, items):
+        """
+        Get description embeddings for items, encoding only those not yet stored
+        
+        Args:
+            item_type: 'lost' or 'found'
+            items: List of item dictionaries (must contain 'id' and 'description')
+            
+        Returns:
+            Dictionary of item_id -> embedding
+        """
+        return self.embedding_store.get_or_compute(
+            item_type,
+            [(item['id'], item.get('description')) for item in items],
+            self.encode_texts
+        )
+    
+    def index_item(self, item_type, item_id):
+        """
+        Compute and store the description embedding for a newly reported or edited item
+        
+        Args:
+            item_type: 'lost' or 'found'
+            item_id: ID of the item
+        """
+        table = 'lost_items' if item_type == 'lost' else 'found_items'
+        conn = self.get_db_connection()
+        row = conn.execute(
+            f"SELECT rowid as id, description FROM {table} WHERE rowid = ?",
+            (item_id,)
+        ).fetchone()
+        conn.close()
+        
+        if row:
+            embeddings = self.get_item_embeddings(item_type, [dict(row)])
+            if self.candidate_index is not None:
+                self.candidate_index.add(
+                    item_type, embeddings,
+                    {row['id']: EmbeddingStore.description_hash(row['description'])}
+                )
+    
+    def _embed_item_ids(self, item_type, item_ids):
+        """Load descriptions for item IDs and return their embeddings"""
+        table = 'lost_items' if item_type == 'lost' else 'found_items'
+        conn = self.get_db_connection()
+        items = []
+        for start in range(0, len(item_ids), ID_CHUNK_SIZE):
+            chunk = item_ids[start:start + ID_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            items.extend(dict(row) for row in conn.execute(
+                f"SELECT rowid as id, description FROM {table} WHERE rowid IN ({placeholders})",
+                chunk
+            ).fetchall())
+        conn.close()
+        return self.get_item_embeddings(item_type, items)
+    
+    def ann_candidate_ids(self, item_type, query_embedding, conn):
+        """
+        Pick the items worth fully scoring using the ANN index
+        
+        Args:
+            item_type: Type of the candidates ('lost' or 'found')
+            query_embedding: Description embedding of the item being matched
+            conn: Open database connection
+            
+        Returns:
+            Sorted list of candidate IDs, or None when every item should be scored
+        """
+        if self.candidate_index is None or query_embedding is None:
+            return None
+        
+        # item_changes (item_change_log.py) records every insert, description edit and
+        # delete, so the descriptions only need re-reading when it has moved
+        try:
+            change_id = conn.execute('SELECT COALESCE(MAX(change_id), 0) FROM item_changes').fetchone()[0]
+        except sqlite3.OperationalError:
+            change_id = None
+        
+        if change_id is None or self._ann_synced_change_id.get(item_type) != change_id:
+            table = 'lost_items' if item_type == 'lost' else 'found_items'
+            # Items without a description never get a vector, so they aren't synced
+            current_hashes = {
+                row[0]: EmbeddingStore.description_hash(row[1])
+                for row in conn.execute(
+                    f"SELECT rowid, description FROM {table} WHERE description IS NOT NULL AND description != ''"
+                ).fetchall()
+            }
+            self.candidate_index.sync(
+                item_type, current_hashes,
+                lambda missing: self._embed_item_ids(item_type, missing)
+            )
+            self._ann_synced_change_id[item_type] = change_id
+        
+        hits = self.candidate_index.search(item_type, query_embedding, top_n=self.ann_candidates)
+        return sorted(item_id for item_id, _ in hits)
+    
+    def _fetch_items_by_ids(self, cursor, query, item_ids):
+        """Run a query with an `{ids}` placeholder over chunks of item IDs"""
+        rows = []
+        for start in range(0, len(item_ids), ID_CHUNK_SIZE):
+            chunk = item_ids[start:start + ID_CHUNK_SIZE]
+            rows.extend(cursor.execute(
+                query.format(ids=','.join('?' * len(chunk))), chunk
+            ).fetchall())
+        return rows
+    
+    def text_similarity(self, desc1, desc2, emb1=None, emb2=None):
         """
         Calculate text similarity between two descriptions using the trained model
         
         Args:
             desc1: First description
             desc2: Second description
+            emb1: Optional precomputed embedding of desc1
+            emb2: Optional precomputed embedding of desc2
             
         Returns:
             Similarity score between 0 and 1
@@ -65,12 +295,15 @@ class MLMatchingService:
         if not desc1 or not desc2:
             return 0.0
         
-        # Generate embeddings
-        embeddings = self.text_model.encode([desc1, desc2])
+        # Generate embeddings (only when not already cached)
+        if emb1 is None or emb2 is None:
+            embeddings = self.text_model.encode([desc1, desc2])
+            emb1 = embeddings[0] if emb1 is None else emb1
+            emb2 = embeddings[1] if emb2 is None else emb2
         
         # Calculate cosine similarity
-        similarity = np.dot(embeddings[0], embeddings[1]) / (
-            np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
+        similarity = np.dot(emb1, emb2) / (
+            np.linalg.norm(emb1) * np.linalg.norm(emb2)
         )
         
         # Ensure the result is between 0 and 1
@@ -87,26 +320,79 @@ class MLMatchingService:
         Returns:
             Similarity score between 0 and 1
         """
-        if not IMAGE_SIMILARITY_AVAILABLE:
-            return 0.0
-            
         if not img1_path or not img2_path:
             return 0.0
         
-        # Construct full paths
-        full_path1 = os.path.join(self.upload_folder, img1_path) if not os.path.isabs(img1_path) else img1_path
-        full_path2 = os.path.join(self.upload_folder, img2_path) if not os.path.isabs(img2_path) else img2_path
+        vision = load_image_similarity()
+        if vision is None:
+            return 0.0
         
-        # Check if files exist
-        if not os.path.exists(full_path1) or not os.path.exists(full_path2):
+        features1 = self.get_image_features(img1_path)
+        features2 = self.get_image_features(img2_path)
+        if features1 is None or features2 is None:
             return 0.0
         
         try:
-            return image_similarity(full_path1, full_path2)
+            return vision.similarity_from_features(features1, features2)
         except Exception as e:
             print(f"Error calculating image similarity: {e}")
             return 0.0
     
+    def get_image_features(self, img_path):
+        """
+        Get cached image features, extracting them on first use
+        
+        Args:
+            img_path: Image filename (relative to the uploads folder) or absolute path
+            
+        Returns:
+            Dictionary of feature arrays, or None if the file is missing or unreadable
+        """
+        # Construct full path
+        full_path = os.path.join(self.upload_folder, img_path) if not os.path.isabs(img_path) else img_path
+        
+        # Check if file exists
+        if not os.path.exists(full_path):
+            return None
+        
+        vision = load_image_similarity()
+        if vision is None:
+            return None
+        
+        try:
+            return self.image_feature_store.get_or_compute(img_path, full_path, vision.extract_features)
+        except Exception as e:
+            print(f"Error extracting image features for {img_path}: {e}")
+            return None
+    
+    def prefetch_image_features(self, items):
+        """
+        Extract features for all uncached images of the given items in batches
+        
+        Args:
+            items: List of item dictionaries (items without an image are ignored)
+        """
+        entries = {}
+        for item in items:
+            img_path = item.get('image_filename', '')
+            if not img_path:
+                continue
+            full_path = os.path.join(self.upload_folder, img_path) if not os.path.isabs(img_path) else img_path
+            if os.path.exists(full_path):
+                entries[img_path] = full_path
+        
+        if not entries:
+            return
+        
+        vision = load_image_similarity()
+        if vision is None:
+            return
+        
+        try:
+            self.image_feature_store.get_or_compute_many(list(entries.items()), vision.extract_features_batch)
+        except Exception as e:
+            print(f"Error prefetching image features: {e}")
+    
     def location_similarity(self, loc1, loc2):
         """
         Binary location similarity (exact match)
@@ -186,7 +472,7 @@ class MLMatchingService:
             print(f"Error calculating date similarity: {e}")
             return 0.0
     
-    def calculate_match_score(self, lost_item, found_item):
+    def calculate_match_score(self, lost_item, found_item, lost_embedding=None, found_embedding=None):
         """
         Calculate comprehensive match score between a lost item and found item
         
@@ -199,14 +485,24 @@ class MLMatchingService:
         Args:
             lost_item: Dictionary containing lost item data
             found_item: Dictionary containing found item data
+            lost_embedding: Optional precomputed description embedding of the lost item
+            found_embedding: Optional precomputed description embedding of the found item
             
         Returns:
             Dictionary with match score and individual component scores
         """
+        # Reuse stored embeddings for items that exist in the database
+        if lost_embedding is None and lost_item.get('id') and lost_item.get('description'):
+            lost_embedding = self.get_item_embeddings('lost', [lost_item]).get(lost_item['id'])
+        if found_embedding is None and found_item.get('id') and found_item.get('description'):
+            found_embedding = self.get_item_embeddings('found', [found_item]).get(found_item['id'])
+        
         # Calculate individual similarities
         desc_sim = self.text_similarity(
             lost_item.get('description', ''),
-            found_item.get('description', '')
+            found_item.get('description', ''),
+            lost_embedding,
+            found_embedding
         )
         
         # Check if both items have images
@@ -238,6 +534,28 @@ class MLMatchingService:
             found_item.get('date_found', '')
         )
         
+        match_score = self.weighted_score(
+            desc_sim, img_sim, loc_sim, cat_sim, color_sim, date_sim, has_both_images
+        )
+        
+        return {
+            'match_score': round(match_score, 4),
+            'description_similarity': round(desc_sim, 4),
+            'image_similarity': round(img_sim, 4),
+            'location_similarity': round(loc_sim, 4),
+            'category_similarity': round(cat_sim, 4),
+            'color_similarity': round(color_sim, 4),
+            'date_similarity': round(date_sim, 4),
+            'has_image_comparison': has_both_images
+        }
+    
+    def weighted_score(self, desc_sim, img_sim, loc_sim, cat_sim, color_sim, date_sim, has_both_images):
+        """
+        Combine component similarities into the (unrounded) match score
+        
+        Returns:
+            Weighted match score
+        """
         # Calculate weighted match score
         if has_both_images:
             # Use full formula with image similarity
@@ -260,16 +578,92 @@ class MLMatchingService:
                 0.067 * date_sim
             )
         
-        return {
-            'match_score': round(match_score, 4),
-            'description_similarity': round(desc_sim, 4),
-            'image_similarity': round(img_sim, 4),
-            'location_similarity': round(loc_sim, 4),
-            'category_similarity': round(cat_sim, 4),
-            'color_similarity': round(color_sim, 4),
-            'date_similarity': round(date_sim, 4),
-            'has_image_comparison': has_both_images
-        }
+        return match_score
+    
+    def score_upper_bound(self, lost_item, found_item):
+        """
+        Best score a pair can reach without comparing descriptions or images
+        
+        Location, category, color and date are scored exactly; description and
+        image similarity are taken at their maximum of 1 (0 when a side is missing).
+        
+        Returns:
+            Upper bound of the unrounded match score
+        """
+        has_both_images = bool(lost_item.get('image_filename', '') and found_item.get('image_filename', ''))
+        has_both_descriptions = bool(lost_item.get('description', '') and found_item.get('description', ''))
+        
+        return self.weighted_score(
+            1.0 if has_both_descriptions else 0.0,
+            1.0 if has_both_images else 0.0,
+            self.location_similarity(lost_item.get('location', ''), found_item.get('location', '')),
+            self.category_similarity(lost_item.get('category', ''), found_item.get('category', '')),
+            self.color_similarity(lost_item.get('color', ''), found_item.get('color', '')),
+            self.date_similarity_linear(lost_item.get('date_lost', ''), found_item.get('date_found', '')),
+            has_both_images
+        )
+    
+    def bucket_items(self, items, item_type):
+        """
+        Group items whose non-description fields score identically against any counterpart
+        
+        Args:
+            items: List of item dictionaries
+            item_type: 'lost' or 'found'
+            
+        Returns:
+            Dictionary of (category, location, color, day, has_image, has_description) -> item indices
+        """
+        date_field = 'date_lost' if item_type == 'lost' else 'date_found'
+        buckets = {}
+        for i, item in enumerate(items):
+            key = (
+                normalize_code(item.get('category', '')),
+                normalize_code(item.get('location', '')),
+                normalize_code(item.get('color', '')),
+                epoch_day(item.get(date_field, '')),
+                bool(item.get('image_filename', '')),
+                bool(item.get('description', ''))
+            )
+            buckets.setdefault(key, []).append(i)
+        return buckets
+    
+    def prune_candidates(self, anchor, anchor_type, candidates, min_score, buckets=None):
+        """
+        Drop candidates that cannot reach min_score against the anchor item
+        
+        The upper bound is computed once per bucket, so the cost is per distinct
+        (category, location, color, date) combination rather than per candidate.
+        Pruning is exact: a skipped pair would have scored below min_score.
+        
+        Args:
+            anchor: Item dictionary being matched
+            anchor_type: 'lost' or 'found'
+            candidates: List of counterpart item dictionaries
+            min_score: Minimum match score threshold
+            buckets: Optional precomputed bucket_items(candidates, ...) result
+            
+        Returns:
+            Sorted list of indices into candidates that survive pruning
+        """
+        candidate_type = 'found' if anchor_type == 'lost' else 'lost'
+        if buckets is None:
+            buckets = self.bucket_items(candidates, candidate_type)
+        
+        kept = []
+        for indices in buckets.values():
+            representative = candidates[indices[0]]
+            if anchor_type == 'lost':
+                upper = self.score_upper_bound(anchor, representative)
+            else:
+                upper = self.score_upper_bound(representative, anchor)
+            if upper >= min_score - PRUNE_TOLERANCE:
+                kept.extend(indices)
+        kept.sort()
+        
+        self.last_prune_stats['pairs'] += len(candidates)
+        self.last_prune_stats['pruned'] += len(candidates) - len(kept)
+        return kept
     
     def find_matches_for_lost_item(self, lost_item_id, min_score=0.6, top_k=10):
         """
@@ -301,23 +695,44 @@ class MLMatchingService:
         
         lost_item = dict(lost_item)
         
+        # Encode each description at most once (cached across calls)
+        lost_embedding = self.get_item_embeddings('lost', [lost_item]).get(lost_item['id'])
+        
         # Get all found items (not claimed - check status field)
-        found_items = cursor.execute("""
+        found_query = """
             SELECT f.rowid as id, f.*, c.name as category, loc.name as location
             FROM found_items f
             LEFT JOIN categories c ON f.category_id = c.id
             LEFT JOIN locations loc ON f.location_id = loc.id
             WHERE f.status != 'CLAIMED'
-        """).fetchall()
+        """
+        candidate_ids = self.ann_candidate_ids('found', lost_embedding, conn)
+        if candidate_ids is None:
+            found_items = cursor.execute(found_query).fetchall()
+        else:
+            # Only the nearest descriptions get fully scored
+            found_items = self._fetch_items_by_ids(
+                cursor, found_query + " AND f.rowid IN ({ids})", candidate_ids
+            )
         
         conn.close()
         
+        found_items = [dict(found_item) for found_item in found_items]
+        
+        # Skip pairs whose best achievable score is below the threshold
+        self.last_prune_stats = {'pairs': 0, 'pruned': 0}
+        found_items = [found_items[i] for i in self.prune_candidates(lost_item, 'lost', found_items, min_score)]
+        found_embeddings = self.get_item_embeddings('found', found_items)
+        if lost_item.get('image_filename'):
+            self.prefetch_image_features([lost_item] + found_items)
+        
         matches = []
         for found_item in found_items:
-            found_item = dict(found_item)
-            
             # Calculate match score
-            score_data = self.calculate_match_score(lost_item, found_item)
+            score_data = self.calculate_match_score(
+                lost_item, found_item,
+                lost_embedding, found_embeddings.get(found_item['id'])
+            )
             
             # Only include if above threshold
             if score_data['match_score'] >= min_score:
@@ -363,22 +778,43 @@ class MLMatchingService:
         
         found_item = dict(found_item)
         
+        # Encode each description at most once (cached across calls)
+        found_embedding = self.get_item_embeddings('found', [found_item]).get(found_item['id'])
+        
         # Get all lost items
-        lost_items = cursor.execute("""
+        lost_query = """
             SELECT l.rowid as id, l.*, c.name as category, loc.name as location
             FROM lost_items l
             LEFT JOIN categories c ON l.category_id = c.id
             LEFT JOIN locations loc ON l.location_id = loc.id
-        """).fetchall()
+        """
+        candidate_ids = self.ann_candidate_ids('lost', found_embedding, conn)
+        if candidate_ids is None:
+            lost_items = cursor.execute(lost_query).fetchall()
+        else:
+            # Only the nearest descriptions get fully scored
+            lost_items = self._fetch_items_by_ids(
+                cursor, lost_query + " WHERE l.rowid IN ({ids})", candidate_ids
+            )
         
         conn.close()
         
+        lost_items = [dict(lost_item) for lost_item in lost_items]
+        
+        # Skip pairs whose best achievable score is below the threshold
+        self.last_prune_stats = {'pairs': 0, 'pruned': 0}
+        lost_items = [lost_items[i] for i in self.prune_candidates(found_item, 'found', lost_items, min_score)]
+        lost_embeddings = self.get_item_embeddings('lost', lost_items)
+        if found_item.get('image_filename'):
+            self.prefetch_image_features([found_item] + lost_items)
+        
         matches = []
         for lost_item in lost_items:
-            lost_item = dict(lost_item)
-            
             # Calculate match score
-            score_data = self.calculate_match_score(lost_item, found_item)
+            score_data = self.calculate_match_score(
+                lost_item, found_item,
+                lost_embeddings.get(lost_item['id']), found_embedding
+            )
             
             # Only include if above threshold
             if score_data['match_score'] >= min_score:
@@ -394,12 +830,79 @@ class MLMatchingService:
         # Return top K matches
         return matches[:top_k]
     
-    def batch_match_all_items(self, min_score=0.6):
+    def score_lost_item_against(self, lost_item_id, found_item_ids, min_score=0.6):
+        """
+        Score one lost item against a given set of found items (incremental matching)
+        
+        Args:
+            lost_item_id: ID of the lost item
+            found_item_ids: IDs of the found items to compare against
+            min_score: Minimum match score threshold
+            
+        Returns:
+            List of matches with scores (every found item >= min_score), sorted by match score
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        
+        lost_item = cursor.execute("""
+            SELECT l.rowid as id, l.*, c.name as category, loc.name as location
+            FROM lost_items l
+            LEFT JOIN categories c ON l.category_id = c.id
+            LEFT JOIN locations loc ON l.location_id = loc.id
+            WHERE l.rowid = ?
+        """, (lost_item_id,)).fetchone()
+        
+        if not lost_item or not found_item_ids:
+            conn.close()
+            return []
+        
+        lost_item = dict(lost_item)
+        found_items = self._fetch_items_by_ids(cursor, """
+            SELECT f.rowid as id, f.*, c.name as category, loc.name as location
+            FROM found_items f
+            LEFT JOIN categories c ON f.category_id = c.id
+            LEFT JOIN locations loc ON f.location_id = loc.id
+            WHERE f.rowid IN ({ids})
+        """, list(found_item_ids))
+        conn.close()
+        
+        found_items = [dict(found_item) for found_item in found_items]
+        
+        # Skip pairs whose best achievable score is below the threshold
+        self.last_prune_stats = {'pairs': 0, 'pruned': 0}
+        found_items = [found_items[i] for i in self.prune_candidates(lost_item, 'lost', found_items, min_score)]
+        
+        lost_embedding = self.get_item_embeddings('lost', [lost_item]).get(lost_item['id'])
+        found_embeddings = self.get_item_embeddings('found', found_items)
+        if lost_item.get('image_filename'):
+            self.prefetch_image_features([lost_item] + found_items)
+        
+        matches = []
+        for found_item in found_items:
+            score_data = self.calculate_match_score(
+                lost_item, found_item,
+                lost_embedding, found_embeddings.get(found_item['id'])
+            )
+            if score_data['match_score'] >= min_score:
+                matches.append({
+                    'found_item_id': found_item['id'],
+                    'found_item': found_item,
+                    **score_data
+                })
+        
+        matches.sort(key=lambda x: x['match_score'], reverse=True)
+        return matches
+    
+    def batch_match_all_items(self, min_score=0.6, top_k=None, vectorized=True, memory_budget_mb=256):
         """
         Find all potential matches between lost and found items
         
         Args:
             min_score: Minimum match score threshold (default 0.6 = 60%)
+            top_k: Optional number of best found items to keep per lost item
+            vectorized: Score with the NumPy matrix engine (default) instead of the pairwise loop
+            memory_budget_mb: Working memory budget per chunk for the matrix engine
             
         Returns:
             List of all matches above threshold
@@ -426,26 +929,60 @@ class MLMatchingService:
         
         conn.close()
         
-        all_matches = []
+        lost_items = [dict(lost_item) for lost_item in lost_items]
+        found_items = [dict(found_item) for found_item in found_items]
         
-        for lost_item in lost_items:
-            lost_item = dict(lost_item)
-            
-            for found_item in found_items:
-                found_item = dict(found_item)
-                
-                # Calculate match score
-                score_data = self.calculate_match_score(lost_item, found_item)
+        # Encode every description once up front instead of once per pair
+        lost_embeddings = self.get_item_embeddings('lost', lost_items)
+        found_embeddings = self.get_item_embeddings('found', found_items)
+        
+        # Run new images through ResNet in batches rather than one pair at a time
+        self.prefetch_image_features(lost_items + found_items)
+        
+        self.last_prune_stats = {'pairs': 0, 'pruned': 0}
+        if vectorized:
+            engine = VectorizedMatchEngine(self, memory_budget_mb=memory_budget_mb)
+            scored = engine.match(
+                lost_items, found_items, min_score=min_score, top_k=top_k,
+                lost_embeddings=lost_embeddings, found_embeddings=found_embeddings
+            )
+            self.last_prune_stats = dict(engine.last_prune_stats)
+        else:
+            scored = []
+            found_buckets = self.bucket_items(found_items, 'found')
+            for li, lost_item in enumerate(lost_items):
+                row = []
+                for fj in self.prune_candidates(lost_item, 'lost', found_items, min_score, found_buckets):
+                    found_item = found_items[fj]
+                    # Calculate match score
+                    score_data = self.calculate_match_score(
+                        lost_item, found_item,
+                        lost_embeddings.get(lost_item['id']), found_embeddings.get(found_item['id'])
+                    )
+                    
+                    # Only include if above threshold
+                    if score_data['match_score'] >= min_score:
+                        row.append((li, fj, score_data))
                 
-                # Only include if above threshold
-                if score_data['match_score'] >= min_score:
-                    all_matches.append({
-                        'lost_item_id': lost_item['id'],
-                        'found_item_id': found_item['id'],
-                        'lost_item_title': lost_item.get('title', ''),
-                        'found_item_title': found_item.get('title', ''),
-                        **score_data
-                    })
+                if top_k is not None:
+                    row.sort(key=lambda r: r[2]['match_score'], reverse=True)
+                    row = sorted(row[:top_k], key=lambda r: r[1])
+                scored.extend(row)
+        
+        print(f"✂️  Pruned {self.last_prune_stats['pruned']} of {self.last_prune_stats['pairs']} "
+              f"pairs by score upper bound")
+        
+        all_matches = []
+        for li, fj, score_data in scored:
+            lost_item = lost_items[li]
+            found_item = found_items[fj]
+            all_matches.append({
+                'lost_item_id': lost_item['id'],
+                'found_item_id': found_item['id'],
+                'lost_item_title': lost_item.get('title', ''),
+                'found_item_title': found_item.get('title', ''),
+                **score_data
+            })
         
         # Sort by match score (descending)
         all_matches.sort(key=lambda x: x['match_score'], reverse=True)
@@ -5,7 +5,10 @@ Sends notifications to lost item owners when matching found items are reported
 
 import sqlite3
 from datetime import datetime
-from email_config import send_email
+from email_outbox import get_outbox
+
+# Same threshold as ml_scheduler.MIN_SCORE, so both paths email the same matches
+MIN_MATCH_SCORE = 0.7
 
 class MLNotificationService:
     def __init__(self, db_path, ml_service):
@@ -31,7 +34,7 @@ class MLNotificationService:
             # Find matches for this found item
             matches = self.ml_service.find_matches_for_found_item(
                 found_item_id=found_item_id,
-                min_score=0.3,  # 30% threshold
+                min_score=MIN_MATCH_SCORE,
                 top_k=10
             )
             
@@ -39,6 +42,8 @@ class MLNotificationService:
                 print(f"ℹ️ No matches found for found item {found_item_id}")
                 return 0
             
+            outbox = get_outbox(self.db_path)
+            
             # Get found item details
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row
@@ -67,7 +72,7 @@ class MLNotificationService:
                         FROM lost_items l
                         LEFT JOIN users u ON l.user_email = u.email
                         WHERE l.rowid = ?
-                    """, (match['rowid'],)).fetchone()
+                    """, (match['lost_item_id'],)).fetchone()
                     
                     if not lost_item:
                         continue
@@ -76,7 +81,7 @@ class MLNotificationService:
                     owner_email = lost_item.get('user_email') or lost_item.get('user_email')
                     
                     if not owner_email:
-                        print(f"⚠️ No email for lost item {match['rowid']}")
+                        print(f"⚠️ No email for lost item {match['lost_item_id']}")
                         continue
                     
                     # Send email notification
@@ -118,11 +123,14 @@ Best regards,
 TraceBack Team
 """
                     
-                    send_email(
-                        to_email=owner_email,
-                        subject=subject,
-                        body=body
-                    )
+                    # Queue in the outbox (same transaction as the notification row); the
+                    # key is shared with ml_scheduler, so each pair is emailed once
+                    if not outbox.enqueue(
+                        owner_email, subject, body,
+                        dedupe_key=f"ml_match:{found_item_id}:{match['lost_item_id']}",
+                        conn=conn
+                    ):
+                        continue
                     
                     # Log notification
                     conn.execute("""
@@ -140,7 +148,7 @@ TraceBack Team
                     ))
                     
                     notifications_sent += 1
-                    print(f"✅ Notification sent to {owner_email} for item {found_item_id} (match score: {match_score}%)")
+                    print(f"✅ Notification queued for {owner_email} for item {found_item_id} (match score: {match_score}%)")
                     
                 except Exception as e:
                     print(f"❌ Error sending notification: {e}")
@@ -149,7 +157,7 @@ TraceBack Team
             conn.commit()
             conn.close()
             
-            print(f"✅ Sent {notifications_sent} notifications for found item {found_item_id}")
+            print(f"✅ Queued {notifications_sent} notifications for found item {found_item_id}")
             return notifications_sent
             
         except Exception as e:
@@ -1,178 +1,86 @@
 """
 ML Matching Scheduler
 Runs ML matching between lost and found items every hour
+
+Each run only rescores items that changed since the previous run (see
+item_change_log.py). To rebuild all matches from scratch:
+    python ml_scheduler.py --full
 """
 
 import sqlite3
 import os
+import sys
 import time
 from datetime import datetime
 import schedule
+import json
 from ml_matching_service import MLMatchingService
+from item_change_log import ItemChangeLog
+from email_outbox import get_outbox
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'traceback_100k.db')
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
 
-def run_ml_matching():
-    """
-    Run ML matching for all unclaimed found items against all lost items
-    Stores matches with scores >= 70% in ml_matches table for fast dashboard loading
+# High-water mark name in ml_matching_state
+CONSUMER = 'ml_scheduler'
+
+MIN_SCORE = 0.7  # 70% threshold - only show high-quality matches
+TOP_K = 10       # matches kept per found item
+
+# SQLite limits the number of bound parameters per statement
+ID_CHUNK_SIZE = 500
+
+def match_row(found_id, match):
     """
-    try:
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"\n[{timestamp}] Starting ML Matching Process...")
-        
-        # Initialize ML service
-        ml_service = MLMatchingService(
-            db_path=DB_PATH,
-            upload_folder=UPLOAD_FOLDER
-        )
-        
-        # Get all unclaimed found items
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        found_items = cursor.execute("""
-            SELECT rowid as id FROM found_items 
-            WHERE (status IS NULL OR status != 'CLAIMED')
-        """).fetchall()
-        
-        lost_items = cursor.execute("""
-            SELECT rowid as id FROM lost_items
-            WHERE is_resolved = 0
-        """).fetchall()
-        
-        found_count = len(found_items)
-        lost_count = len(lost_items)
-        
-        print(f"[{timestamp}] Processing {found_count} found items against {lost_count} lost items...")
-        
-        # Clean up orphaned matches (where items no longer exist)
-        # This handles cases where lost items expired (3 days) or found items were claimed
-        cursor.execute('''
-            DELETE FROM ml_matches 
-            WHERE found_item_id NOT IN (SELECT rowid FROM found_items)
-            OR lost_item_id NOT IN (SELECT rowid FROM lost_items)
-        ''')
-        orphaned_count = cursor.rowcount
-        if orphaned_count > 0:
-            print(f"[{timestamp}] Cleaned up {orphaned_count} orphaned matches")
-        
-        # Process matches (INSERT OR REPLACE preserves email_sent flags)
-        print(f"[{timestamp}] Updating matches (preserving email notification status)...")
-        
-        # Process matches
-        total_matches = 0
-        high_confidence = 0  # >= 80%
-        stored_matches = 0
+    Row for the run_matches staging table
+    
+    Args:
+        found_id: Found item ID
+        match: Match dictionary from MLMatchingService
         
-        import json
+    Returns:
+        (found_item_id, lost_item_id, match_score, score_breakdown)
+    """
+    score_breakdown = json.dumps({
+        'description': match.get('description_similarity', 0),
+        'image': match.get('image_similarity', 0),
+        'location': match.get('location_similarity', 0),
+        'category': match.get('category_similarity', 0),
+        'color': match.get('color_similarity', 0),
+        'date': match.get('date_similarity', 0)
+    })
+    return (found_id, match['lost_item_id'], match['match_score'], score_breakdown)
+
+
+def collect_matches(found_id, matches, rows):
+    """
+    Add a found item's matches (>= 70% only) to this run's rows and log them
+    
+    Returns:
+        Number of matches added
+    """
+    added = 0
+    for match in matches:
+        # Additional verification: only store matches >= 70%
+        if match['match_score'] < MIN_SCORE:
+            continue
+        rows.append(match_row(found_id, match))
+        added += 1
         
-        for found_item in found_items:
-            found_id = found_item[0]
-            try:
-                matches = ml_service.find_matches_for_found_item(
-                    found_item_id=found_id,
-                    min_score=0.7,  # 70% threshold - only show high-quality matches
-                    top_k=10
-                )
-                
-                if matches:
-                    total_matches += len(matches)
-                    high_confidence += len([m for m in matches if m['match_score'] >= 0.8])
-                    
-                    # Store matches in database (only 70%+ matches are returned)
-                    for match in matches:
-                        try:
-                            # Additional verification: only store matches >= 70%
-                            if match['match_score'] >= 0.7:
-                                score_breakdown = json.dumps({
-                                    'description': match.get('description_similarity', 0),
-                                    'image': match.get('image_similarity', 0),
-                                    'location': match.get('location_similarity', 0),
-                                    'category': match.get('category_similarity', 0),
-                                    'color': match.get('color_similarity', 0),
-                                    'date': match.get('date_similarity', 0)
-                                })
-                                
-                                # Check if this match already exists and has email_sent = 1
-                                existing = cursor.execute('''
-                                    SELECT email_sent FROM ml_matches
-                                    WHERE found_item_id = ? AND lost_item_id = ?
-                                ''', (found_id, match['lost_item_id'])).fetchone()
-                                
-                                email_sent_value = existing[0] if existing and existing[0] else 0
-                                
-                                # Update match while preserving email_sent flag
-                                cursor.execute('''
-                                    INSERT OR REPLACE INTO ml_matches 
-                                    (found_item_id, lost_item_id, match_score, score_breakdown, computed_at, email_sent)
-                                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, ?)
-                                ''', (found_id, match['lost_item_id'], match['match_score'], score_breakdown, email_sent_value))
-                                
-                                stored_matches += 1
-                                
-                                # Log all matches above 70%
-                                score_pct = match['match_score'] * 100
-                                if match['match_score'] >= 0.8:
-                                    print(f"   [HIGH CONFIDENCE] Match: Found #{found_id} <-> Lost #{match['lost_item_id']} ({score_pct:.1f}%)")
-                                else:
-                                    print(f"   [MATCH] Found #{found_id} <-> Lost #{match['lost_item_id']} ({score_pct:.1f}%)")
-                            
-                            # Send email notification to lost item reporter (only once per match and only for 70%+ matches)
-                            try:
-                                # Only send email for matches >= 70%
-                                if match['match_score'] >= 0.7:
-                                    # Check if email was already sent for this match
-                                    email_sent = cursor.execute('''
-                                        SELECT email_sent FROM ml_matches
-                                        WHERE found_item_id = ? AND lost_item_id = ?
-                                    ''', (found_id, match['lost_item_id'])).fetchone()
-                                    
-                                    # Only send email if not already sent
-                                    if not email_sent or not email_sent[0]:
-                                        # Get lost item details with category and location
-                                        lost_item_data = cursor.execute('''
-                                            SELECT l.title, l.user_name, l.user_email, l.date_lost,
-                                                   c.name as category, loc.name as location
-                                            FROM lost_items l
-                                            LEFT JOIN categories c ON l.category_id = c.id
-                                            LEFT JOIN locations loc ON l.location_id = loc.id
-                                            WHERE l.id = ?
-                                        ''', (match['lost_item_id'],)).fetchone()
-                                        
-                                        # Get found item details
-                                        found_item_data = cursor.execute('''
-                                            SELECT f.title, f.date_found,
-                                                   c.name as category, loc.name as location
-                                            FROM found_items f
-                                            LEFT JOIN categories c ON f.category_id = c.id
-                                            LEFT JOIN locations loc ON f.location_id = loc.id
-                                            WHERE f.id = ?
-                                        ''', (found_id,)).fetchone()
-                                        
-                                        if lost_item_data and lost_item_data[2] and found_item_data:  # Has email
-                                            from email_verification_service import send_email
-                                            
-                                            reporter_name = lost_item_data[1]
-                                            reporter_email = lost_item_data[2]
-                                            
-                                            # Lost item details
-                                            lost_title = lost_item_data[0]
-                                            lost_date = lost_item_data[3]
-                                            lost_category = lost_item_data[4] or 'N/A'
-                                            lost_location = lost_item_data[5] or 'N/A'
-                                            
-                                            # Found item details
-                                            found_title = found_item_data[0]
-                                            found_date = found_item_data[1]
-                                            found_category = found_item_data[2] or 'N/A'
-                                            found_location = found_item_data[3] or 'N/A'
-                                            
-                                            match_score_pct = int(match['match_score'] * 100)
-                                            
-                                            subject = f"Potential Match Found for Your Lost Item - TraceBack"
-                                            body = f"""Hello {reporter_name},
+        # Log all matches above 70%
+        score_pct = match['match_score'] * 100
+        if match['match_score'] >= 0.8:
+            print(f"   [HIGH CONFIDENCE] Match: Found #{found_id} <-> Lost #{match['lost_item_id']} ({score_pct:.1f}%)")
+        else:
+            print(f"   [MATCH] Found #{found_id} <-> Lost #{match['lost_item_id']} ({score_pct:.1f}%)")
+    return added
+
+
+def build_match_email(reporter_name, lost_title, lost_category, lost_location, lost_date,
+                      found_title, found_category, found_location, found_date, match_score_pct):
+    """Subject and body of the "potential match" email to a lost item reporter"""
+    subject = f"Potential Match Found for Your Lost Item - TraceBack"
+    body = f"""Hello {reporter_name},
 
 Good news! We found a potential match for your lost item report!
 
@@ -210,38 +118,436 @@ Kent State University
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 This is an automated notification. Please do not reply to this email.
-                                            """
-                                            
-                                            send_email(reporter_email, subject, body)
-                                            
-                                            # Mark email as sent
-                                            cursor.execute('''
-                                                UPDATE ml_matches 
-                                                SET email_sent = 1
-                                                WHERE found_item_id = ? AND lost_item_id = ?
-                                            ''', (found_id, match['lost_item_id']))
-                                            
-                                            print(f"      [EMAIL] Notification sent to {reporter_email}")
-                            
-                            except Exception as email_error:
-                                print(f"      ⚠️  Could not send email notification: {email_error}")
-                        
-                        except Exception as e:
-                            print(f"   ⚠️  Error storing match: {e}")
-                
-            except Exception as e:
-                print(f"   ⚠️  Error matching found item #{found_id}: {e}")
+    """
+    return subject, body
+
+
+def queue_match_emails(cursor):
+    """
+    Queue an email to the lost item reporter for every staged match not emailed yet
+    
+    One query loads both items' details for all new matches; the emails go into the
+    outbox with one executemany (the dedupe key guards against another scheduler
+    queueing the same match) and the matches are flagged email_sent in one more.
+    
+    Returns:
+        Number of emails queued
+    """
+    rows = cursor.execute('''
+        SELECT r.found_item_id, r.lost_item_id, r.match_score,
+               l.title, l.user_name, l.user_email, l.date_lost,
+               lc.name as lost_category, lloc.name as lost_location,
+               f.title, f.date_found,
+               fc.name as found_category, floc.name as found_location
+        FROM temp.run_matches r
+        JOIN ml_matches m ON m.found_item_id = r.found_item_id AND m.lost_item_id = r.lost_item_id
+        JOIN lost_items l ON l.id = r.lost_item_id
+        JOIN found_items f ON f.id = r.found_item_id
+        LEFT JOIN categories lc ON l.category_id = lc.id
+        LEFT JOIN locations lloc ON l.location_id = lloc.id
+        LEFT JOIN categories fc ON f.category_id = fc.id
+        LEFT JOIN locations floc ON f.location_id = floc.id
+        WHERE (m.email_sent IS NULL OR m.email_sent = 0)
+        AND l.user_email IS NOT NULL AND l.user_email != ''
+    ''').fetchall()
+    
+    messages = []
+    emailed = []
+    for (found_id, lost_id, score, lost_title, reporter_name, reporter_email, lost_date,
+         lost_category, lost_location, found_title, found_date, found_category, found_location) in rows:
+        subject, body = build_match_email(
+            reporter_name, lost_title, lost_category or 'N/A', lost_location or 'N/A', lost_date,
+            found_title, found_category or 'N/A', found_location or 'N/A', found_date, int(score * 100)
+        )
+        messages.append((reporter_email, subject, body, 'text', f"ml_match:{found_id}:{lost_id}"))
+        emailed.append((found_id, lost_id))
+    
+    if not messages:
+        return 0
+    
+    # Queue in the outbox; commits together with this run's matches
+    get_outbox(DB_PATH).enqueue_many(messages, conn=cursor.connection)
+    
+    # Mark email as sent (queued)
+    cursor.executemany('''
+        UPDATE ml_matches 
+        SET email_sent = 1
+        WHERE found_item_id = ? AND lost_item_id = ?
+    ''', emailed)
+    
+    print(f"      [EMAIL] {len(messages)} match notification(s) queued")
+    return len(messages)
+
+
+def persist_matches(cursor, rows, rescored_found_ids=()):
+    """
+    Write a run's matches in bulk
+    
+    Matches are staged in a temp table and merged into ml_matches with one
+    INSERT ... ON CONFLICT DO UPDATE, which refreshes score and breakdown but
+    leaves email_sent alone. For rescored found items, matches that didn't make
+    the new top 10 are removed. New matches then get their email queued.
+    
+    Args:
+        cursor: Database cursor (committed here)
+        rows: match_row() tuples
+        rescored_found_ids: Found items whose matches are replaced by this run's
+        
+    Returns:
+        Dictionary with stored, removed and emails_queued counts
+    """
+    cursor.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS run_matches (
+            found_item_id INTEGER NOT NULL,
+            lost_item_id INTEGER NOT NULL,
+            match_score REAL NOT NULL,
+            score_breakdown TEXT,
+            PRIMARY KEY (found_item_id, lost_item_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS run_rescored_found (
+            found_item_id INTEGER PRIMARY KEY
+        )
+    ''')
+    cursor.execute('DELETE FROM temp.run_matches')
+    cursor.execute('DELETE FROM temp.run_rescored_found')
+    
+    # A pair scored twice in one run keeps its last score
+    cursor.executemany('''
+        INSERT OR REPLACE INTO temp.run_matches (found_item_id, lost_item_id, match_score, score_breakdown)
+        VALUES (?, ?, ?, ?)
+    ''', rows)
+    cursor.executemany(
+        'INSERT OR IGNORE INTO temp.run_rescored_found (found_item_id) VALUES (?)',
+        [(found_id,) for found_id in rescored_found_ids]
+    )
+    
+    cursor.execute('''
+        DELETE FROM ml_matches
+        WHERE found_item_id IN (SELECT found_item_id FROM temp.run_rescored_found)
+        AND NOT EXISTS (
+            SELECT 1 FROM temp.run_matches r
+            WHERE r.found_item_id = ml_matches.found_item_id
+            AND r.lost_item_id = ml_matches.lost_item_id
+        )
+    ''')
+    removed = cursor.rowcount
+    
+    cursor.execute('''
+        INSERT INTO ml_matches (found_item_id, lost_item_id, match_score, score_breakdown, computed_at, email_sent)
+        SELECT found_item_id, lost_item_id, match_score, score_breakdown, CURRENT_TIMESTAMP, 0
+        FROM temp.run_matches
+        WHERE true
+        ON CONFLICT (found_item_id, lost_item_id) DO UPDATE SET
+            match_score = excluded.match_score,
+            score_breakdown = excluded.score_breakdown,
+            computed_at = excluded.computed_at
+    ''')
+    stored = cursor.execute('SELECT COUNT(*) FROM temp.run_matches').fetchone()[0]
+    
+    emails_queued = 0
+    try:
+        emails_queued = queue_match_emails(cursor)
+    except Exception as email_error:
+        print(f"      ⚠️  Could not queue email notifications: {email_error}")
+    
+    cursor.connection.commit()
+    return {'stored': stored, 'removed': removed, 'emails_queued': emails_queued}
+
+
+def delete_matches(cursor, column, item_ids):
+    """Delete ml_matches rows whose found_item_id / lost_item_id is in item_ids"""
+    deleted = 0
+    item_ids = list(item_ids)
+    for start in range(0, len(item_ids), ID_CHUNK_SIZE):
+        chunk = item_ids[start:start + ID_CHUNK_SIZE]
+        cursor.execute(
+            f"DELETE FROM ml_matches WHERE {column} IN ({','.join('?' * len(chunk))})", chunk
+        )
+        deleted += cursor.rowcount
+    return deleted
+
+
+def get_unclaimed_found_ids(cursor):
+    """IDs of all found items that are still matched (not claimed)"""
+    return [row[0] for row in cursor.execute("""
+        SELECT rowid as id FROM found_items 
+        WHERE (status IS NULL OR status != 'CLAIMED')
+    """).fetchall()]
+
+
+def new_run_stats(found_count):
+    """Counters and timings reported by a matching run"""
+    return {'found_count': found_count, 'total_matches': 0, 'high_confidence': 0,
+            'stored_matches': 0, 'pruned_pairs': 0, 'emails_queued': 0,
+            'scoring_seconds': 0.0, 'write_seconds': 0.0}
+
+
+def run_full_matching(ml_service, cursor, timestamp):
+    """
+    Rescore every unclaimed found item against all lost items
+    
+    Returns:
+        Dictionary of run statistics
+    """
+    found_ids = get_unclaimed_found_ids(cursor)
+    
+    lost_items = cursor.execute("""
+        SELECT rowid as id FROM lost_items
+        WHERE is_resolved = 0
+    """).fetchall()
+    
+    found_count = len(found_ids)
+    lost_count = len(lost_items)
+    
+    print(f"[{timestamp}] Full run: processing {found_count} found items against {lost_count} lost items...")
+    
+    # Clean up orphaned matches (where items no longer exist)
+    # This handles cases where lost items expired (3 days) or found items were claimed
+    # (anti-join on the item tables' rowid keys, one index probe per match)
+    cursor.execute('''
+        DELETE FROM ml_matches 
+        WHERE NOT EXISTS (SELECT 1 FROM found_items f WHERE f.rowid = ml_matches.found_item_id)
+        OR NOT EXISTS (SELECT 1 FROM lost_items l WHERE l.rowid = ml_matches.lost_item_id)
+    ''')
+    orphaned_count = cursor.rowcount
+    cursor.connection.commit()
+    if orphaned_count > 0:
+        print(f"[{timestamp}] Cleaned up {orphaned_count} orphaned matches")
+    
+    stats = new_run_stats(found_count)
+    rows = []
+    rescored = []
+    
+    # Score everything first; nothing is written (or locked) while scoring
+    scoring_started = time.time()
+    for found_id in found_ids:
+        try:
+            matches = ml_service.find_matches_for_found_item(
+                found_item_id=found_id,
+                min_score=MIN_SCORE,  # 70% threshold - only show high-quality matches
+                top_k=TOP_K
+            )
+            stats['pruned_pairs'] += ml_service.last_prune_stats['pruned']
+            
+            if matches:
+                stats['total_matches'] += len(matches)
+                stats['high_confidence'] += len([m for m in matches if m['match_score'] >= 0.8])
+                collect_matches(found_id, matches, rows)
+            rescored.append(found_id)
+            
+        except Exception as e:
+            print(f"   ⚠️  Error matching found item #{found_id}: {e}")
+    stats['scoring_seconds'] = time.time() - scoring_started
+    
+    # Upsert preserves email_sent flags; matches of every scored found item that
+    # dropped out of its top 10 (or below 70%) are removed, as in incremental runs
+    # (a found item that fails to score keeps its old matches)
+    print(f"[{timestamp}] Updating matches (preserving email notification status)...")
+    write_started = time.time()
+    result = persist_matches(cursor, rows, rescored_found_ids=rescored)
+    stats['write_seconds'] = time.time() - write_started
+    stats['stored_matches'] = result['stored']
+    stats['emails_queued'] = result['emails_queued']
+    
+    return stats
+
+
+def run_incremental_matching(ml_service, cursor, changes, timestamp):
+    """
+    Rescore only items that changed since the last run
+    
+    - Deleted items: their ml_matches rows are removed
+    - New/edited found items, and found items that held a match with a changed lost item:
+      rescored against all lost items (their old matches are replaced)
+    - New/edited lost items: scored against every other unclaimed found item, and stored
+      where they make that found item's top 10 (replacing the matches they push out)
+    
+    Args:
+        changes: ItemChangeLog.get_pending_changes() result
+        
+    Returns:
+        Dictionary of run statistics
+    """
+    lost_changes, found_changes = changes['lost'], changes['found']
+    print(f"[{timestamp}] Incremental run: {len(found_changes)} found and "
+          f"{len(lost_changes)} lost items changed since last run")
+    
+    stats = new_run_stats(0)
+    rows = []
+    
+    # Found items holding a match with a changed/deleted lost item may need their top 10
+    # refilled, so they get a full rescore too
+    lost_ids = list(lost_changes)
+    refill = set()
+    for start in range(0, len(lost_ids), ID_CHUNK_SIZE):
+        chunk = lost_ids[start:start + ID_CHUNK_SIZE]
+        refill.update(row[0] for row in cursor.execute(
+            f"SELECT DISTINCT found_item_id FROM ml_matches WHERE lost_item_id IN ({','.join('?' * len(chunk))})",
+            chunk
+        ).fetchall())
+    
+    # Drop matches of removed items
+    write_started = time.time()
+    removed = delete_matches(cursor, 'found_item_id',
+                             [i for i, change in found_changes.items() if change == 'deleted'])
+    removed += delete_matches(cursor, 'lost_item_id',
+                              [i for i, change in lost_changes.items() if change == 'deleted'])
+    if removed > 0:
+        print(f"[{timestamp}] Removed {removed} matches of deleted items")
+    cursor.connection.commit()
+    stats['write_seconds'] += time.time() - write_started
+    
+    unclaimed = set(get_unclaimed_found_ids(cursor))
+    changed_found = {i for i, change in found_changes.items() if change != 'deleted'}
+    changed_found = sorted((changed_found | refill) & unclaimed)
+    changed_lost = sorted(i for i, change in lost_changes.items() if change != 'deleted')
+    stats['found_count'] = len(changed_found)
+    
+    # New/edited found items: full rescore, replacing whatever they matched before
+    # (a found item that fails to score keeps its old matches)
+    scoring_started = time.time()
+    rescored = []
+    for found_id in changed_found:
+        try:
+            matches = ml_service.find_matches_for_found_item(
+                found_item_id=found_id,
+                min_score=MIN_SCORE,
+                top_k=TOP_K
+            )
+            stats['pruned_pairs'] += ml_service.last_prune_stats['pruned']
+            
+            stats['total_matches'] += len(matches)
+            stats['high_confidence'] += len([m for m in matches if m['match_score'] >= 0.8])
+            collect_matches(found_id, matches, rows)
+            rescored.append(found_id)
+        
+        except Exception as e:
+            print(f"   ⚠️  Error matching found item #{found_id}: {e}")
+    
+    if changed_lost:
+        rescored += score_changed_lost_items(ml_service, cursor, changed_lost,
+                                             unclaimed - set(changed_found), stats, rows)
+    stats['scoring_seconds'] = time.time() - scoring_started
+    
+    write_started = time.time()
+    result = persist_matches(cursor, rows, rescored_found_ids=rescored)
+    stats['write_seconds'] += time.time() - write_started
+    stats['stored_matches'] = result['stored']
+    stats['emails_queued'] = result['emails_queued']
+    
+    return stats
+
+
+def score_changed_lost_items(ml_service, cursor, changed_lost, others, stats, rows):
+    """
+    Score new/edited lost items against the found items that were not rescored
+    (none of these holds a match with a changed lost item, see refill)
+    
+    For every found item a changed lost item matches, its merged top 10 (stored
+    matches plus the new ones) is staged in rows, so the stored matches it
+    pushes out are removed when the found item is passed to persist_matches()
+    as rescored.
+    
+    Returns:
+        IDs of the found items whose top 10 was staged
+    """
+    others = sorted(others)
+    candidates_by_found = {}
+    for lost_id in changed_lost:
+        try:
+            for match in ml_service.score_lost_item_against(lost_id, others, MIN_SCORE):
+                match['lost_item_id'] = lost_id
+                candidates_by_found.setdefault(match['found_item_id'], []).append(match)
+            stats['pruned_pairs'] += ml_service.last_prune_stats['pruned']
+        except Exception as e:
+            print(f"   ⚠️  Error matching lost item #{lost_id}: {e}")
+    
+    # A changed lost item is stored only if it makes the found item's top 10
+    changed_lost_set = set(changed_lost)
+    for found_id, candidates in candidates_by_found.items():
+        ranked = [
+            (score, lost_id, (found_id, lost_id, score, breakdown))
+            for lost_id, score, breakdown in cursor.execute(
+                'SELECT lost_item_id, match_score, score_breakdown FROM ml_matches WHERE found_item_id = ?',
+                (found_id,)
+            ).fetchall()
+            if lost_id not in changed_lost_set
+        ]
+        ranked += [(m['match_score'], m['lost_item_id'], m) for m in candidates]
+        ranked.sort(key=lambda r: r[0], reverse=True)
+        
+        for score, lost_id, match in ranked[:TOP_K]:
+            if isinstance(match, tuple):
+                # Stored match that stays in the top 10
+                rows.append(match)
+                continue
+            stats['total_matches'] += 1
+            if score >= 0.8:
+                stats['high_confidence'] += 1
+            collect_matches(found_id, [match], rows)
+    
+    return list(candidates_by_found)
+
+
+def run_ml_matching(full=False, ml_service=None):
+    """
+    Run ML matching and store matches with scores >= 70% in ml_matches table for fast dashboard loading
+    
+    Only items that changed since the last run (per the item change log) are rescored.
+    The first run, or full=True, rescans every unclaimed found item against all lost items.
+    
+    Args:
+        full: Force a full rebuild
+        ml_service: Loaded MLMatchingService to reuse (a new one is created if omitted)
+    """
+    try:
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"\n[{timestamp}] Starting ML Matching Process...")
+        
+        # Initialize ML service (models load once; scheduler runs pass theirs in)
+        if ml_service is None:
+            ml_service = MLMatchingService(
+                db_path=DB_PATH,
+                upload_folder=UPLOAD_FOLDER
+            )
+        change_log = ItemChangeLog(DB_PATH)
+        
+        # Create the outbox (and start its sender) before this run's write transaction opens
+        get_outbox(DB_PATH)
+        
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        
+        # Everything up to this change is covered by this run; later changes wait for the next one
+        up_to = change_log.current_change_id(conn)
+        since = change_log.get_high_water_mark(conn, CONSUMER)
+        full = full or since is None
+        
+        if full:
+            stats = run_full_matching(ml_service, cursor, timestamp)
+        else:
+            changes = change_log.get_pending_changes(conn, since, up_to)
+            stats = run_incremental_matching(ml_service, cursor, changes, timestamp)
+        
+        change_log.set_high_water_mark(conn, CONSUMER, up_to, full_run=full)
+        change_log.trim(conn)
         
         conn.commit()
         conn.close()
         
-        print(f"[{timestamp}] ML Matching Complete!")
-        print(f"   Total matches found (>=70%): {total_matches}")
-        print(f"   Matches stored in database: {stored_matches}")
-        print(f"   High confidence matches (>=80%): {high_confidence}")
-        print(f"   Average matches per found item: {total_matches/found_count if found_count > 0 else 0:.2f}")
+        found_count = stats['found_count']
+        print(f"[{timestamp}] ML Matching Complete! ({'full' if full else 'incremental'})")
+        print(f"   Total matches found (>=70%): {stats['total_matches']}")
+        print(f"   Matches stored in database: {stats['stored_matches']}")
+        print(f"   High confidence matches (>=80%): {stats['high_confidence']}")
+        print(f"   Pairs skipped by score upper bound: {stats['pruned_pairs']}")
+        print(f"   Match emails queued: {stats['emails_queued']}")
+        print(f"   Scoring time: {stats['scoring_seconds']:.1f}s, write time: {stats['write_seconds']:.2f}s")
+        print(f"   Average matches per found item: {stats['total_matches']/found_count if found_count > 0 else 0:.2f}")
         
-        return total_matches
+        return stats['total_matches']
         
     except Exception as e:
         print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] ML matching failed: {e}")
@@ -257,12 +563,15 @@ def run_scheduler():
     print("Matches with >=70% confidence will be stored in database")
     print("Press Ctrl+C to stop the scheduler\n")
     
+    # Load the models once and reuse them for every run
+    ml_service = MLMatchingService(db_path=DB_PATH, upload_folder=UPLOAD_FOLDER)
+    
     # Schedule ML matching every hour (production mode)
-    schedule.every().hour.do(run_ml_matching)
+    schedule.every().hour.do(run_ml_matching, ml_service=ml_service)
     
     # Run matching immediately on start
     print("Running initial ML matching...")
-    run_ml_matching()
+    run_ml_matching(ml_service=ml_service)
     
     # Keep the scheduler running
     print("\n⏳ Waiting for next scheduled run (in 1 hour)...\n")
@@ -277,6 +586,11 @@ if __name__ == '__main__':
         print(f"Expected: {DB_PATH}")
         exit(1)
     
+    # One-off full rebuild instead of the hourly scheduler
+    if '--full' in sys.argv:
+        run_ml_matching(full=True)
+        exit(0)
+    
     try:
         run_scheduler()
     except KeyboardInterrupt:
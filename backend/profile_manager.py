@@ -13,6 +13,7 @@ from datetime import datetime
 import hashlib
 from PIL import Image
 import json
+import db_pool
 
 # Database configuration
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traceback_100k.db')
@@ -75,7 +76,7 @@ def get_user_profile(user_id):
     """Get complete user profile by ID"""
     conn = None
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=20.0)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -111,8 +112,7 @@ def update_user_profile(user_id, profile_data):
     conn = None
     try:
         # Use timeout and isolation level to prevent locking
-        conn = sqlite3.connect(DB_PATH, timeout=20.0, isolation_level='DEFERRED')
-        conn.execute('PRAGMA journal_mode=WAL')  # Write-Ahead Logging for better concurrency
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Build dynamic update query
@@ -213,7 +213,7 @@ def create_profile_endpoints(app):
             
             # Get current user data to verify identity
             try:
-                conn = sqlite3.connect(DB_PATH, timeout=20.0)
+                conn = db_pool.connect(DB_PATH)
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT first_name, last_name, student_id 
@@ -408,7 +408,7 @@ def create_profile_endpoints(app):
     def get_profile_stats():
         """Get profile completion statistics"""
         try:
-            conn = sqlite3.connect(DB_PATH)
+            conn = db_pool.connect(DB_PATH)
             cursor = conn.cursor()
             
             # Get profile completion stats
@@ -1,13 +1,18 @@
 """
 TraceBack Public Item Notification Scheduler
-Checks for items that just became public (after 72 hours) and sends email notifications
+Sends email notifications when found items become public (after 72 hours)
+
+Each item's public_at is queued in due_events (see due_events.py), so users are
+notified when the item becomes public instead of on the next hourly check, and
+nothing has to be rescanned at startup.
 """
 
+import os
 import sqlite3
-import schedule
-import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from email_notification_service import EmailNotificationService
+from db_migrations import run_migrations
+from due_events import DueEventQueue, EVENT_ITEM_PUBLIC, OUTCOME_SENT, OUTCOME_SKIPPED
 import pytz
 
 # ET timezone
@@ -20,100 +25,80 @@ def get_et_now():
 DB_PATH = 'traceback_100k.db'
 notification_service = EmailNotificationService(DB_PATH)
 
-# Track items we've already notified about
-notified_items = set()
+# Digest mode: one email per user listing every item that became public in the same batch,
+# instead of one email per user per item (ENV: PUBLIC_ITEM_DIGEST=0 to disable)
+DIGEST_MODE = os.environ.get('PUBLIC_ITEM_DIGEST', '1') == '1'
 
-def check_and_notify_public_items():
-    """
-    Check for found items that just became public (72 hours passed)
-    and send email notifications to all users except the finder
+def notify_due_public_items(item_ids):
     """
-    try:
-        print(f"\n🔍 [{get_et_now().strftime('%Y-%m-%d %H:%M:%S ET')}] Checking for newly public items...")
-        
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Find items that:
-        # 1. Are older than 72 hours (3 days) - past privacy period
-        # 2. Have NO potential claimers (no claim_attempts with success=1)
-        # 3. Became public within the last hour (so we notify once)
-        # Only send emails for items that are ACTUALLY visible in public found items page
-        # If there's even ONE potential claimer (success=1), item goes to claimed items 3-day window, so NO email
-        cursor.execute("""
-            SELECT 
-                f.id, 
-                f.title, 
-                f.created_at,
-                f.finder_email,
-                julianday('now', 'localtime') - julianday(f.created_at) as hours_since_created
-            FROM found_items f
-            LEFT JOIN claim_attempts ca ON f.id = ca.found_item_id AND ca.success = 1
-            WHERE ca.attempt_id IS NULL
-            AND datetime(f.created_at) <= datetime('now', 'localtime', '-3 days')
-            AND datetime(f.created_at) >= datetime('now', 'localtime', '-3 days', '-1 hours')
-            ORDER BY f.created_at DESC
-        """)
-        
-        items = cursor.fetchall()
-        conn.close()
-        
-        new_public_items = []
-        for item in items:
-            if item['id'] not in notified_items:
-                new_public_items.append(item)
-                notified_items.add(item['id'])
+    Handler for due item_public events: notify users about items that just became public
+    
+    Only items with NO potential claimers (no claim_attempts with success=1) are
+    actually visible on the public found items page, so only those are announced.
+    If there's even ONE potential claimer, the item goes to the claimed items
+    3-day window instead, so NO email.
+    
+    Args:
+        item_ids: Found item IDs whose public_at is due
         
-        if new_public_items:
-            print(f"📧 Found {len(new_public_items)} newly public items to notify about:")
-            
-            for item in new_public_items:
-                hours = item['hours_since_created'] * 24  # Convert days to hours
-                print(f"   - Item #{item['id']}: '{item['title']}' (public for {hours:.1f} hours)")
-                
-                # Send notifications
-                notification_service.notify_users_of_public_item(item['id'])
-            
-            print(f"✅ Notification process initiated for {len(new_public_items)} items")
+    Returns:
+        {item_id: outcome} (see due_events.py)
+    """
+    print(f"\n🔍 [{get_et_now().strftime('%Y-%m-%d %H:%M:%S ET')}] {len(item_ids)} item(s) became public...")
+    
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    
+    cursor.execute(f"""
+        SELECT 
+            f.id, 
+            f.title, 
+            f.public_at,
+            f.public_at <= datetime('now', 'localtime') as is_public,
+            EXISTS (
+                SELECT 1 FROM claim_attempts ca
+                WHERE ca.found_item_id = f.id AND ca.success = 1
+            ) as has_claimer,
+            julianday('now', 'localtime') - julianday(f.created_at) as days_since_created
+        FROM found_items f
+        WHERE f.id IN ({','.join('?' * len(item_ids))})
+    """, list(item_ids))
+    items = {item['id']: item for item in cursor.fetchall()}
+    conn.close()
+    
+    outcomes = {}
+    new_public_items = []
+    for item_id in item_ids:
+        item = items.get(item_id)
+        if not item or item['has_claimer'] or item['public_at'] is None:
+            outcomes[item_id] = OUTCOME_SKIPPED
+        elif not item['is_public']:
+            # public_at moved after the event was picked up
+            outcomes[item_id] = item['public_at']
         else:
-            print("✓ No new public items found")
+            new_public_items.append(item)
+    
+    if new_public_items:
+        print(f"📧 Found {len(new_public_items)} newly public items to notify about:")
+        for item in new_public_items:
+            hours = item['days_since_created'] * 24  # Convert days to hours
+            print(f"   - Item #{item['id']}: '{item['title']}' (public after {hours:.1f} hours)")
             
-    except Exception as e:
-        print(f"❌ Error in check_and_notify_public_items: {e}")
-        import traceback
-        traceback.print_exc()
-
-
-def load_already_notified_items():
-    """
-    Load items that are already public so we don't notify about old items on startup
-    """
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Get all items that are already past 72 hours (so we don't notify about them on startup)
-        # Only include items with NO potential claimers (truly public, not in 3-day window)
-        cursor.execute("""
-            SELECT f.id 
-            FROM found_items f
-            LEFT JOIN claim_attempts ca ON f.id = ca.found_item_id AND ca.success = 1
-            WHERE datetime(f.created_at) <= datetime('now', 'localtime', '-3 days')
-            AND ca.attempt_id IS NULL
-        """)
-        
-        items = cursor.fetchall()
-        conn.close()
-        
-        for item in items:
-            notified_items.add(item[0])
+            # Send notifications
+            if not DIGEST_MODE:
+                notification_service.notify_users_of_public_item(item['id'])
         
-        print(f"📋 Loaded {len(notified_items)} already-public items (will not notify)")
+        if DIGEST_MODE:
+            notification_service.notify_users_of_public_items_digest([item['id'] for item in new_public_items])
         
-    except Exception as e:
-        print(f"⚠️  Error loading already notified items: {e}")
-
+        for item in new_public_items:
+            outcomes[item['id']] = OUTCOME_SENT
+        print(f"✅ Notification process initiated for {len(new_public_items)} items")
+    else:
+        print("✓ No items to announce (claimed in the meantime or removed)")
+    
+    return outcomes
 
 def run_scheduler():
     """Run the notification scheduler"""
@@ -123,28 +108,19 @@ def run_scheduler():
     print(f"Started at: {get_et_now().strftime('%Y-%m-%d %H:%M:%S ET')}")
     print(f"Database: {DB_PATH}")
     print(f"Email notifications: {'✅ Enabled' if notification_service.enabled else '❌ Disabled'}")
+    print(f"Delivery: {'one digest email per user per batch' if DIGEST_MODE else 'one email per item'}")
     print()
-    print("Schedule: Check for newly public items every hour")
+    print("Schedule: Notify as each item's privacy window ends (due_events queue)")
     print("=" * 80)
     
-    # Load existing public items so we don't notify about them
-    load_already_notified_items()
-    
-    # Schedule the check to run every hour
-    schedule.every().hour.do(check_and_notify_public_items)
-    
-    # Also run immediately on startup
-    print("\n🔍 Running initial check...")
-    check_and_notify_public_items()
+    # public_at column / index come from the schema migrations
+    run_migrations(DB_PATH)
+    queue = DueEventQueue(DB_PATH)
     
     print("\n⏰ Scheduler is running. Press Ctrl+C to stop.")
     print()
     
-    # Keep running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute if it's time to run scheduled tasks
-
+    queue.run_forever({EVENT_ITEM_PUBLIC: notify_due_public_items})
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,382 @@
+"""
+TraceBack Scheduler Runtime
+One process for every background job that used to run as its own scheduler
+(ml_scheduler.py, cleanup_scheduler.py, combined_scheduler.py,
+public_item_notification_scheduler.py, finder_decision_notification_scheduler.py).
+
+- one MLMatchingService (and one copy of the models) is loaded and reused by every
+  ML matching run
+- due jobs run on a small thread pool (SCHEDULER_WORKERS) so a long ML run doesn't
+  hold up notifications
+- public-item and finder-decision notifications fire when they become due
+  (due_events.py) on their own thread instead of on hourly checks
+- a job that is still running when it comes due again is skipped, not stacked
+- run times, durations and failures per job are kept in scheduler_job_runs
+
+Usage:
+    python scheduler_runtime.py            # run all jobs
+    python scheduler_runtime.py --status   # show the last run of every job
+"""
+
+import os
+import sys
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import schedule
+from due_events import DueEventQueue, EVENT_ITEM_PUBLIC, EVENT_FINDER_DECISION
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traceback_100k.db')
+UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+
+# Jobs that may run at the same time (ENV: SCHEDULER_WORKERS)
+SCHEDULER_WORKERS = int(os.environ.get('SCHEDULER_WORKERS', '2'))
+
+# Seconds between checks for due jobs
+POLL_SECONDS = 30
+
+_ml_service = None
+_ml_service_lock = threading.Lock()
+
+
+def get_ml_service():
+    """Get the shared ML matching service (models are loaded once per process)"""
+    global _ml_service
+    with _ml_service_lock:
+        if _ml_service is None:
+            from ml_matching_service import MLMatchingService
+            started = time.time()
+            _ml_service = MLMatchingService(db_path=DB_PATH, upload_folder=UPLOAD_FOLDER)
+            _ml_service.warm_up_image_model()
+            print(f"🤖 ML models loaded in {time.time() - started:.1f}s (shared by all ML runs)")
+        return _ml_service
+
+
+class ScheduledJob:
+    def __init__(self, name, func):
+        """
+        Args:
+            name: Job name (key in scheduler_job_runs)
+            func: Callable run by the job
+        """
+        self.name = name
+        self.func = func
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.total_duration = 0.0
+        self.last_started_at = None
+        self.last_finished_at = None
+        self.last_duration = None
+        self.last_status = None
+        self.last_error = None
+
+    def get_stats(self):
+        return {
+            'name': self.name,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped_overlaps': self.skipped,
+            'last_started_at': self.last_started_at,
+            'last_finished_at': self.last_finished_at,
+            'last_duration_seconds': round(self.last_duration, 2) if self.last_duration is not None else None,
+            'avg_duration_seconds': round(self.total_duration / self.runs, 2) if self.runs else None,
+            'last_status': self.last_status,
+            'last_error': self.last_error,
+        }
+
+
+class SchedulerRuntime:
+    def __init__(self, db_path=DB_PATH, max_workers=SCHEDULER_WORKERS):
+        """
+        Initialize the runtime (jobs are added with register())
+
+        Args:
+            db_path: Database where job run stats are recorded
+            max_workers: Jobs that may run at the same time
+        """
+        self.db_path = db_path
+        self.scheduler = schedule.Scheduler()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='scheduler-job')
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self.init_job_runs_table()
+
+    def init_job_runs_table(self):
+        """Create scheduler_job_runs table if it doesn't exist"""
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scheduler_job_runs (
+                job_name TEXT PRIMARY KEY,
+                last_started_at TIMESTAMP,
+                last_finished_at TIMESTAMP,
+                last_duration_seconds REAL,
+                last_status TEXT,
+                last_error TEXT,
+                run_count INTEGER DEFAULT 0,
+                failure_count INTEGER DEFAULT 0,
+                skipped_count INTEGER DEFAULT 0,
+                total_duration_seconds REAL DEFAULT 0
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def register(self, name, func, every):
+        """
+        Add a job
+
+        Args:
+            name: Job name
+            func: Callable to run
+            every: Function taking the scheduler and returning its schedule,
+                   e.g. lambda s: s.every().day.at("02:00"), or None for a job
+                   that is only run through submit()
+        """
+        self.jobs[name] = ScheduledJob(name, func)
+        if every:
+            every(self.scheduler).do(self.submit, name)
+
+    def submit(self, name):
+        """
+        Queue a run of a job, unless the previous run hasn't finished
+
+        Returns:
+            Future of the run, or None if it was skipped
+        """
+        job = self.jobs[name]
+        if not self._start(job):
+            return None
+        return self.executor.submit(self._run, job)
+
+    def run_inline(self, name):
+        """
+        Run a job on the calling thread instead of the executor, so it can't be
+        held up by long jobs using every worker (same overlap guard and stats)
+
+        Returns:
+            The job's result, or None if it was already running or failed
+        """
+        job = self.jobs[name]
+        if not self._start(job):
+            return None
+        return self._run(job)
+
+    def _start(self, job):
+        """Mark a job as running; False (and a skipped run) if it already is"""
+        with self._lock:
+            if job.running:
+                job.skipped += 1
+                skipped = True
+            else:
+                job.running = True
+                skipped = False
+
+        if skipped:
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ⏭️  {job.name} is still running, skipping this run")
+            self._record(job)
+            return False
+        return True
+
+    def _run(self, job):
+        started = time.time()
+        job.last_started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            result = job.func()
+            job.last_status = 'ok'
+            job.last_error = None
+            return result
+        except Exception as e:
+            # Job functions log their own errors; this catches anything they let through
+            job.failures += 1
+            job.last_status = 'error'
+            job.last_error = str(e)
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ❌ Job {job.name} failed: {e}")
+        finally:
+            job.last_duration = time.time() - started
+            job.total_duration += job.last_duration
+            job.runs += 1
+            job.last_finished_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            with self._lock:
+                job.running = False
+            print(f"[{job.last_finished_at}] ⏱️  {job.name} finished in {job.last_duration:.1f}s")
+            self._record(job)
+
+    def _record(self, job):
+        """Write a job's counters to scheduler_job_runs"""
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=10.0)
+            conn.execute('''
+                INSERT OR REPLACE INTO scheduler_job_runs
+                (job_name, last_started_at, last_finished_at, last_duration_seconds, last_status,
+                 last_error, run_count, failure_count, skipped_count, total_duration_seconds)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (job.name, job.last_started_at, job.last_finished_at, job.last_duration, job.last_status,
+                  job.last_error, job.runs, job.failures, job.skipped, job.total_duration))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"⚠️  Could not record run stats for {job.name}: {e}")
+
+    def run_all(self):
+        """Queue every scheduled job now (e.g. at startup)"""
+        scheduled = {job.job_func.args[0] for job in self.scheduler.get_jobs()}
+        return [self.submit(name) for name in self.jobs if name in scheduled]
+
+    def run_now(self, name):
+        """
+        Run a job and wait for it
+
+        Returns:
+            The job's result, or None if it was already running or failed
+        """
+        future = self.submit(name)
+        return future.result() if future else None
+
+    def get_job_stats(self):
+        """Run counters and timings of every job, plus its next scheduled run"""
+        next_runs = {}
+        for scheduled in self.scheduler.get_jobs():
+            name = scheduled.job_func.args[0]
+            next_runs[name] = scheduled.next_run.strftime('%Y-%m-%d %H:%M:%S') if scheduled.next_run else None
+        stats = []
+        for name, job in self.jobs.items():
+            job_stats = job.get_stats()
+            job_stats['next_run'] = next_runs.get(name)
+            stats.append(job_stats)
+        return stats
+
+    def run_forever(self, poll_seconds=POLL_SECONDS):
+        """Run due jobs until interrupted"""
+        try:
+            while True:
+                self.scheduler.run_pending()
+                time.sleep(poll_seconds)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Wait for running jobs and stop the executor"""
+        self.executor.shutdown(wait=True)
+
+
+def build_runtime(db_path=DB_PATH):
+    """
+    Runtime with every TraceBack background job registered
+
+    ML matching runs the ml_scheduler pipeline (stores matches and queues match
+    emails), which is also what combined_scheduler runs.
+    """
+    import ml_scheduler
+    import cleanup_scheduler
+    import combined_scheduler
+    import public_item_notification_scheduler as public_items
+    import finder_decision_notification_scheduler as finder_decisions
+
+    runtime = SchedulerRuntime(db_path)
+    runtime.register('ml_matching',
+                     lambda: ml_scheduler.run_ml_matching(ml_service=get_ml_service()),
+                     lambda s: s.every().hour)
+    runtime.register('cleanup_claimed_items',
+                     cleanup_scheduler.cleanup_old_claimed_items,
+                     lambda s: s.every().day.at("02:00"))
+    runtime.register('reconcile_taxonomy_counts',
+                     combined_scheduler.reconcile_taxonomy_counts,
+                     lambda s: s.every().day.at("03:00"))
+
+    # Public-item and finder-decision notifications fire when due (see run_due_events)
+    runtime.due_event_handlers = {
+        EVENT_ITEM_PUBLIC: public_items.notify_due_public_items,
+        EVENT_FINDER_DECISION: finder_decisions.notify_due_finder_decisions,
+    }
+    queue = DueEventQueue(db_path)
+    runtime.due_event_queue = queue
+    runtime.register('due_events', lambda: queue.dispatch_due(runtime.due_event_handlers), None)
+    return runtime
+
+
+def run_due_events(runtime):
+    """
+    Fire public-item and finder-decision notifications as they become due
+
+    Sleeps until the next event in due_events is due (checking at least every
+    MAX_WAIT_SECONDS for events added by the API) and fires them as the
+    due_events job on this thread, not the executor, so a long ML run or
+    cleanup can't delay them; runs are still recorded in scheduler_job_runs.
+    """
+    queue = runtime.due_event_queue
+    thread = threading.Thread(
+        target=queue.run_forever,
+        args=(runtime.due_event_handlers,),
+        kwargs={'dispatch': lambda: runtime.run_inline('due_events')},
+        name='due-events',
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def print_status(db_path=DB_PATH):
+    """Print the recorded runs of every job"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute('SELECT * FROM scheduler_job_runs ORDER BY job_name').fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    conn.close()
+
+    if not rows:
+        print("No scheduler runs recorded yet")
+        return
+    for row in rows:
+        avg = row['total_duration_seconds'] / row['run_count'] if row['run_count'] else 0
+        print(f"{row['job_name']:<32} last {row['last_started_at'] or '-'} "
+              f"({row['last_status'] or '-'}, {row['last_duration_seconds'] or 0:.1f}s) "
+              f"runs={row['run_count']} failures={row['failure_count']} "
+              f"skipped={row['skipped_count']} avg={avg:.1f}s")
+
+
+def run_scheduler():
+    """Run every background job in this process"""
+    from db_migrations import run_migrations
+
+    print("=" * 60)
+    print("🕐 TraceBack Scheduler Runtime")
+    print("=" * 60)
+
+    # public_at column / index etc. come from the schema migrations
+    run_migrations(DB_PATH)
+    runtime = build_runtime(DB_PATH)
+
+    print(f"\n📋 Scheduled Tasks ({SCHEDULER_WORKERS} worker(s)):")
+    for job in runtime.get_job_stats():
+        print(f"   - {job['name']} (next run {job['next_run'] or 'when due'})")
+    print("\nPress Ctrl+C to stop the scheduler\n")
+    print("=" * 60)
+
+    print("\n🚀 Running initial tasks...")
+    runtime.run_all()
+    run_due_events(runtime)
+    runtime.run_forever()
+
+
+if __name__ == '__main__':
+    if not os.path.exists(DB_PATH):
+        print("❌ Database not found!")
+        print(f"Expected: {DB_PATH}")
+        sys.exit(1)
+
+    if '--status' in sys.argv:
+        print_status(DB_PATH)
+        sys.exit(0)
+
+    try:
+        run_scheduler()
+    except KeyboardInterrupt:
+        print("\n\n🛑 Scheduler stopped by user")
+        sys.exit(0)
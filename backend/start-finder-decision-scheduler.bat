@@ -28,7 +28,7 @@ echo ========================================
 echo TraceBack Finder Decision Scheduler
 echo ========================================
 echo.
-echo This will check hourly for items where
+echo This will notify finders as soon as
 echo the 3-day competition window has ended
 echo and notify finders to make decisions.
 echo.
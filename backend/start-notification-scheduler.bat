@@ -26,7 +26,7 @@ echo ========================================
 echo TraceBack Notification Scheduler
 echo ========================================
 echo.
-echo This will check for newly public items every hour
+echo This will notify users as found items become public
 echo and send email notifications to all users.
 echo.
 echo Press Ctrl+C to stop the scheduler
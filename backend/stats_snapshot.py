@@ -0,0 +1,257 @@
+"""
+Statistics Snapshot
+In-memory snapshot of the figures behind /api/stats and /health?deep=1, computed
+in two aggregate passes instead of a dozen COUNT(*) queries per request.
+
+- the first read computes the snapshot; later reads are served from memory
+- once the snapshot is older than STATS_SNAPSHOT_TTL seconds, or a write marked
+  it dirty, the next read triggers one background refresh (at most every
+  STATS_MIN_REFRESH_SECONDS) and still gets the current figures immediately
+- every read reports generated_at, age_seconds and stale
+
+Usage:
+    snapshot = StatsSnapshot(DB_PATH)
+    data = snapshot.get()
+    data['stats'], data['counts'], data['age_seconds'], data['stale']
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import db_pool
+
+# Seconds a snapshot is served before it is refreshed (ENV: STATS_SNAPSHOT_TTL)
+STATS_SNAPSHOT_TTL = int(os.environ.get('STATS_SNAPSHOT_TTL', '60'))
+
+# Minimum seconds between refreshes, however often writes mark the snapshot dirty
+STATS_MIN_REFRESH_SECONDS = int(os.environ.get('STATS_MIN_REFRESH_SECONDS', '5'))
+
+# Window for "this week" figures
+RECENT_DAYS = 7
+
+# Entries in top_categories / top_locations
+TOP_N = 5
+
+# Pass 1: every total, one pre-aggregated single-row subquery per table
+TOTALS_SQL = '''
+    SELECT f.*, l.*, r.*,
+           (SELECT COUNT(*) FROM categories) as total_categories,
+           (SELECT COUNT(*) FROM locations) as total_locations
+    FROM (
+        SELECT COUNT(*) as found_total,
+               COALESCE(SUM(is_claimed = 0), 0) as found_active,
+               COALESCE(SUM(created_at >= :since), 0) as found_recent,
+               COALESCE(SUM(is_private = 1 AND datetime(privacy_expires_at) > datetime('now')), 0) as found_private
+        FROM found_items
+    ) f, (
+        SELECT COUNT(*) as lost_total,
+               COALESCE(SUM(is_resolved = 0), 0) as lost_active,
+               COALESCE(SUM(created_at >= :since), 0) as lost_recent
+        FROM lost_items
+    ) l, (
+        SELECT COUNT(*) as returns_total,
+               COALESCE(SUM(finalized_at >= :since), 0) as returns_recent
+        FROM successful_returns
+    ) r
+'''
+
+# Pass 2: open items per (category, location), folded into both breakdowns in Python
+BREAKDOWN_SQL = '''
+    SELECT 0 as is_found, category_id, location_id, COUNT(*) as count
+    FROM lost_items WHERE is_resolved = 0
+    GROUP BY category_id, location_id
+    UNION ALL
+    SELECT 1 as is_found, category_id, location_id, COUNT(*) as count
+    FROM found_items WHERE is_claimed = 0
+    GROUP BY category_id, location_id
+'''
+
+
+def top_entries(rows, tallies):
+    """
+    Rank categories/locations by open lost + found items
+
+    Args:
+        rows: Dicts with id, name (and any other columns to return)
+        tallies: {id: [lost_count, found_count]}
+
+    Returns:
+        Top TOP_N dicts without id, with lost_count and found_count
+    """
+    entries = []
+    for row in rows:
+        lost, found = tallies.get(row['id'], (0, 0))
+        entry = {key: value for key, value in row.items() if key != 'id'}
+        entry['lost_count'] = lost
+        entry['found_count'] = found
+        entries.append(entry)
+    entries.sort(key=lambda e: (-(e['lost_count'] + e['found_count']), e['name'] or ''))
+    return entries[:TOP_N]
+
+
+class StatsSnapshot:
+    def __init__(self, db_path, max_age=STATS_SNAPSHOT_TTL, min_interval=STATS_MIN_REFRESH_SECONDS, clock=None):
+        """
+        Initialize the snapshot (computed on first read)
+
+        Args:
+            db_path: Path to the database
+            max_age: Seconds before a snapshot is refreshed
+            min_interval: Minimum seconds between refreshes
+            clock: Function returning the current (local) datetime for "this week" figures
+        """
+        self.db_path = db_path
+        self.max_age = max_age
+        self.min_interval = min_interval
+        self.clock = clock or datetime.now
+        self._data = None
+        self._generated_at = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.refresh_count = 0
+        self.last_refresh_ms = None
+        self.last_error = None
+
+    def compute(self):
+        """
+        Compute all figures
+
+        Returns:
+            {'stats': /api/stats payload, 'counts': raw item totals}
+        """
+        since = (self.clock() - timedelta(days=RECENT_DAYS)).strftime('%Y-%m-%d %H:%M:%S')
+
+        conn = db_pool.connect(self.db_path, row_factory=sqlite3.Row)
+        try:
+            totals = dict(conn.execute(TOTALS_SQL, {'since': since}).fetchone())
+
+            by_category = {}
+            by_location = {}
+            for is_found, category_id, location_id, count in conn.execute(BREAKDOWN_SQL).fetchall():
+                by_category.setdefault(category_id, [0, 0])[is_found] += count
+                by_location.setdefault(location_id, [0, 0])[is_found] += count
+
+            categories = [dict(row) for row in conn.execute('SELECT id, name FROM categories').fetchall()]
+            locations = [dict(row) for row in conn.execute(
+                'SELECT id, name, building_code FROM locations'
+            ).fetchall()]
+        finally:
+            conn.close()
+
+        stats = {
+            # Found items including historical ones from successful_returns
+            'total_found_items': totals['found_total'] + totals['returns_total'],
+            'items_claimed': totals['returns_total'],
+            'active_found_items': totals['found_active'],
+            'found_this_week': totals['found_recent'] + totals['returns_recent'],
+            'active_lost_items': totals['lost_active'],
+            'total_categories': totals['total_categories'],
+            'total_locations': totals['total_locations'],
+            'recent_lost_items': totals['lost_recent'],
+            'private_found_items': totals['found_private'],
+            'top_categories': top_entries(categories, by_category),
+            'top_locations': top_entries(locations, by_location),
+        }
+        # Legacy stats for compatibility
+        stats['unclaimed_found_items'] = stats['active_found_items']
+        stats['recent_found_items'] = stats['found_this_week']
+        stats['total_items'] = stats['active_lost_items'] + stats['unclaimed_found_items']
+        stats['recent_total'] = stats['recent_lost_items'] + stats['recent_found_items']
+
+        counts = {
+            'lost_items': totals['lost_total'],
+            'found_items': totals['found_total'],
+            'categories': totals['total_categories'],
+            'locations': totals['total_locations'],
+        }
+        return {'stats': stats, 'counts': counts}
+
+    def refresh(self):
+        """Recompute the snapshot now"""
+        with self._refresh_lock:
+            self._refresh()
+
+    def _refresh(self):
+        started = time.time()
+        with self._lock:
+            # Writes from here on make the new snapshot dirty again
+            self._dirty = False
+        try:
+            data = self.compute()
+        except Exception as e:
+            with self._lock:
+                self._dirty = True
+                self.last_error = str(e)
+            raise
+        with self._lock:
+            self._data = data
+            self._generated_at = time.time()
+            self.refresh_count += 1
+            self.last_refresh_ms = round((self._generated_at - started) * 1000, 1)
+            self.last_error = None
+
+    def _refresh_in_background(self):
+        """Start a refresh unless one is already running"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self._refresh()
+            except Exception as e:
+                print(f"⚠️ Stats snapshot refresh failed: {e}")
+            finally:
+                self._refresh_lock.release()
+
+        threading.Thread(target=run, name='stats-snapshot', daemon=True).start()
+
+    def mark_dirty(self):
+        """Note that items changed; the next read starts a refresh"""
+        with self._lock:
+            self._dirty = True
+
+    def get(self):
+        """
+        Current snapshot, refreshing in the background if it is stale
+
+        Returns:
+            Dict with stats, counts, generated_at, age_seconds and stale
+        """
+        with self._lock:
+            loaded = self._data is not None
+        if not loaded:
+            with self._refresh_lock:
+                if self._data is None:
+                    self._refresh()
+
+        with self._lock:
+            data = self._data
+            generated_at = self._generated_at
+            dirty = self._dirty
+
+        age = time.time() - generated_at
+        stale = dirty or age >= self.max_age
+        if stale and age >= self.min_interval:
+            self._refresh_in_background()
+
+        return {
+            'stats': data['stats'],
+            'counts': data['counts'],
+            'generated_at': datetime.fromtimestamp(generated_at).isoformat(),
+            'age_seconds': round(age, 1),
+            'stale': stale,
+        }
+
+    def get_metrics(self):
+        """Refresh counters for health reporting"""
+        with self._lock:
+            return {
+                'refresh_count': self.refresh_count,
+                'last_refresh_ms': self.last_refresh_ms,
+                'last_error': self.last_error,
+                'dirty': self._dirty,
+            }
@@ -0,0 +1,200 @@
+"""
+Taxonomy Counters
+Materialized lost/found item counts per category and per location, kept up to
+date by SQLite triggers on lost_items and found_items, so /api/categories and
+/api/locations read a few dozen rows instead of counting the item tables.
+
+reconcile() rebuilds the counts from scratch (and reports any drift), e.g. after
+a bulk import that ran with triggers disabled. Run it manually:
+    python taxonomy_counts.py [db_path]
+"""
+
+import os
+import sys
+import sqlite3
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traceback_100k.db')
+
+# dimension -> (taxonomy table, item column)
+DIMENSIONS = {
+    'category': ('categories', 'category_id'),
+    'location': ('locations', 'location_id'),
+}
+
+# item table -> counter column
+ITEM_TABLES = {
+    'lost_items': 'lost_count',
+    'found_items': 'found_count',
+}
+
+
+class TaxonomyCounts:
+    def __init__(self, db_path):
+        """
+        Initialize the counters (creates table and triggers, backfills if empty)
+
+        Args:
+            db_path: Path to the database
+        """
+        self.db_path = db_path
+        self.init_taxonomy_counts_table()
+
+    def get_db_connection(self):
+        """Get database connection"""
+        conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
+        return conn
+
+    def init_taxonomy_counts_table(self):
+        """Create taxonomy_counts table and the triggers that maintain it"""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS taxonomy_counts (
+                    dimension TEXT NOT NULL,
+                    taxonomy_id INTEGER NOT NULL,
+                    lost_count INTEGER NOT NULL DEFAULT 0,
+                    found_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (dimension, taxonomy_id)
+                ) WITHOUT ROWID
+            ''')
+
+            for table, counter in ITEM_TABLES.items():
+                self._create_triggers(cursor, table, counter)
+
+            # First run on an existing database: count what's already there
+            counted = cursor.execute('SELECT COUNT(*) FROM taxonomy_counts').fetchone()[0]
+            if not counted:
+                self._fill(cursor)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _create_triggers(self, cursor, table, counter):
+        def increment(dimension, column):
+            # Items without a category/location aren't counted anywhere
+            return f'''
+                    INSERT INTO taxonomy_counts (dimension, taxonomy_id, {counter})
+                    SELECT '{dimension}', NEW.{column}, 1 WHERE NEW.{column} IS NOT NULL
+                    ON CONFLICT (dimension, taxonomy_id) DO UPDATE SET {counter} = {counter} + 1;'''
+
+        def decrement(dimension, column):
+            return f'''
+                    UPDATE taxonomy_counts SET {counter} = {counter} - 1
+                    WHERE dimension = '{dimension}' AND taxonomy_id = OLD.{column};'''
+
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_taxonomy_insert
+            AFTER INSERT ON {table}
+            BEGIN{''.join(increment(d, col) for d, (_, col) in DIMENSIONS.items())}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_taxonomy_delete
+            AFTER DELETE ON {table}
+            BEGIN{''.join(decrement(d, col) for d, (_, col) in DIMENSIONS.items())}
+            END
+        ''')
+        for dimension, (_, column) in DIMENSIONS.items():
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_taxonomy_update_{dimension}
+                AFTER UPDATE OF {column} ON {table}
+                WHEN OLD.{column} IS NOT NEW.{column}
+                BEGIN{decrement(dimension, column)}{increment(dimension, column)}
+                END
+            ''')
+
+    def _count_items(self, cursor):
+        """Counts computed from the item tables: {(dimension, taxonomy_id): [lost, found]}"""
+        counts = {}
+        for dimension, (_, column) in DIMENSIONS.items():
+            for table, counter in ITEM_TABLES.items():
+                index = 0 if counter == 'lost_count' else 1
+                rows = cursor.execute(f'''
+                    SELECT {column}, COUNT(*) FROM {table}
+                    WHERE {column} IS NOT NULL
+                    GROUP BY {column}
+                ''').fetchall()
+                for taxonomy_id, count in rows:
+                    counts.setdefault((dimension, taxonomy_id), [0, 0])[index] = count
+        return counts
+
+    def _fill(self, cursor, counts=None):
+        if counts is None:
+            counts = self._count_items(cursor)
+        cursor.executemany('''
+            INSERT INTO taxonomy_counts (dimension, taxonomy_id, lost_count, found_count)
+            VALUES (?, ?, ?, ?)
+        ''', [(dimension, taxonomy_id, lost, found)
+              for (dimension, taxonomy_id), (lost, found) in counts.items()])
+        if counts:
+            print(f"🧮 Counted items for {len(counts)} categories/locations")
+
+    def reconcile(self):
+        """
+        Rebuild the counters from the item tables
+
+        Runs under a write lock, so no item write can slip in between counting and
+        replacing.
+
+        Returns:
+            Number of counter rows that were wrong (added, changed or removed)
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            current = {
+                (dimension, taxonomy_id): [lost, found]
+                for dimension, taxonomy_id, lost, found in cursor.execute(
+                    'SELECT dimension, taxonomy_id, lost_count, found_count FROM taxonomy_counts'
+                ).fetchall()
+                if lost or found
+            }
+            expected = self._count_items(cursor)
+            drift = sum(1 for key in set(current) | set(expected) if current.get(key) != expected.get(key))
+
+            cursor.execute('DELETE FROM taxonomy_counts')
+            self._fill(cursor, expected)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        if drift:
+            print(f"⚠️ Reconciled taxonomy counts: {drift} rows were out of date")
+        else:
+            print("✅ Taxonomy counts are consistent")
+        return drift
+
+    def counts_query(self, dimension):
+        """
+        SELECT for a taxonomy table with its item counts
+
+        Returns:
+            SQL listing every category/location with lost_count and found_count
+        """
+        table = DIMENSIONS[dimension][0]
+        return f'''
+            SELECT t.*,
+                   COALESCE(tc.lost_count, 0) as lost_count,
+                   COALESCE(tc.found_count, 0) as found_count
+            FROM {table} t
+            LEFT JOIN taxonomy_counts tc
+                ON tc.dimension = '{dimension}' AND tc.taxonomy_id = t.id
+            ORDER BY t.name
+        '''
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found: {db_path}")
+        sys.exit(1)
+    TaxonomyCounts(db_path).reconcile()
@@ -0,0 +1,177 @@
+"""
+Incremental Matching Test
+Checks that an incremental ML matching run leaves ml_matches exactly as a full
+rebuild of the same data would: same pairs, same scores, at most TOP_K matches
+per found item.
+
+Builds a small throwaway database (no emails are queued: the lost items have no
+reporter email), runs a full match, then inserts, edits and deletes items and
+compares the incremental run against a full run on a copy of the database.
+
+Usage:
+    python test_incremental_matching.py
+"""
+
+import os
+import sys
+import shutil
+import random
+import sqlite3
+import tempfile
+
+import ml_scheduler
+from item_change_log import ItemChangeLog
+from ml_matching_service import MLMatchingService
+
+FIXTURE_SCHEMA = '''
+    CREATE TABLE categories (id INTEGER PRIMARY KEY, name TEXT, description TEXT, created_at TIMESTAMP);
+    CREATE TABLE locations (id INTEGER PRIMARY KEY, name TEXT, building_code TEXT, description TEXT,
+                            created_at TIMESTAMP);
+    CREATE TABLE lost_items (
+        id INTEGER PRIMARY KEY, title TEXT, description TEXT, category_id INTEGER, location_id INTEGER,
+        color TEXT, size TEXT, date_lost DATE, time_lost TEXT, user_name TEXT, user_email TEXT,
+        user_phone TEXT, additional_details TEXT, image_filename TEXT, is_resolved INTEGER DEFAULT 0,
+        created_at TIMESTAMP
+    );
+    CREATE TABLE found_items (
+        id INTEGER PRIMARY KEY, title TEXT, description TEXT, category_id INTEGER, location_id INTEGER,
+        color TEXT, size TEXT, date_found DATE, time_found TEXT, finder_name TEXT, finder_email TEXT,
+        finder_phone TEXT, finder_notes TEXT, current_location TEXT, is_private INTEGER,
+        privacy_expires_at TIMESTAMP, privacy_expires TIMESTAMP, image_filename TEXT,
+        is_claimed INTEGER DEFAULT 0, status TEXT, claimed_date TIMESTAMP, created_at TIMESTAMP
+    );
+    CREATE TABLE ml_matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, found_item_id INTEGER NOT NULL, lost_item_id INTEGER NOT NULL,
+        match_score REAL NOT NULL, score_breakdown TEXT, computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        email_sent INTEGER DEFAULT 0, UNIQUE(found_item_id, lost_item_id)
+    );
+'''
+
+CATEGORIES = ['Electronics', 'Wallet', 'Keys', 'Bag']
+LOCATIONS = ['Library', 'Student Center', 'Gym']
+COLORS = ['black', 'brown', 'blue', 'red']
+WORDS = 'brown black leather wallet phone iphone blue backpack keys silver ring red jacket laptop'.split()
+
+
+def lost_row(rng, day=None):
+    return ('Lost item', ' '.join(rng.sample(WORDS, 4)), rng.randint(1, len(CATEGORIES)),
+            rng.randint(1, len(LOCATIONS)), rng.choice(COLORS),
+            '2025-11-%02d' % (day or rng.randint(1, 28)), '', 'Owner')
+
+
+def build_fixture_db(db_path, n_lost=150, n_found=60, seed=7):
+    """Small lost/found database with many near-duplicate items (so top 10s fill up)"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(FIXTURE_SCHEMA)
+    conn.executemany('INSERT INTO categories (id, name) VALUES (?, ?)', enumerate(CATEGORIES, 1))
+    conn.executemany('INSERT INTO locations (id, name) VALUES (?, ?)', enumerate(LOCATIONS, 1))
+    conn.executemany('''
+        INSERT INTO lost_items (title, description, category_id, location_id, color, date_lost,
+                                user_email, user_name)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [lost_row(rng) for _ in range(n_lost)])
+    conn.executemany('''
+        INSERT INTO found_items (title, description, category_id, location_id, color, date_found,
+                                 finder_email, status)
+        VALUES ('Found item', ?, ?, ?, ?, ?, 'finder@kent.edu', NULL)
+    ''', [(' '.join(rng.sample(WORDS, 4)), rng.randint(1, len(CATEGORIES)), rng.randint(1, len(LOCATIONS)),
+           rng.choice(COLORS), '2025-11-%02d' % rng.randint(1, 28)) for _ in range(n_found)])
+    conn.commit()
+    conn.close()
+
+
+def run_matching(db_path, full):
+    """One scheduler run against db_path; returns the stored matches"""
+    ml_scheduler.DB_PATH = db_path
+    ml_service = MLMatchingService(db_path=db_path, upload_folder=os.path.dirname(db_path))
+    change_log = ItemChangeLog(db_path)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    up_to = change_log.current_change_id(conn)
+    since = change_log.get_high_water_mark(conn, ml_scheduler.CONSUMER)
+    if full or since is None:
+        ml_scheduler.run_full_matching(ml_service, cursor, 'test')
+    else:
+        changes = change_log.get_pending_changes(conn, since, up_to)
+        ml_scheduler.run_incremental_matching(ml_service, cursor, changes, 'test')
+    change_log.set_high_water_mark(conn, ml_scheduler.CONSUMER, up_to, full_run=full)
+    conn.commit()
+
+    matches = {
+        (found_id, lost_id): round(score, 4)
+        for found_id, lost_id, score in conn.execute(
+            'SELECT found_item_id, lost_item_id, match_score FROM ml_matches')
+    }
+    conn.close()
+    return matches
+
+
+def change_items(db_path, seed=11):
+    """Insert lost items that push stored matches out of top 10s, edit and delete some items"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    top = conn.execute('''
+        SELECT l.description, l.category_id, l.location_id, l.color, l.date_lost
+        FROM ml_matches m JOIN lost_items l ON l.id = m.lost_item_id
+        ORDER BY m.match_score DESC LIMIT 3
+    ''').fetchall()
+    for description, category_id, location_id, color, date_lost in top:
+        # Near copies of strong matches, a day apart so their scores differ
+        for offset in range(1, 6):
+            day = max(1, int(date_lost[-2:]) - offset)
+            conn.execute('''
+                INSERT INTO lost_items (title, description, category_id, location_id, color, date_lost,
+                                        user_email, user_name)
+                VALUES ('Lost item', ?, ?, ?, ?, ?, '', 'Owner')
+            ''', (description, category_id, location_id, color, '2025-11-%02d' % day))
+    conn.executemany('''
+        INSERT INTO lost_items (title, description, category_id, location_id, color, date_lost,
+                                user_email, user_name)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [lost_row(rng) for _ in range(10)])
+    conn.execute("UPDATE lost_items SET description = 'silver ring keys laptop' WHERE id IN (3, 9)")
+    conn.execute("UPDATE found_items SET color = 'blue' WHERE id = 5")
+    conn.execute('DELETE FROM lost_items WHERE id = 12')
+    conn.execute('DELETE FROM found_items WHERE id = 8')
+    conn.commit()
+    conn.close()
+
+
+def test_incremental_matches_equal_full_rebuild():
+    tmp_dir = tempfile.mkdtemp(prefix='incremental_matching_')
+    original_db_path = ml_scheduler.DB_PATH
+    try:
+        db_path = os.path.join(tmp_dir, 'matching.db')
+        build_fixture_db(db_path)
+        initial = run_matching(db_path, full=True)
+        assert initial, 'fixture produced no matches'
+
+        change_items(db_path)
+        rebuilt_path = os.path.join(tmp_dir, 'rebuilt.db')
+        shutil.copy(db_path, rebuilt_path)
+
+        incremental = run_matching(db_path, full=False)
+        rebuilt = run_matching(rebuilt_path, full=True)
+
+        assert incremental == rebuilt, (
+            f"only incremental: {sorted(set(incremental) - set(rebuilt))}, "
+            f"only full: {sorted(set(rebuilt) - set(incremental))}")
+
+        per_found = {}
+        for found_id, _ in incremental:
+            per_found[found_id] = per_found.get(found_id, 0) + 1
+        assert max(per_found.values()) <= ml_scheduler.TOP_K
+    finally:
+        ml_scheduler.DB_PATH = original_db_path
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        test_incremental_matches_equal_full_rebuild()
+    except AssertionError as e:
+        print(f"❌ Incremental matches differ from a full rebuild: {e}")
+        sys.exit(1)
+    print("✅ Incremental matches equal a full rebuild")
@@ -0,0 +1,78 @@
+"""
+Item Search Highlight Test
+Checks that search highlights come back as escaped HTML: markup in an item's
+title or description is returned as text, and only the matches get <mark> tags.
+
+Runs against a throwaway database, never the live one.
+
+Usage:
+    python test_item_search.py
+"""
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+
+from item_search import ItemSearchIndex, build_match_query, escape_highlights
+
+FIXTURE_SCHEMA = '''
+    CREATE TABLE categories (id INTEGER PRIMARY KEY, name TEXT);
+    CREATE TABLE locations (id INTEGER PRIMARY KEY, name TEXT);
+    CREATE TABLE lost_items (title TEXT, description TEXT, category_id INTEGER, location_id INTEGER);
+    CREATE TABLE found_items (title TEXT, description TEXT, category_id INTEGER, location_id INTEGER);
+    INSERT INTO categories VALUES (1, 'Bags');
+    INSERT INTO locations VALUES (1, 'Library');
+'''
+
+
+def search_found(db_path, text):
+    """Run the found-item search the way /api/search does and return result dictionaries"""
+    index = ItemSearchIndex(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(f'''
+        SELECT f.title, {index.ranked_columns('found')}
+        FROM found_items_fts
+        JOIN found_items f ON f.rowid = found_items_fts.rowid
+        WHERE found_items_fts MATCH ?
+        ORDER BY search_rank
+    ''', (build_match_query(text),)).fetchall()
+    conn.close()
+    return [escape_highlights(dict(row)) for row in rows]
+
+
+def test_highlights_escape_item_markup():
+    tmp_dir = tempfile.mkdtemp(prefix='item_search_')
+    try:
+        db_path = os.path.join(tmp_dir, 'search.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript(FIXTURE_SCHEMA)
+        conn.execute(
+            "INSERT INTO found_items VALUES ('<script>red</script> bag', "
+            "'A red <img src=x onerror=alert(1)> tote & strap', 1, 1)")
+        conn.commit()
+        conn.close()
+
+        results = search_found(db_path, 'red')
+        assert len(results) == 1
+        item = results[0]
+
+        assert item['title'] == '<script>red</script> bag'
+        assert item['title_highlight'] == '&lt;script&gt;<mark>red</mark>&lt;/script&gt; bag'
+        assert '<img' not in item['snippet']
+        assert '&lt;img src=x onerror=alert(1)&gt;' in item['snippet']
+        assert '<mark>red</mark>' in item['snippet']
+        assert '&amp;' in item['snippet']
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    try:
+        test_highlights_escape_item_markup()
+    except AssertionError as e:
+        print(f"❌ Search highlights are not escaped: {e}")
+        sys.exit(1)
+    print("✅ Search highlights are escaped")
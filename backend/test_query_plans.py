@@ -0,0 +1,266 @@
+"""
+Query Plan Regression Test
+Runs EXPLAIN QUERY PLAN for the SQL behind the busiest endpoints (endpoint_queries.py,
+the same statements the API runs) and fails if any of them scans a table it should
+seek into (or sorts what the index should order), e.g. after an index is dropped or
+a query is rewritten.
+
+The test builds a throwaway database with the app's tables, applies the schema
+migrations to it and checks the plans there, so it always runs and never touches
+the live database.
+
+Usage:
+    python test_query_plans.py            # check against a fresh fixture database
+    python test_query_plans.py db_path    # check an existing database as it is
+"""
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+
+import endpoint_queries as queries
+from db_migrations import run_migrations
+
+# Tables (with the indexes their create scripts add) as the endpoints use them
+FIXTURE_SCHEMA = '''
+    CREATE TABLE categories (id INTEGER PRIMARY KEY, name TEXT, description TEXT, created_at TIMESTAMP);
+    CREATE TABLE locations (id INTEGER PRIMARY KEY, name TEXT, building_code TEXT, description TEXT,
+                            created_at TIMESTAMP);
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT UNIQUE NOT NULL, password_hash TEXT,
+        first_name TEXT, last_name TEXT, full_name TEXT, phone_number TEXT, profile_image TEXT,
+        bio TEXT, interests TEXT, year_of_study TEXT, major TEXT, building_preference TEXT,
+        profile_completed INTEGER DEFAULT 0, is_verified BOOLEAN DEFAULT FALSE,
+        is_active BOOLEAN DEFAULT TRUE, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_users_email ON users(email);
+    CREATE TABLE lost_items (
+        id INTEGER PRIMARY KEY, title TEXT, description TEXT, category_id INTEGER, location_id INTEGER,
+        color TEXT, size TEXT, date_lost TEXT, time_lost TEXT, user_name TEXT, user_email TEXT,
+        user_phone TEXT, image_filename TEXT, is_resolved INTEGER DEFAULT 0, created_at TIMESTAMP
+    );
+    CREATE TABLE found_items (
+        id INTEGER PRIMARY KEY, title TEXT, description TEXT, category_id INTEGER, location_id INTEGER,
+        color TEXT, size TEXT, date_found TEXT, time_found TEXT, current_location TEXT,
+        finder_notes TEXT, finder_name TEXT, finder_email TEXT, finder_phone TEXT,
+        is_private INTEGER, privacy_expires_at TIMESTAMP, privacy_expires TIMESTAMP,
+        image_filename TEXT, is_claimed INTEGER DEFAULT 0, status TEXT, claimed_date TIMESTAMP,
+        created_at TIMESTAMP
+    );
+    CREATE TABLE claim_attempts (
+        attempt_id INTEGER PRIMARY KEY AUTOINCREMENT, found_item_id INTEGER NOT NULL, user_id INTEGER,
+        user_email TEXT NOT NULL, attempted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        success BOOLEAN DEFAULT 0, answers_json TEXT, marked_as_potential_at TIMESTAMP,
+        UNIQUE(found_item_id, user_email)
+    );
+    CREATE INDEX idx_claim_attempts_item_user ON claim_attempts(found_item_id, user_email);
+    CREATE TABLE ml_matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, found_item_id INTEGER NOT NULL,
+        lost_item_id INTEGER NOT NULL, match_score REAL NOT NULL, score_breakdown TEXT,
+        computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, email_sent INTEGER DEFAULT 0,
+        UNIQUE(found_item_id, lost_item_id)
+    );
+    CREATE INDEX idx_ml_matches_found ON ml_matches(found_item_id);
+    CREATE INDEX idx_ml_matches_lost ON ml_matches(lost_item_id);
+    CREATE INDEX idx_ml_matches_score ON ml_matches(match_score DESC);
+    CREATE TABLE messages (
+        message_id INTEGER PRIMARY KEY AUTOINCREMENT, conversation_id TEXT NOT NULL,
+        sender_id INTEGER NOT NULL, sender_name TEXT NOT NULL, sender_email TEXT NOT NULL,
+        receiver_id INTEGER NOT NULL, receiver_name TEXT NOT NULL, receiver_email TEXT NOT NULL,
+        message_text TEXT NOT NULL, item_id INTEGER, item_type TEXT, item_title TEXT,
+        is_read INTEGER DEFAULT 0, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_conversation_id ON messages(conversation_id);
+    CREATE INDEX idx_sender_receiver ON messages(sender_id, receiver_id);
+    CREATE TABLE successful_returns (
+        return_id INTEGER PRIMARY KEY AUTOINCREMENT, item_id INTEGER NOT NULL, item_title TEXT NOT NULL,
+        item_description TEXT, item_category TEXT, item_location TEXT, date_found DATE,
+        owner_email TEXT NOT NULL, owner_name TEXT, claimer_email TEXT NOT NULL, claimer_name TEXT,
+        claim_reason TEXT NOT NULL, finalized_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finalized_date DATE, answers_provided TEXT, days_to_finalize INTEGER,
+        verification_code TEXT
+    );
+'''
+
+# Rows per item table, so ANALYZE gives the planner realistic statistics
+FIXTURE_ROWS = 2000
+FIXTURE_USERS = 200
+
+EMAIL = 'user1@kent.edu'
+
+# (name, sql, params, table aliases that must only be searched, ORDER BY must come from an index)
+HOT_QUERIES = [
+    ('lost items dashboard', queries.LOST_ITEMS_DASHBOARD_SQL, (EMAIL, 20, 0), {'l'}, True),
+    ('lost items dashboard (first page)',
+     queries.LOST_ITEMS_DASHBOARD_PAGE_SQL.format(keyset_condition=''), (EMAIL, 21), {'l'}, True),
+    ('lost items dashboard (next page)',
+     queries.LOST_ITEMS_DASHBOARD_PAGE_SQL.format(keyset_condition=queries.LOST_ITEMS_KEYSET_CONDITION),
+     (EMAIL, '2025-11-01 10:00:00', 100, 21), {'l'}, True),
+    ('claim window filter',
+     f'SELECT f.rowid FROM found_items f WHERE {queries.CLAIM_WINDOW_FILTER}', (), {'ca'}, False),
+    ('public browse count',
+     queries.FOUND_ITEMS_BROWSE_COUNT_SQL.format(where_clause=' AND '.join(
+         [queries.UNCLAIMED_FILTER, queries.CLAIM_WINDOW_FILTER, queries.PUBLIC_BROWSE_FILTER])),
+     (), {'f', 'ca'}, False),
+    ('potential claimer count', queries.POTENTIAL_CLAIMER_COUNT_SQL, (1,), {'claim_attempts'}, False),
+    ('found reports by finder', queries.FOUND_REPORTS_BY_FINDER_SQL, (EMAIL,), {'f'}, True),
+    ('matches summary', queries.USER_MATCH_SCORES_SQL, (EMAIL, 0.7, EMAIL, 0.7), {'m', 'l', 'f'}, False),
+    ('unread message counts', queries.UNREAD_COUNTS_SQL, (1,), {'messages'}, False),
+    ('conversation messages', queries.CONVERSATION_MESSAGES_SQL, ('conv-1',), {'messages'}, True),
+    ('success history (owner)', queries.SUCCESS_HISTORY_OWNER_SQL, (EMAIL,), {'sr', 'u'}, True),
+    ('success history (claimer)', queries.SUCCESS_HISTORY_CLAIMER_SQL, (EMAIL,), {'sr', 'u'}, True),
+    ('user directory', queries.USER_DIRECTORY_SQL, (), {'users'}, True),
+]
+
+
+def build_fixture_db(db_path):
+    """Create the app's tables at db_path, fill them with spread-out rows and migrate"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(FIXTURE_SCHEMA)
+
+    emails = [f'user{i}@kent.edu' for i in range(FIXTURE_USERS)]
+    dates = [f'2025-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00:00' for i in range(FIXTURE_ROWS)]
+
+    conn.executemany('INSERT INTO categories (id, name) VALUES (?, ?)', [(i, f'Category {i}') for i in range(1, 21)])
+    conn.executemany('INSERT INTO locations (id, name) VALUES (?, ?)', [(i, f'Location {i}') for i in range(1, 41)])
+    conn.executemany('''
+        INSERT INTO users (email, full_name, profile_completed, is_active) VALUES (?, ?, ?, ?)
+    ''', [(email, f'User {i}', i % 3 == 0, i % 10 != 0) for i, email in enumerate(emails)])
+    conn.executemany('''
+        INSERT INTO lost_items (title, description, category_id, location_id, user_email, is_resolved, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(f'Lost {i}', 'black wallet', 1 + i % 20, 1 + i % 40, emails[i % FIXTURE_USERS], i % 5 == 0, dates[i])
+          for i in range(FIXTURE_ROWS)])
+    conn.executemany('''
+        INSERT INTO found_items (title, description, category_id, location_id, finder_email, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(f'Found {i}', 'black wallet', 1 + i % 20, 1 + i % 40, emails[i % FIXTURE_USERS],
+           'CLAIMED' if i % 7 == 0 else None, dates[i]) for i in range(FIXTURE_ROWS)])
+    conn.executemany('''
+        INSERT INTO claim_attempts (found_item_id, user_email, success, marked_as_potential_at) VALUES (?, ?, ?, ?)
+    ''', [(1 + i, emails[i % FIXTURE_USERS], i % 4 == 0, dates[i] if i % 4 == 0 else None)
+          for i in range(0, FIXTURE_ROWS, 3)])
+    conn.executemany('''
+        INSERT INTO ml_matches (found_item_id, lost_item_id, match_score) VALUES (?, ?, ?)
+    ''', [(1 + i, 1 + (i * 7) % FIXTURE_ROWS, (i % 100) / 100) for i in range(FIXTURE_ROWS)])
+    conn.executemany('''
+        INSERT INTO messages (conversation_id, sender_id, sender_name, sender_email, receiver_id,
+                              receiver_name, receiver_email, message_text, is_read, created_at)
+        VALUES (?, ?, 'A', 'a@kent.edu', ?, 'B', 'b@kent.edu', 'hello', ?, ?)
+    ''', [(f'conv-{i % 300}', 1 + i % FIXTURE_USERS, 1 + (i * 3) % FIXTURE_USERS, i % 3 != 0, dates[i])
+          for i in range(FIXTURE_ROWS)])
+    conn.executemany('''
+        INSERT INTO successful_returns (item_id, item_title, owner_email, claimer_email, claim_reason, finalized_date)
+        VALUES (?, 'Item', ?, ?, 'mine', ?)
+    ''', [(i, emails[i % FIXTURE_USERS], emails[(i * 7) % FIXTURE_USERS], dates[i][:10])
+          for i in range(FIXTURE_ROWS // 4)])
+    conn.commit()
+    conn.close()
+
+    # Indexes, public_at etc. plus ANALYZE, exactly as on a real database
+    run_migrations(db_path)
+
+
+def get_plan(conn, sql, params):
+    """EXPLAIN QUERY PLAN detail strings"""
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()]
+
+
+def find_problems(plan, guarded, ordered):
+    """
+    Plan steps that scan a guarded table, or sort what the index should order
+
+    Any SCAN of a guarded table fails, covering index or not: walking an index from
+    end to end still visits every row. Guarded tables must be SEARCHed.
+    """
+    problems = []
+    for detail in plan:
+        words = detail.split()
+        if words[0] == 'SCAN' and len(words) > 1 and words[1] in guarded:
+            problems.append(detail)
+        if ordered and 'TEMP B-TREE FOR ORDER BY' in detail:
+            problems.append(detail)
+    return problems
+
+
+def check_query_plans(db_path):
+    """
+    Check every hot query against a database (read-only; a missing table is a failure)
+
+    Returns:
+        List of (query name, problem steps, full plan) for regressed queries
+    """
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    failures = []
+    try:
+        for name, sql, params, guarded, ordered in HOT_QUERIES:
+            try:
+                plan = get_plan(conn, sql, params)
+            except sqlite3.OperationalError as e:
+                failures.append((name, [str(e)], []))
+                print(f"❌ {name}: {e}")
+                continue
+
+            problems = find_problems(plan, guarded, ordered)
+            if problems:
+                failures.append((name, problems, plan))
+                print(f"❌ {name}: {'; '.join(problems)}")
+            else:
+                print(f"✅ {name}")
+    finally:
+        conn.close()
+    return failures
+
+
+def test_query_plans():
+    """No hot query may scan a table it should seek into"""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmp_dir, 'query_plans.db')
+        build_fixture_db(db_path)
+        failures = check_query_plans(db_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    assert not failures, f"Table scans in: {', '.join(name for name, _, _ in failures)}"
+
+
+def test_find_problems_rejects_covering_scans():
+    """A SCAN over a covering index is still a full scan"""
+    plan = ['SCAN claim_attempts USING COVERING INDEX idx_claim_attempts_potential']
+    assert find_problems(plan, {'claim_attempts'}, False) == plan
+    assert find_problems(['SEARCH l USING INDEX idx_lost_items_user_open (user_email=?)'], {'l'}, True) == []
+    assert find_problems(['USE TEMP B-TREE FOR ORDER BY'], set(), True) == ['USE TEMP B-TREE FOR ORDER BY']
+
+
+if __name__ == '__main__':
+    print("🧪 Checking query plans for hot endpoints")
+    print("=" * 60)
+
+    tmp_dir = None
+    if len(sys.argv) > 1:
+        db_path = sys.argv[1]
+        if not os.path.exists(db_path):
+            print(f"❌ Database not found: {db_path}")
+            sys.exit(1)
+    else:
+        tmp_dir = tempfile.mkdtemp()
+        db_path = os.path.join(tmp_dir, 'query_plans.db')
+        build_fixture_db(db_path)
+
+    try:
+        failures = check_query_plans(db_path)
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print("=" * 60)
+    if failures:
+        for name, problems, plan in failures:
+            print(f"\n{name}:")
+            for detail in plan or problems:
+                print(f"   {detail}")
+        print(f"\n❌ {len(failures)} of {len(HOT_QUERIES)} queries regressed")
+        sys.exit(1)
+    print(f"✅ All {len(HOT_QUERIES)} hot queries use index seeks")
@@ -0,0 +1,37 @@
+"""
+Test Vectorized Match Engine
+Verifies batch_match_all_items gives identical results with the matrix engine and the pairwise loop
+"""
+
+import os
+import time
+from ml_matching_service import MLMatchingService
+
+def test_vectorized_parity():
+    print("=" * 70)
+    print("Testing Vectorized Match Engine Parity")
+    print("=" * 70)
+
+    db_path = os.path.join(os.path.dirname(__file__), 'traceback_100k.db')
+    upload_folder = os.path.join(os.path.dirname(__file__), 'uploads')
+
+    service = MLMatchingService(db_path, upload_folder=upload_folder)
+
+    for min_score in (0.6, 0.7):
+        for top_k in (None, 10):
+            start = time.time()
+            loop_matches = service.batch_match_all_items(min_score, top_k=top_k, vectorized=False)
+            loop_time = time.time() - start
+
+            start = time.time()
+            vec_matches = service.batch_match_all_items(min_score, top_k=top_k, vectorized=True)
+            vec_time = time.time() - start
+
+            assert loop_matches == vec_matches, f"Mismatch at min_score={min_score}, top_k={top_k}"
+            print(f"✅ min_score={min_score} top_k={top_k}: {len(vec_matches)} matches "
+                  f"(loop {loop_time:.2f}s, vectorized {vec_time:.2f}s)")
+
+    print("\n✅ Vectorized engine matches the pairwise loop exactly")
+
+if __name__ == '__main__':
+    test_vectorized_parity()
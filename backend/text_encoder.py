@@ -0,0 +1,130 @@
+"""
+Text Encoder Backends
+Loads the sentence-transformer description model with a selectable inference backend:
+
+- fp32: full-precision PyTorch model (default)
+- int8: PyTorch dynamic int8 quantization of the Linear layers (CPU)
+- onnx: ONNX Runtime export of the same model (sentence-transformers >= 3.2)
+
+Every backend returns an object with the SentenceTransformer `encode()` API.
+A non-fp32 backend is only used if its cosine similarities on a small sample stay
+within a tolerance of the fp32 model (parity_check()); otherwise fp32 is used.
+"""
+
+import os
+import numpy as np
+
+TEXT_BACKENDS = ('fp32', 'int8', 'onnx')
+
+# Backend used by MLMatchingService unless one is passed explicitly
+TEXT_BACKEND = os.environ.get('ML_TEXT_BACKEND', 'fp32').lower()
+
+# Largest allowed |cosine(backend) - cosine(fp32)| over the parity sample
+PARITY_TOLERANCE = float(os.environ.get('ML_TEXT_PARITY_TOLERANCE', '0.02'))
+
+# Sample encoded by both models when a non-fp32 backend is loaded
+PARITY_TEXTS = [
+    "Lost brown leather wallet near library",
+    "Found brown wallet at library entrance",
+    "Black iPhone 13 with cracked screen protector",
+    "Blue Jansport backpack with laptop inside",
+    "Silver car keys on a red lanyard",
+    "Grey hoodie left in the student center",
+    "AirPods case found in the gym locker room",
+    "Gold ring with small diamond lost in Hall A",
+]
+
+
+def load_text_encoder(model_path, backend=None, check_parity=True):
+    """
+    Load the text model with the requested backend
+
+    Falls back to fp32 (with a warning) if the backend can't be loaded, e.g.
+    when onnxruntime / optimum are not installed, or if it fails the parity
+    check against fp32 on PARITY_TEXTS.
+
+    Args:
+        model_path: Path to the sentence-transformer model
+        backend: 'fp32', 'int8' or 'onnx' (default ML_TEXT_BACKEND env var)
+        check_parity: Compare a non-fp32 backend against fp32 before using it
+                      (the benchmark turns this off and checks a larger sample)
+
+    Returns:
+        (model, backend_actually_used)
+    """
+    from sentence_transformers import SentenceTransformer
+
+    backend = (backend or TEXT_BACKEND).lower()
+    if backend not in TEXT_BACKENDS:
+        print(f"⚠️ Unknown text backend '{backend}', using fp32")
+        backend = 'fp32'
+
+    model = None
+    try:
+        if backend == 'int8':
+            import torch
+            model = SentenceTransformer(model_path, device='cpu')
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        elif backend == 'onnx':
+            # Uses an exported onnx/model.onnx if present, otherwise exports on load
+            model = SentenceTransformer(model_path, device='cpu', backend='onnx')
+
+    except Exception as e:
+        print(f"⚠️ Could not load {backend} text backend ({e}), falling back to fp32")
+        model = None
+
+    if model is not None and not check_parity:
+        return model, backend
+
+    reference = SentenceTransformer(model_path)
+    if model is None:
+        return reference, 'fp32'
+
+    try:
+        parity = parity_check(reference.encode(PARITY_TEXTS), model.encode(PARITY_TEXTS))
+    except Exception as e:
+        print(f"⚠️ Parity check of {backend} text backend failed ({e}), falling back to fp32")
+        return reference, 'fp32'
+
+    if not parity['passed']:
+        print(f"⚠️ {backend} text backend is off from fp32 (max Δcos {parity['max_abs_diff']:.4f} > "
+              f"{parity['tolerance']}), falling back to fp32")
+        return reference, 'fp32'
+
+    print(f"✅ {backend} text backend matches fp32 (max Δcos {parity['max_abs_diff']:.4f})")
+    return model, backend
+
+
+def cosine_matrix(embeddings):
+    """Pairwise cosine similarities of a set of embeddings"""
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    unit = embeddings / norms
+    return unit @ unit.T
+
+
+def parity_check(reference_embeddings, candidate_embeddings, tolerance=None):
+    """
+    Compare a backend's pairwise cosine similarities against the fp32 model
+
+    Args:
+        reference_embeddings: fp32 embeddings of the sample texts
+        candidate_embeddings: Backend embeddings of the same texts
+        tolerance: Maximum allowed absolute difference (default PARITY_TOLERANCE)
+
+    Returns:
+        Dictionary with max/mean absolute difference and whether it passed
+    """
+    tolerance = PARITY_TOLERANCE if tolerance is None else tolerance
+
+    diff = np.abs(cosine_matrix(reference_embeddings) - cosine_matrix(candidate_embeddings))
+    max_diff = float(diff.max()) if diff.size else 0.0
+
+    return {
+        'max_abs_diff': round(max_diff, 6),
+        'mean_abs_diff': round(float(diff.mean()) if diff.size else 0.0, 6),
+        'tolerance': tolerance,
+        'passed': max_diff <= tolerance
+    }
@@ -7,13 +7,14 @@ import hashlib
 import os
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+import db_pool
 
 # Use absolute path to the backend database to avoid relative-path inconsistencies
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traceback_100k.db')
 
 def create_users_table():
     """Create users table if it doesn't exist"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -70,7 +71,7 @@ def verify_password(password, password_hash, email=None):
             # Migrate to a stronger Werkzeug hash on first successful legacy login
             try:
                 new_hash = generate_password_hash(password)
-                conn = sqlite3.connect(DB_PATH)
+                conn = db_pool.connect(DB_PATH)
                 cursor = conn.cursor()
                 cursor.execute('UPDATE users SET password_hash = ? WHERE email = ?', (new_hash, email))
                 conn.commit()
@@ -85,7 +86,7 @@ def verify_password(password, password_hash, email=None):
 def create_user(email, password, first_name, last_name):
     """Create a new user in the database"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Check if user already exists
@@ -123,7 +124,7 @@ def create_user(email, password, first_name, last_name):
 def get_user_by_email(email):
     """Get user by email"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -147,7 +148,7 @@ def get_user_by_email(email):
 def verify_user_email(email):
     """Mark user as email verified"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -167,7 +168,7 @@ def verify_user_email(email):
 def update_last_login(email):
     """Update user's last login timestamp"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -185,7 +186,7 @@ def update_last_login(email):
 def get_user_stats():
     """Get user statistics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         
         # Total users
@@ -226,7 +227,7 @@ def get_user_stats():
 def list_users(limit=50, verified_only=False):
     """List users with optional filters"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -51,8 +51,8 @@ timeout /t 3 /nobreak >nul
 echo ✅ Backend API started
 
 REM Start ML Scheduler
-echo 🤖 Starting ML Scheduler (runs every 1 hour)...
-start "TraceBack ML Scheduler" cmd /c "cd backend && python combined_scheduler.py > ..\logs\scheduler.log 2>&1"
+echo 🤖 Starting Scheduler (ML matching, notifications, cleanup)...
+start "TraceBack ML Scheduler" cmd /c "cd backend && python scheduler_runtime.py > ..\logs\scheduler.log 2>&1"
 timeout /t 3 /nobreak >nul
 echo ✅ ML Scheduler started
 
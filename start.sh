@@ -71,9 +71,9 @@ echo "✅ Backend API started (PID: $BACKEND_PID)"
 sleep 2
 
 # Start ML Scheduler
-echo "🤖 Starting ML Scheduler (runs every 1 hour)..."
+echo "🤖 Starting Scheduler (ML matching, notifications, cleanup)..."
 cd backend
-$PYTHON_CMD combined_scheduler.py > ../logs/scheduler.log 2>&1 &
+$PYTHON_CMD scheduler_runtime.py > ../logs/scheduler.log 2>&1 &
 SCHEDULER_PID=$!
 cd ..
 echo "✅ ML Scheduler started (PID: $SCHEDULER_PID)"